@@ -1,26 +1,56 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
-import pandas as pd
-from marketdata import get_ohlc  # fallback if needed
-from core.signal_fusion import generate_trade_decision
+from fastapi.responses import JSONResponse
+
+from botstrategies import analyze_symbol
+from candle_ingest import AnalysisQueue, IngestError, UnsupportedFormat, decode_payload
+from marketdata import ingest_ohlc
+
+analysis_queue = AnalysisQueue(analyze_symbol)
+DATA = analysis_queue.results  # latest analysis result per symbol
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    analysis_queue.start()
+    yield
+    await analysis_queue.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
-app = FastAPI()
-DATA = {}  # hold latest uploaded data per symbol
 
 @app.post("/api/receive_data")
 async def receive_data(request: Request):
-    body = await request.json()
-    symbol = body.get("symbol")
-    candles = body.get("data")
-
-    if not symbol or not candles:
-        return {"status": "error", "message": "Missing symbol or data"}
-
-    df = pd.DataFrame(candles)
-    df["datetime"] = pd.to_datetime(df["time"], unit="s")
-    df.set_index("datetime", inplace=True)
-    
-    # analyze it
-    results = await generate_trade_decision(symbol)
-    DATA[symbol] = results
-
-    return {"status": "success", "symbol": symbol, "result": results}
+    """
+    Ingest pushed candles (JSON, msgpack or Arrow IPC; one or many symbols),
+    store them and queue analysis on exactly those bars. See candle_ingest.
+    """
+    body = await request.body()
+    try:
+        series = decode_payload(body, request.headers.get("content-type"))
+    except UnsupportedFormat as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=415)
+    except IngestError as e:
+        return JSONResponse({"status": "error", "message": str(e)}, status_code=400)
+
+    stored = {}
+    for symbol, timeframe, df in series:
+        if df.empty:
+            continue
+        ingest_ohlc(symbol, timeframe, df)
+        analysis_queue.submit(symbol, timeframe)
+        stored[f"{symbol}:{timeframe}"] = stored.get(f"{symbol}:{timeframe}", 0) + len(df)
+
+    if not stored:
+        return JSONResponse({"status": "error", "message": "No valid candles"}, status_code=400)
+    return JSONResponse(
+        {"status": "queued", "series": stored, "bars": sum(stored.values())},
+        status_code=202,
+    )
+
+
+@app.get("/api/receive_data/status")
+async def receive_status():
+    return {"analysis": analysis_queue.stats(), "symbols": sorted(DATA)}
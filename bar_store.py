@@ -0,0 +1,124 @@
+"""
+Persistent per-(symbol, timeframe) OHLCV bar store.
+
+- Remembers every bar fetched so far, so providers only need to be asked for
+  bars newer than the last stored timestamp.
+- Merges new bars with de-duplication (the newest copy of a bar wins, which
+  replaces a previously stored, still-forming bar).
+- Index is a naive UTC DatetimeIndex named "time"; columns are
+  open/high/low/close/volume.
+- Full history lives in the memory-mapped columnar candle store; this class
+  keeps a hot in-memory tail of up to `max_bars` bars per symbol/timeframe.
+"""
+
+import os
+import logging
+import pandas as pd
+from typing import Dict, Optional, Tuple
+
+from candle_store import CandleStore, VALUE_COLUMNS, candle_store
+
+logger = logging.getLogger(__name__)
+
+BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", os.path.join("data", "bars"))
+BAR_STORE_MAX_BARS = int(os.getenv("BAR_STORE_MAX_BARS", "5000"))
+
+
+def normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Bring a provider frame into store form: OHLCV columns, naive UTC
+    DatetimeIndex named "time", sorted, without duplicate timestamps.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.copy()
+    df.columns = [str(c).lower() for c in df.columns]
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    df.index = index
+    df.index.name = "time"
+    df = df[~df.index.duplicated(keep="last")]
+    return df.reindex(columns=list(VALUE_COLUMNS)).astype("float64").sort_index()
+
+
+class BarStore:
+    """
+    Hot in-memory bar tails on top of the columnar on-disk candle store.
+    """
+
+    def __init__(
+        self,
+        store: CandleStore = candle_store,
+        max_bars: int = BAR_STORE_MAX_BARS,
+        legacy_dir: str = BAR_STORE_DIR,
+    ):
+        self.store = store
+        self.max_bars = max_bars
+        self.legacy_dir = legacy_dir
+        self._frames: Dict[Tuple[str, str], pd.DataFrame] = {}
+
+    def load(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """
+        Return the hot tail of stored bars for symbol/timeframe (empty if none yet).
+        """
+        key = (symbol.upper(), timeframe.upper())
+        if key in self._frames:
+            return self._frames[key]
+        self._import_legacy_csv(symbol, timeframe)
+        df = self.store.tail(symbol, timeframe, self.max_bars).to_frame().copy()
+        self._frames[key] = df if not df.empty else pd.DataFrame()
+        return self._frames[key]
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        """
+        Timestamp of the newest stored bar, or None when nothing is stored.
+        """
+        df = self.load(symbol, timeframe)
+        return None if df.empty else df.index[-1]
+
+    def merge(self, symbol: str, timeframe: str, new_bars: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merge `new_bars` into the store, de-duplicate and persist them.
+
+        Returns:
+            pd.DataFrame: The hot tail after the merge.
+        """
+        new_bars = normalize_bars(new_bars)
+        current = self.load(symbol, timeframe)
+        if new_bars.empty:
+            return current
+        if current.empty:
+            merged = new_bars
+        else:
+            merged = pd.concat([current, new_bars])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        merged = merged.tail(self.max_bars)
+        self._frames[(symbol.upper(), timeframe.upper())] = merged
+        try:
+            self.store.append(symbol, timeframe, new_bars)
+        except OSError as e:
+            logger.error(f"[BarStore] Could not persist {symbol} {timeframe}: {e}")
+        return merged
+
+    def tail(self, symbol: str, timeframe: str, bars: int) -> pd.DataFrame:
+        """
+        Copy of the newest `bars` stored bars.
+        """
+        return self.load(symbol, timeframe).tail(bars).copy()
+
+    def _import_legacy_csv(self, symbol: str, timeframe: str) -> None:
+        """One-off migration of the CSV files written by earlier versions."""
+        path = os.path.join(self.legacy_dir, f"{symbol.upper()}_{timeframe.upper()}.csv")
+        if not os.path.exists(path) or self.store.length(symbol, timeframe):
+            return
+        try:
+            df = pd.read_csv(path, index_col="time", parse_dates=["time"])
+            self.store.append(symbol, timeframe, normalize_bars(df))
+            os.replace(path, f"{path}.imported")
+            logger.info(f"[BarStore] Imported {len(df)} bars from {path}")
+        except Exception as e:
+            logger.error(f"[BarStore] Could not import {path}: {e}")
+
+
+bar_store = BarStore()
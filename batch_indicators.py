@@ -0,0 +1,257 @@
+"""
+Batched indicator computation over many symbols at once.
+
+- Indicator formulas on numpy arrays along the last axis: a single series or
+  a (symbols x bars) matrix go through the same code (indicators.py wraps
+  these for pandas Series; feature_planner reuses the building blocks).
+- stack_ohlc() right-aligns each symbol's bars into NaN-padded matrices;
+  each row warms up from its own first bar, so symbols with short histories
+  do not disturb the others.
+- compute() evaluates the requested indicator columns for every symbol in
+  one vectorized pass; per_symbol() / latest() map results back to symbols.
+- compute_frames() is the one-call entry point for scanners holding a
+  dict of symbol -> DataFrame.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+import rolling_kernels as rk
+
+logger = logging.getLogger(__name__)
+
+
+# --- Building blocks (shared with feature_planner) ---
+
+def gains(delta: np.ndarray, warm: np.ndarray) -> np.ndarray:
+    """Positive changes, 0 otherwise; NaN before a row's first bar (`warm` False)."""
+    return np.where(warm, np.where(delta > 0, delta, 0.0), np.nan)
+
+
+def losses(delta: np.ndarray, warm: np.ndarray) -> np.ndarray:
+    """Magnitude of negative changes, 0 otherwise; NaN before a row's first bar."""
+    return np.where(warm, np.where(delta < 0, -delta, 0.0), np.nan)
+
+
+def carry_nonzero(avg_loss: np.ndarray) -> np.ndarray:
+    """Replace zero average losses with the last non-zero one (RSI "sma" smoothing)."""
+    return rk.ffill(np.where(avg_loss == 0, np.nan, avg_loss))
+
+
+def rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    high, low = np.asarray(high, dtype=np.float64), np.asarray(low, dtype=np.float64)
+    prev_close = rk.shift(close)
+    # fmax skips the missing previous close on the first bar, like DataFrame.max
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def typical_price(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    return (np.asarray(high, dtype=np.float64) + low + close) / 3
+
+
+def percent_k(close: np.ndarray, lowest_low: np.ndarray, highest_high: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 * (close - lowest_low) / (highest_high - lowest_low)
+
+
+def percent_r(close: np.ndarray, highest_high: np.ndarray, lowest_low: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return -100 * (highest_high - close) / (highest_high - lowest_low)
+
+
+def cci_from(tp: np.ndarray, tp_sma: np.ndarray, tp_mad: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (tp - tp_sma) / (0.015 * tp_mad)
+
+
+# --- Indicator formulas (last axis = bars) ---
+
+def ema(close: np.ndarray, period: int = 9) -> np.ndarray:
+    """Exponential Moving Average."""
+    return rk.ema(close, period)
+
+
+def sma(close: np.ndarray, period: int = 9) -> np.ndarray:
+    """Simple Moving Average."""
+    return rk.rolling_mean(close, period)
+
+
+def wma(close: np.ndarray, period: int = 9) -> np.ndarray:
+    """Linearly Weighted Moving Average."""
+    return rk.rolling_wma(close, period)
+
+
+def rsi(close: np.ndarray, period: int = 14, smoothing: str = "sma") -> np.ndarray:
+    """
+    Relative Strength Index.
+
+    smoothing="sma" (default) averages gains/losses over a simple window and
+    carries the last non-zero average loss through loss-free stretches;
+    smoothing="wilder" uses Wilder's RMA (RSI 100 when there are no losses).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    delta = rk.diff(close)
+    if smoothing == "wilder":
+        # Wilder seeds from the first `period` real changes of each row
+        real = ~np.isnan(delta)
+        avg_gain = rk.wilder(gains(delta, real), period)
+        avg_loss = rk.wilder(losses(delta, real), period)
+    else:
+        # Padding before a row's first bar must not count as zero change
+        warm = rk.started(close)
+        avg_gain = rk.rolling_mean(gains(delta, warm), period)
+        avg_loss = carry_nonzero(rk.rolling_mean(losses(delta, warm), period))
+    return rsi_from_averages(avg_gain, avg_loss)
+
+
+def macd(close: np.ndarray, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Dict[str, np.ndarray]:
+    """MACD, Signal, Histogram."""
+    line = rk.ema(close, fast_period) - rk.ema(close, slow_period)
+    signal = rk.ema(line, signal_period)
+    return {"macd": line, "signal": signal, "histogram": line - signal}
+
+
+def bollinger_bands(close: np.ndarray, period: int = 20, num_std: float = 2.0) -> Dict[str, np.ndarray]:
+    """Bollinger Bands: Middle, Upper, Lower."""
+    middle = rk.rolling_mean(close, period)
+    std = rk.rolling_std(close, period)
+    return {"middle_band": middle, "upper_band": middle + std * num_std, "lower_band": middle - std * num_std}
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Average True Range."""
+    return rk.rolling_mean(true_range(high, low, close), period)
+
+
+def stochastic(high: np.ndarray, low: np.ndarray, close: np.ndarray, k_period: int = 14, d_period: int = 3) -> Dict[str, np.ndarray]:
+    """Stochastic Oscillator (%K, %D)."""
+    k = percent_k(close, rk.rolling_min(low, k_period), rk.rolling_max(high, k_period))
+    return {"%K": k, "%D": rk.rolling_mean(k, d_period)}
+
+
+def cci(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 20) -> np.ndarray:
+    """Commodity Channel Index."""
+    tp = typical_price(high, low, close)
+    return cci_from(tp, rk.rolling_mean(tp, period), rk.rolling_mad(tp, period))
+
+
+def williams_r(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Williams %R."""
+    return percent_r(close, rk.rolling_max(high, period), rk.rolling_min(low, period))
+
+
+# --- Symbol matrices ---
+
+class BarMatrix(NamedTuple):
+    """Right-aligned (symbols x bars) OHLCV matrices; rows are NaN-padded on the left."""
+    symbols: List[str]
+    close: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    volume: np.ndarray
+    lengths: np.ndarray  # real bars per row (the last `length` columns)
+
+
+def stack_ohlc(frames: Mapping[str, pd.DataFrame], bars: Optional[int] = None) -> BarMatrix:
+    """
+    Stack per-symbol OHLCV frames into aligned matrices.
+
+    Args:
+        frames (dict): symbol -> DataFrame with open/high/low/close[/volume]
+            columns (any case). None / empty frames are skipped.
+        bars (int, optional): Keep only the last `bars` bars per symbol;
+            default is the longest frame.
+
+    Returns:
+        BarMatrix: The last bar of every symbol sits in the last column.
+    """
+    usable = [(symbol, df) for symbol, df in frames.items() if df is not None and not df.empty]
+    width = bars or max((len(df) for _, df in usable), default=0)
+    fields = {name: np.full((len(usable), width), np.nan) for name in ("close", "high", "low", "volume")}
+    lengths = np.zeros(len(usable), dtype=np.int64)
+    for row, (_, df) in enumerate(usable):
+        columns = {str(c).lower(): c for c in df.columns}
+        length = min(len(df), width)
+        lengths[row] = length
+        for name, matrix in fields.items():
+            if name in columns:
+                matrix[row, width - length:] = df[columns[name]].to_numpy(dtype=np.float64, na_value=np.nan)[-length:]
+    return BarMatrix([symbol for symbol, _ in usable], lengths=lengths, **fields)
+
+
+_GROUPS: Tuple[Tuple[Tuple[str, ...], Callable[[BarMatrix], Dict[str, np.ndarray]]], ...] = (
+    (("ema9",), lambda m: {"ema9": ema(m.close, 9)}),
+    (("ema21",), lambda m: {"ema21": ema(m.close, 21)}),
+    (("rsi",), lambda m: {"rsi": rsi(m.close, 14)}),
+    (("macd", "signal", "histogram"), lambda m: macd(m.close)),
+    (("middle_band", "upper_band", "lower_band"), lambda m: bollinger_bands(m.close)),
+    (("atr",), lambda m: {"atr": atr(m.high, m.low, m.close, 14)}),
+    (("%K", "%D"), lambda m: stochastic(m.high, m.low, m.close)),
+    (("cci",), lambda m: {"cci": cci(m.high, m.low, m.close, 20)}),
+    (("williams_r",), lambda m: {"williams_r": williams_r(m.high, m.low, m.close, 14)}),
+)
+
+# Column names compute() understands (default parameters, as in indicators.py)
+COLUMNS = tuple(name for names, _ in _GROUPS for name in names)
+
+
+def compute(matrix: BarMatrix, names: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Indicator columns for every symbol of `matrix` in one pass.
+
+    Args:
+        matrix (BarMatrix): Output of stack_ohlc.
+        names (iterable, optional): Columns from COLUMNS; all by default.
+
+    Returns:
+        dict: name -> (symbols x bars) array, NaN over warm-up and padding.
+    """
+    wanted = set(COLUMNS if names is None else names)
+    unknown = wanted.difference(COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown indicator columns: {sorted(unknown)}")
+    values: Dict[str, np.ndarray] = {}
+    for group, fn in _GROUPS:
+        if wanted.intersection(group):
+            values.update({k: v for k, v in fn(matrix).items() if k in wanted})
+    logger.debug(f"[Batch] {len(values)} indicator columns for {len(matrix.symbols)} symbols x {matrix.close.shape[1]} bars")
+    return values
+
+
+def per_symbol(matrix: BarMatrix, values: Dict[str, np.ndarray]) -> Dict[str, Dict[str, np.ndarray]]:
+    """symbol -> name -> 1-D array aligned to the symbol's last `length` bars."""
+    width = matrix.close.shape[1]
+    return {
+        symbol: {name: column[row, width - matrix.lengths[row]:] for name, column in values.items()}
+        for row, symbol in enumerate(matrix.symbols)
+    }
+
+
+def latest(matrix: BarMatrix, values: Dict[str, np.ndarray]) -> Dict[str, Dict[str, float]]:
+    """symbol -> name -> value on the symbol's last bar."""
+    return {
+        symbol: {name: float(column[row, -1]) for name, column in values.items()}
+        for row, symbol in enumerate(matrix.symbols)
+    }
+
+
+def compute_frames(frames: Mapping[str, pd.DataFrame], names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Indicator columns for a dict of symbol frames, aligned to each frame's rows.
+
+    Args:
+        frames (dict): symbol -> OHLCV DataFrame.
+        names (iterable, optional): Columns from COLUMNS; all by default.
+
+    Returns:
+        dict: symbol -> name -> array of len(frame) (empty frames are left out).
+    """
+    matrix = stack_ohlc(frames)
+    return per_symbol(matrix, compute(matrix, names))
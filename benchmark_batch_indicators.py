@@ -0,0 +1,96 @@
+"""
+Benchmark: batched (symbols x bars) indicators vs. one symbol at a time.
+
+- A synthetic universe of random-walk OHLC frames with ragged history
+  lengths. The per-symbol path calls indicators.py for every frame (what the
+  scanners did); the batch path stacks the frames once and runs
+  batch_indicators.compute over the whole matrix.
+- Times the scanner columns (ema9, ema21, rsi) and the full column set, and
+  reports the largest deviation between the two paths.
+
+Usage:
+    python benchmark_batch_indicators.py                 # 500 symbols x 200 bars
+    python benchmark_batch_indicators.py 2000 1000       # symbols, bars
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+import batch_indicators
+import indicators
+
+
+def universe(symbols, bars, seed=11):
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(symbols):
+        n = int(rng.integers(bars // 2, bars + 1))
+        close = (1 + i % 50) * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+        spread = np.abs(rng.normal(0, 5e-4, (2, n))) * close
+        frames[f"SYM{i:04d}"] = pd.DataFrame({
+            "open": close, "high": close + spread[0], "low": close - spread[1],
+            "close": close, "volume": rng.integers(100, 1000, n).astype(float),
+        }, index=pd.date_range("2024-01-01", periods=n, freq="h"))
+    return frames
+
+
+def per_symbol(frames, full):
+    out = {}
+    for symbol, df in frames.items():
+        close, high, low = df["close"], df["high"], df["low"]
+        cols = {
+            "ema9": indicators.calculate_ema(close, 9),
+            "ema21": indicators.calculate_ema(close, 21),
+            "rsi": indicators.calculate_rsi(close, 14),
+        }
+        if full:
+            cols["atr"] = indicators.calculate_atr(high, low, close, 14)
+            cols["cci"] = indicators.calculate_cci(high, low, close, 20)
+            cols["williams_r"] = indicators.calculate_williams_r(high, low, close, 14)
+            for frame in (indicators.calculate_macd(close), indicators.calculate_bollinger_bands(close),
+                          indicators.calculate_stochastic_oscillator(high, low, close)):
+                cols.update({name: frame[name] for name in frame.columns})
+        out[symbol] = {name: series.to_numpy() for name, series in cols.items()}
+    return out
+
+
+def max_deviation(expected, got):
+    worst = 0.0
+    for symbol, cols in expected.items():
+        for name, a in cols.items():
+            b = got[symbol][name]
+            valid = ~np.isnan(a)
+            if (np.isnan(b) != ~valid).any():
+                return float("inf")
+            if valid.any():
+                worst = max(worst, float(np.max(np.abs(a[valid] - b[valid]) / np.maximum(np.abs(a[valid]), 1e-9))))
+    return worst
+
+
+def main(argv):
+    symbols = int(argv[0]) if argv else 500
+    bars = int(argv[1]) if len(argv) > 1 else 200
+    frames = universe(symbols, bars)
+    print(f"{symbols} symbols, up to {bars} bars each")
+
+    for label, names in (("scan columns", ("ema9", "ema21", "rsi")), ("all columns", None)):
+        start = time.perf_counter()
+        expected = per_symbol(frames, full=names is None)
+        t_loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matrix = batch_indicators.stack_ohlc(frames)
+        t_stack = time.perf_counter() - start
+        start = time.perf_counter()
+        got = batch_indicators.per_symbol(matrix, batch_indicators.compute(matrix, names))
+        t_batch = time.perf_counter() - start
+
+        print(f"{label:<13} per-symbol {t_loop * 1e3:8.1f}ms   batch {t_batch * 1e3:7.1f}ms "
+              f"(+{t_stack * 1e3:.1f}ms stacking)   speedup {t_loop / (t_batch + t_stack):5.1f}x   "
+              f"max rel dev {max_deviation(expected, got):.1e}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,98 @@
+"""
+Benchmark: end-to-end scan pipeline against recorded provider responses.
+
+- `record` runs the pipeline once online and fills the cassette directory
+  (HTTP_CASSETTE_DIR, default data/cassettes) with every provider response.
+- `replay` runs it repeatedly with no network at all: HTTP, Yahoo downloads,
+  RSS feeds and Reddit JSON are served from the cassette after a simulated
+  latency (--latency / --jitter, milliseconds).
+- Timed stages: scanner_loop.run_scan, core.signal_fusion.generate_trade_decision
+  per symbol and news_feeds.analyze_all_feeds. Telegram sends are captured,
+  the sent-news cache is bypassed and the bar store is disabled, so every
+  replay run does the same work.
+
+Usage:
+    python benchmark_offline_pipeline.py record
+    python benchmark_offline_pipeline.py replay --runs 5 --latency 80 --jitter 30
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+os.environ.setdefault("BAR_STORE_ENABLED", "false")
+
+import news_feeds
+import scanner_loop
+from core.signal_fusion import generate_trade_decision
+from http_replay import cassette, get_replay_stats
+from marketdata import clear_candle_cache
+
+SENT = []
+
+
+async def _capture_send(message, chat_id=None):
+    SENT.append(message)
+
+
+def _isolate() -> None:
+    """Keep runs identical: no Telegram, no sent-news de-duplication across runs."""
+    scanner_loop.send_telegram_message = _capture_send
+    news_feeds.load_cache = lambda *args, **kwargs: {}
+    news_feeds.save_cache = lambda *args, **kwargs: None
+
+
+async def _timed(stage, timings, coro):
+    start = time.perf_counter()
+    result = await coro
+    timings.setdefault(stage, []).append(time.perf_counter() - start)
+    return result
+
+
+async def run_once(symbols, timings):
+    clear_candle_cache()
+    await _timed("run_scan", timings, scanner_loop.run_scan(symbols))
+    clear_candle_cache()
+    for symbol in symbols:
+        await _timed("generate_trade_decision", timings, generate_trade_decision(symbol))
+    alerts, events = await _timed("analyze_all_feeds", timings, asyncio.to_thread(news_feeds.analyze_all_feeds))
+    return alerts, events
+
+
+def _report(timings):
+    for stage, values in timings.items():
+        ms = [v * 1000 for v in values]
+        spread = statistics.pstdev(ms) if len(ms) > 1 else 0.0
+        print(f"{stage:>24}: n={len(ms):<4} mean={statistics.mean(ms):8.1f}ms  "
+              f"min={min(ms):8.1f}ms  max={max(ms):8.1f}ms  sd={spread:6.1f}ms")
+
+
+async def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=None, help="replay latency per response (ms)")
+    parser.add_argument("--jitter", type=float, default=None, help="replay latency jitter (ms)")
+    parser.add_argument("--dir", default=None, help="cassette directory")
+    parser.add_argument("--symbols", default=",".join(scanner_loop.SYMBOLS))
+    args = parser.parse_args(argv)
+
+    cassette.configure(mode=args.mode, directory=args.dir, latency_ms=args.latency, jitter_ms=args.jitter)
+    _isolate()
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    runs = 1 if args.mode == "record" else args.runs
+
+    timings = {}
+    for i in range(runs):
+        SENT.clear()
+        alerts, events = await run_once(symbols, timings)
+        print(f"run {i + 1}/{runs}: {len(SENT)} telegram messages, {len(alerts)} feed alerts, {len(events)} events")
+    _report(timings)
+    print(f"cassette: {get_replay_stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,162 @@
+"""
+Benchmark: columnar ohlc_decoder vs the old per-candle dict decoding.
+
+- Builds large payloads in each provider's wire format (or loads recorded
+  ones), decodes them with both implementations and reports best-of-N timings.
+- Also checks that both produce the same prices.
+
+Usage:
+    python benchmark_ohlc_decoder.py                 # synthetic 5000-candle payloads
+    python benchmark_ohlc_decoder.py 20000 10        # candles, repeats
+    python benchmark_ohlc_decoder.py oanda.json      # recorded OANDA payload (also: yahoo*.json,
+                                                     # alpha*.json, fxpricing*.json)
+"""
+
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+
+from ohlc_decoder import decode_alpha_vantage, decode_fxpricing, decode_oanda, decode_yahoo_chart
+
+
+def make_payloads(n: int):
+    rng = np.random.default_rng(7)
+    close = 1.08 + np.cumsum(rng.normal(0, 0.0005, n))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) + rng.uniform(0, 0.0004, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 0.0004, n)
+    volume = rng.integers(100, 5000, n)
+    times = pd.date_range("2020-01-01", periods=n, freq="h", tz="UTC")
+    iso = times.strftime("%Y-%m-%dT%H:%M:%S.000000000Z")
+    epoch = (times.asi8 // 10**9).tolist()
+    fmt = lambda a: [f"{x:.5f}" for x in a]
+    o, h, l, c = fmt(open_), fmt(high), fmt(low), fmt(close)
+
+    oanda = {"candles": [
+        {"complete": True, "volume": int(volume[i]), "time": iso[i],
+         "mid": {"o": o[i], "h": h[i], "l": l[i], "c": c[i]}}
+        for i in range(n)
+    ]}
+    fxpricing = {"prices": [
+        {"time": times[i].strftime("%Y-%m-%d %H:%M:%S"), "open": o[i], "high": h[i], "low": l[i], "close": c[i]}
+        for i in range(n)
+    ]}
+    yahoo = {"chart": {"result": [{
+        "timestamp": epoch,
+        "indicators": {"quote": [{
+            "open": open_.tolist(), "high": high.tolist(), "low": low.tolist(),
+            "close": close.tolist(), "volume": volume.tolist(),
+        }]},
+    }]}}
+    alpha = {"Time Series FX (60min)": {
+        times[i].strftime("%Y-%m-%d %H:%M:%S"): {"1. open": o[i], "2. high": h[i], "3. low": l[i], "4. close": c[i]}
+        for i in range(n - 1, -1, -1)
+    }}
+    return {"oanda": oanda, "fxpricing": fxpricing, "yahoo": yahoo, "alpha_vantage": alpha}
+
+
+# --- The per-candle code previously in cloudbot_data_integration.py ---
+
+def _rows_to_frame(rows):
+    df = pd.DataFrame(rows)
+    df.set_index("timestamp", inplace=True)
+    df.sort_index(inplace=True)
+    return df
+
+
+def legacy_oanda(data):
+    rows = []
+    for candle in data["candles"]:
+        if candle.get("complete", False):
+            try:
+                mid = candle.get("mid", {})
+                rows.append({"timestamp": pd.to_datetime(candle["time"]), "Open": float(mid["o"]),
+                             "High": float(mid["h"]), "Low": float(mid["l"]), "Close": float(mid["c"])})
+            except (KeyError, ValueError):
+                continue
+    return _rows_to_frame(rows)
+
+
+def legacy_fxpricing(data):
+    rows = []
+    for item in data.get("prices", []):
+        try:
+            rows.append({"timestamp": pd.to_datetime(item["time"]), "Open": float(item["open"]),
+                         "High": float(item["high"]), "Low": float(item["low"]), "Close": float(item["close"])})
+        except (KeyError, ValueError):
+            continue
+    return _rows_to_frame(rows)
+
+
+def legacy_yahoo(data):
+    result = data["chart"]["result"][0]
+    quote = result["indicators"]["quote"][0]
+    rows = []
+    for i, ts in enumerate(result["timestamp"]):
+        try:
+            rows.append({"timestamp": pd.to_datetime(ts, unit="s"), "Open": float(quote["open"][i]),
+                         "High": float(quote["high"][i]), "Low": float(quote["low"][i]),
+                         "Close": float(quote["close"][i])})
+        except (TypeError, ValueError, IndexError):
+            continue
+    return _rows_to_frame(rows)
+
+
+def legacy_alpha_vantage(data):
+    series = next(v for k, v in data.items() if "Time Series" in k)
+    rows = []
+    for timestamp, ohlc in series.items():
+        try:
+            rows.append({"timestamp": pd.to_datetime(timestamp), "Open": float(ohlc["1. open"]),
+                         "High": float(ohlc["2. high"]), "Low": float(ohlc["3. low"]),
+                         "Close": float(ohlc["4. close"])})
+        except (KeyError, ValueError):
+            continue
+    return _rows_to_frame(rows)
+
+
+DECODERS = {
+    "oanda": (legacy_oanda, decode_oanda),
+    "fxpricing": (legacy_fxpricing, decode_fxpricing),
+    "yahoo": (legacy_yahoo, decode_yahoo_chart),
+    "alpha_vantage": (legacy_alpha_vantage, decode_alpha_vantage),
+}
+
+
+def best_of(fn, payload, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = fn(payload)
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def run(payloads, repeats):
+    print(f"{'provider':<14}{'candles':>9}{'per-row ms':>13}{'columnar ms':>13}{'speedup':>9}  match")
+    for provider, payload in payloads.items():
+        legacy, columnar = DECODERS[provider]
+        t_old, old = best_of(legacy, payload, repeats)
+        t_new, new = best_of(columnar, payload, repeats)
+        match = np.allclose(old["Close"].to_numpy(), new["close"].to_numpy())
+        print(f"{provider:<14}{len(new):>9}{1000 * t_old:>13.1f}{1000 * t_new:>13.1f}{t_old / t_new:>8.1f}x  {match}")
+
+
+def main(argv):
+    if argv and argv[0].endswith(".json"):
+        name = argv[0].lower()
+        provider = next((p for p in DECODERS if p.split("_")[0] in name), "oanda")
+        with open(argv[0]) as fh:
+            payloads = {provider: json.load(fh)}
+        repeats = int(argv[1]) if len(argv) > 1 else 5
+    else:
+        n = int(argv[0]) if argv else 5000
+        repeats = int(argv[1]) if len(argv) > 1 else 5
+        payloads = make_payloads(n)
+    run(payloads, repeats)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,97 @@
+"""
+Benchmark: rolling_kernels vs. pandas rolling.apply (and pandas' built-in rollers).
+
+- A 1M-bar random-walk close series. Each kernel runs over the full series;
+  the Python-level rolling.apply baselines (what CCI's MAD used) run over
+  --baseline-bars bars and are scaled linearly to the full length, since
+  they cost the same per window.
+- pandas' compiled rollers are timed on the full series for reference.
+  Means, standard deviations and EWM are not listed: rolling_kernels runs
+  those on pandas' own rollers.
+- Each kernel is also checked against its baseline on the measured prefix.
+
+Usage:
+    python benchmark_rolling_kernels.py                          # 1M bars, baselines on 50k
+    python benchmark_rolling_kernels.py --bars 2000000 --baseline-bars 200000
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+import rolling_kernels as rk
+
+WINDOW = 20
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def cases(window):
+    weights = np.arange(1, window + 1, dtype=np.float64)
+    return [
+        # name, kernel, rolling.apply baseline, pandas built-in (or None)
+        ("max", lambda x: rk.rolling_max(x, window),
+         lambda s: s.rolling(window).apply(np.max, raw=True),
+         lambda s: s.rolling(window).max()),
+        ("min", lambda x: rk.rolling_min(x, window),
+         lambda s: s.rolling(window).apply(np.min, raw=True),
+         lambda s: s.rolling(window).min()),
+        ("mad (CCI)", lambda x: rk.rolling_mad(x, window),
+         lambda s: s.rolling(window).apply(lambda w: (w - w.mean()).abs().mean(), raw=False),
+         None),
+        ("wma", lambda x: rk.rolling_wma(x, window),
+         lambda s: s.rolling(window).apply(lambda w: np.dot(w, weights) / weights.sum(), raw=True),
+         None),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bars", type=int, default=1_000_000)
+    parser.add_argument("--baseline-bars", type=int, default=50_000)
+    parser.add_argument("--window", type=int, default=WINDOW)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    close = 1.10 + np.cumsum(rng.normal(0.0, 1e-4, args.bars))
+    series = pd.Series(close)
+    prefix = series.iloc[: args.baseline_bars]
+    scale = args.bars / len(prefix)
+
+    print(f"{args.bars:,} bars, window {args.window} "
+          f"(rolling.apply measured on {len(prefix):,} bars, scaled x{scale:.0f})")
+    print(f"{'kernel':<10} {'numpy':>9} {'rolling.apply':>14} {'speedup':>9} "
+          f"{'pandas built-in':>16} {'max rel dev':>12}")
+    for name, kernel, apply, builtin in cases(args.window):
+        t_kernel, result = timed(lambda: kernel(close))
+        row = f"{name:<10} {t_kernel * 1e3:7.1f}ms"
+
+        reference = None
+        if apply is not None:
+            t_apply, reference = timed(lambda: apply(prefix))
+            t_apply *= scale
+            row += f" {t_apply:13.1f}s {t_apply / t_kernel:8.0f}x"
+        else:
+            row += f" {'-':>14} {'-':>9}"
+
+        if builtin is not None:
+            t_builtin, full = timed(lambda: builtin(series))
+            row += f" {t_builtin * 1e3:14.1f}ms"
+            reference = full.iloc[: len(prefix)] if reference is None else reference
+        else:
+            row += f" {'-':>16}"
+
+        expected = reference.to_numpy()
+        got = result[: len(prefix)]
+        valid = ~np.isnan(expected)
+        deviation = np.max(np.abs(got[valid] - expected[valid]) / np.maximum(np.abs(expected[valid]), 1e-12))
+        print(row + f" {deviation:12.1e}")
+
+
+if __name__ == "__main__":
+    main()
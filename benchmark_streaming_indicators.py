@@ -0,0 +1,113 @@
+"""
+Benchmark: streaming indicator updates vs. full-history recomputation.
+
+- Synthetic M1 bars (synthetic_market). For each history length the batch
+  functions in indicators.py are run over the whole history to read the last
+  value (what the scanners do today), and an IndicatorStream seeded with the
+  same history is fed the following bars one at a time.
+- Streaming cost per bar stays flat as the history grows; batch cost grows
+  linearly with it.
+- Also reports the largest deviation of streamed values from the batch
+  functions over the whole series.
+
+Usage:
+    python benchmark_streaming_indicators.py                  # 200, 5000, 50000 bars
+    python benchmark_streaming_indicators.py 200 100000       # custom history lengths
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+import indicators
+from streaming_indicators import Bar, IndicatorStream
+from synthetic_market import synthetic_market
+
+UPDATES = 500
+
+
+def batch_last(df):
+    """Every indicator over the full history, last row only."""
+    close, high, low = df["close"], df["high"], df["low"]
+    out = {
+        "ema9": indicators.calculate_ema(close, 9).iloc[-1],
+        "ema21": indicators.calculate_ema(close, 21).iloc[-1],
+        "rsi": indicators.calculate_rsi(close, 14).iloc[-1],
+        "atr": indicators.calculate_atr(high, low, close, 14).iloc[-1],
+        "williams_r": indicators.calculate_williams_r(high, low, close, 14).iloc[-1],
+    }
+    for frame in (
+        indicators.calculate_macd(close),
+        indicators.calculate_bollinger_bands(close),
+        indicators.calculate_stochastic_oscillator(high, low, close),
+    ):
+        out.update(frame.iloc[-1].to_dict())
+    return out
+
+
+def batch_frame(df):
+    close, high, low = df["close"], df["high"], df["low"]
+    frame = pd.DataFrame({
+        "ema9": indicators.calculate_ema(close, 9),
+        "ema21": indicators.calculate_ema(close, 21),
+        "rsi": indicators.calculate_rsi(close, 14),
+        "atr": indicators.calculate_atr(high, low, close, 14),
+        "williams_r": indicators.calculate_williams_r(high, low, close, 14),
+    })
+    return frame.join(indicators.calculate_macd(close)).join(
+        indicators.calculate_bollinger_bands(close)).join(
+        indicators.calculate_stochastic_oscillator(high, low, close))
+
+
+def as_bars(df):
+    times = pd.DatetimeIndex(df.index).values.astype("datetime64[ns]").view("i8") // 10**9
+    rows = df[["open", "high", "low", "close", "volume"]].to_numpy(dtype=np.float64).tolist()
+    return [(int(t), Bar(*row)) for t, row in zip(times, rows)]
+
+
+def check_accuracy(df):
+    expected = batch_frame(df)
+    stream = IndicatorStream()
+    got = pd.DataFrame([stream.update(t, bar) for t, bar in as_bars(df)], index=df.index)
+    worst = []
+    for col in expected.columns:
+        a, b = expected[col].to_numpy(), got[col].to_numpy()
+        scale = np.maximum(np.abs(a), 1e-12)
+        worst.append((np.nanmax(np.abs(a - b) / scale), col, bool((np.isnan(a) == np.isnan(b)).all())))
+    rel, col, nan_match = max(worst)
+    print(f"accuracy over {len(df):,} bars: max relative deviation {rel:.1e} ({col}), "
+          f"warm-up NaNs {'match' if nan_match else 'DIFFER'}")
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or [200, 5000, 50000]
+    df = synthetic_market.bars("EURUSD", "M1", bars=max(sizes) + UPDATES)
+    check_accuracy(df.iloc[-5000:])
+
+    for size in sizes:
+        history, new = df.iloc[-(size + UPDATES):-UPDATES], df.iloc[-UPDATES:]
+
+        stream = IndicatorStream()
+        for t, bar in as_bars(history):
+            stream.update(t, bar)
+        bars = as_bars(new)
+        start = time.perf_counter()
+        for t, bar in bars:
+            stream.update(t, bar)
+        per_bar_stream = (time.perf_counter() - start) / len(bars)
+
+        reps = max(3, min(50, 200_000 // size))
+        window = pd.concat([history, new])
+        start = time.perf_counter()
+        for i in range(reps):
+            batch_last(window.iloc[: size + i + 1])
+        per_bar_batch = (time.perf_counter() - start) / reps
+
+        print(f"{size:>8,} bars history: stream {per_bar_stream * 1e6:8.1f}us/bar   "
+              f"batch recompute {per_bar_batch * 1e3:8.2f}ms/bar   "
+              f"speedup {per_bar_batch / per_bar_stream:8.0f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,89 @@
+"""
+Benchmark: synthetic market generator and the full OHLC pipeline offline.
+
+- Generator throughput for many symbols x many bars.
+- Comparison with the old per-bar mock loop from cloudbot_data_integration.
+- Full pipeline: get_ohlc_many -> bar store -> candle cache -> indicators,
+  with OHLC_SOURCE=synthetic and a throwaway candle store directory.
+
+Usage:
+    python benchmark_synthetic_market.py                 # 300 symbols x 10000 H1 bars
+    python benchmark_synthetic_market.py 500 20000 M15   # symbols, bars, timeframe
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+os.environ["OHLC_SOURCE"] = "synthetic"
+os.environ.setdefault("CANDLE_STORE_DIR", tempfile.mkdtemp(prefix="candles-"))
+
+import numpy as np
+import pandas as pd
+
+from synthetic_market import synthetic_market, synthetic_universe
+
+
+def legacy_mock(limit: int) -> pd.DataFrame:
+    """The per-bar loop previously used by CloudBotDataIntegration._get_ohlc_data_mock."""
+    np.random.seed(42)
+    current_price = 1.08
+    rows = []
+    for timestamp in pd.date_range(end=pd.Timestamp.now(), periods=limit, freq="h"):
+        change = np.random.normal(0, 0.001) * current_price
+        open_price, close_price = current_price, current_price + change
+        high = max(open_price, close_price) + abs(np.random.normal(0, 0.0005)) * current_price
+        low = min(open_price, close_price) - abs(np.random.normal(0, 0.0005)) * current_price
+        rows.append({"timestamp": timestamp, "Open": round(open_price, 5), "High": round(high, 5),
+                     "Low": round(low, 5), "Close": round(close_price, 5)})
+        current_price = close_price
+    return pd.DataFrame(rows).set_index("timestamp")
+
+
+def bench_generator(symbols, bars, timeframe):
+    start = time.perf_counter()
+    frames = synthetic_market.many(symbols, timeframe, bars)
+    elapsed = time.perf_counter() - start
+    total = sum(len(df) for df in frames.values())
+    print(f"generator: {total:,} bars / {len(symbols)} symbols in {elapsed:.2f}s "
+          f"({total / elapsed / 1e6:.1f}M bars/s)")
+
+    start = time.perf_counter()
+    legacy_mock(bars)
+    legacy = time.perf_counter() - start
+    per_symbol = elapsed / len(symbols)
+    print(f"old mock loop: {bars:,} bars for 1 symbol in {legacy:.2f}s "
+          f"({legacy / per_symbol:.0f}x slower per symbol)")
+
+
+async def bench_pipeline(symbols, timeframe):
+    from marketdata import get_ohlc_many, get_candle_cache_stats, clear_candle_cache
+
+    for label in ("cold (full fetch + store)", "warm (candle cache)"):
+        start = time.perf_counter()
+        frames = await get_ohlc_many(symbols, timeframe, bars=200)
+        elapsed = time.perf_counter() - start
+        ok = sum(not df.empty for df in frames.values())
+        print(f"pipeline {label}: {ok}/{len(symbols)} symbols in {elapsed:.2f}s")
+
+    clear_candle_cache()
+    start = time.perf_counter()
+    await get_ohlc_many(symbols, timeframe, bars=200)
+    print(f"pipeline incremental (bar store): {time.perf_counter() - start:.2f}s")
+    print(f"cache stats: {get_candle_cache_stats()}")
+
+
+def main(argv):
+    n_symbols = int(argv[0]) if argv else 300
+    bars = int(argv[1]) if len(argv) > 1 else 10000
+    timeframe = argv[2] if len(argv) > 2 else "H1"
+    symbols = synthetic_universe(n_symbols)
+    bench_generator(symbols, bars, timeframe)
+    asyncio.run(bench_pipeline(symbols, timeframe))
+    print(f"candle store: {os.environ['CANDLE_STORE_DIR']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,61 @@
+"""
+Benchmark: tick-to-bar aggregation throughput.
+
+- Random-walk ticks for many symbols, interleaved like a live feed.
+- Per-tick `add_tick` path and the batched `add_ticks` path.
+
+Usage:
+    python benchmark_tick_aggregator.py              # 50 symbols x 20000 ticks
+    python benchmark_tick_aggregator.py 200 50000    # symbols, ticks per symbol
+"""
+
+import sys
+import time
+import numpy as np
+
+from synthetic_market import synthetic_universe
+from tick_aggregator import TickAggregator
+
+
+def make_ticks(symbols, per_symbol, seed=7, seconds_per_tick=0.5):
+    """About one tick every `seconds_per_tick` per symbol."""
+    rng = np.random.default_rng(seed)
+    n = len(symbols) * per_symbol
+    timestamps = 1_700_000_000 + np.cumsum(rng.exponential(seconds_per_tick / len(symbols), n))
+    owner = rng.integers(len(symbols), size=n)
+    prices = 1.0 + np.cumsum(rng.normal(0, 1e-5, n))
+    return timestamps, owner, prices
+
+
+def main(argv):
+    n_symbols = int(argv[0]) if argv else 50
+    per_symbol = int(argv[1]) if len(argv) > 1 else 20000
+    symbols = synthetic_universe(n_symbols)
+    timestamps, owner, prices = make_ticks(symbols, per_symbol)
+    names = [symbols[i] for i in owner.tolist()]
+
+    closed = [0]
+    aggregator = TickAggregator(on_bar_closed=lambda symbol, tf, bar: closed.__setitem__(0, closed[0] + 1))
+    start = time.perf_counter()
+    add_tick = aggregator.add_tick
+    for symbol, ts, price in zip(names, timestamps.tolist(), prices.tolist()):
+        add_tick(symbol, ts, price)
+    elapsed = time.perf_counter() - start
+    print(f"add_tick: {len(names):,} ticks in {elapsed:.2f}s ({len(names) / elapsed:,.0f} ticks/s), "
+          f"{closed[0]:,} bars closed")
+
+    start = time.perf_counter()
+    snapshots = [aggregator.snapshot(symbol, "H1") for symbol in symbols]
+    print(f"snapshot: {len(snapshots)} H1 snapshots in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    batched = TickAggregator()
+    start = time.perf_counter()
+    for i, symbol in enumerate(symbols):
+        mask = owner == i
+        batched.add_ticks(symbol, timestamps[mask], prices[mask])
+    elapsed = time.perf_counter() - start
+    print(f"add_ticks: {len(names):,} ticks in {elapsed:.2f}s ({len(names) / elapsed:,.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,29 +1,43 @@
 import os
 import asyncio
 import pandas as pd
-from indicators import calculate_ema, calculate_rsi
+from indicator_cache import add_indicator_columns, indicator_columns_many
 from patterns import detect_candle_patterns
 from fibonacci import calculate_fibonacci_levels, match_fibonacci_price
 from logger import log_to_csv
 from charting import generate_pro_chart
-from marketdata import get_ohlc
+from marketdata import get_ohlc, get_ohlc_many
 from pattern_detector import detect_patterns
 from telegramsender import send_telegram_message, send_telegram_photo
+from staleness import data_age, format_age
+
+# Oldest cached bars these scans accept when providers are down (seconds)
+ANALYSIS_MAX_STALENESS_SECONDS = float(os.getenv("ANALYSIS_MAX_STALENESS_SECONDS", "7200"))
+# Indicator columns analyze_symbol needs; scanners fetch them for all symbols at once
+SCAN_INDICATORS = ("ema9", "ema21", "rsi")
 
 print("🧪 botstrategies.py loaded from", __file__)
 
-async def analyze_symbol(df, symbol, timeframe="H1", chat_id=None):
+async def analyze_symbol(df, symbol, timeframe="H1", chat_id=None, precomputed=None):
+    """
+    precomputed: optional SCAN_INDICATORS arrays aligned to df's rows (one
+    entry of indicator_cache.indicator_columns_many); taken from the
+    indicator cache when omitted.
+    """
     if df is None or df.empty:
         print(f"❌ No data returned for {symbol}")
         return []
 
     df.columns = df.columns.str.lower()
+    age = data_age(df)
 
     try:
         print(f"🔧 [1] Starting analysis for {symbol}")
-        df["ema9"] = calculate_ema(df["close"], 9)
-        df["ema21"] = calculate_ema(df["close"], 21)
-        df["rsi"] = calculate_rsi(df["close"], 14)
+        if precomputed:
+            for name in SCAN_INDICATORS:
+                df[name] = precomputed[name]
+        else:
+            add_indicator_columns(df, SCAN_INDICATORS, overwrite=True)
         df = detect_candle_patterns(df)
         df = detect_patterns(df)
 
@@ -62,7 +76,8 @@ async def analyze_symbol(df, symbol, timeframe="H1", chat_id=None):
             "rsi": rsi,
             "ema9": ema9,
             "ema21": ema21,
-            "reasons": reasons
+            "reasons": reasons,
+            "stale_seconds": age
         }
 
         chart_path = generate_pro_chart(df, symbol, timeframe, score, signal, reasons)
@@ -75,6 +90,7 @@ async def analyze_symbol(df, symbol, timeframe="H1", chat_id=None):
                 f"pattern: {pattern}\n"
                 f"rsi: {rsi:.2f} | ema9: {ema9:.4f} | ema21: {ema21:.4f}\n"
                 f"Reasons: {'; '.join(reasons)}"
+                + _stale_note(age)
             )
             await send_telegram_message(msg, chat_id)
             if chart_path:
@@ -87,9 +103,12 @@ async def analyze_symbol(df, symbol, timeframe="H1", chat_id=None):
         print(f"❌ ERROR during analyze_symbol for {symbol}: {e}")
         return []
 
+def _stale_note(age):
+    return f"\n⚠️ Stale data: {format_age(age)} old" if age else ""
+
 # 🔹 Single symbol analysis entry point
 async def analyze_symbol_single(symbol, timeframe="H1"):
-    df = await get_ohlc(symbol, timeframe, bars=200)
+    df = await get_ohlc(symbol, timeframe, bars=200, max_staleness=ANALYSIS_MAX_STALENESS_SECONDS)
     df.rename(columns=lambda x: x.capitalize(), inplace=True)
     if df is None or df.empty:
         return f"❌ No data for {symbol}"
@@ -106,6 +125,7 @@ async def analyze_symbol_single(symbol, timeframe="H1"):
         f"pattern: {r['pattern']}\n"
         f"rsi: {r['rsi']:.2f} | ema9: {r['ema9']:.4f} | ema21: {r['ema21']:.4f}\n"
         f"Reasons: {r['reasons']}"
+        + _stale_note(r["stale_seconds"])
     )
 
 # 🔹 Multiple symbol scanner
@@ -116,15 +136,17 @@ async def analyze_many_symbols():
     ]
     messages = []
 
+    frames = await get_ohlc_many(symbols, timeframe="H1", bars=200, max_staleness=ANALYSIS_MAX_STALENESS_SECONDS)
+    precomputed = indicator_columns_many(frames, SCAN_INDICATORS)
     for symbol in symbols:
         print(f"🔍 Scanning {symbol}...")
-        df = await get_ohlc(symbol, timeframe="H1", bars=200)
+        df = frames.get(symbol)
         if df is None or df.empty:
             print(f"❌ No data for {symbol}")
             messages.append(f"❌ {symbol}: No data")
             continue
 
-        results = await analyze_symbol(df, symbol, "H1")
+        results = await analyze_symbol(df, symbol, "H1", precomputed=precomputed.get(symbol))
         if not results:
             messages.append(f"❌ {symbol}: No signal")
             continue
@@ -136,6 +158,7 @@ async def analyze_many_symbols():
             f"Signal: {r['signal']} | Score: {r['score']}\n"
             f"rsi: {r['rsi']:.2f}, pattern: {r['pattern']}\n"
             f"Reasons: {r['reasons']}"
+            + _stale_note(r["stale_seconds"])
         )
 
     return messages
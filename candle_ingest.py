@@ -0,0 +1,243 @@
+"""
+Bulk ingest of pushed candles (MT5 / TradingView bridges) for the API receiver.
+
+- Payloads hold one or more series (symbol, timeframe, bars) and may be sent as
+  JSON, msgpack or Arrow IPC (selected by Content-Type):
+    JSON / msgpack: {"symbol": "EURUSD", "timeframe": "H1", "data": [...]}
+      or {"timeframe": "H1", "series": [{"symbol": ..., "data": ...}, ...]};
+      `data` is a list of {time, open, high, low, close[, volume]} rows or a
+      dict of equally long columns (the compact form).
+    Arrow IPC stream: one table with symbol[, timeframe], time, open, high,
+      low, close[, volume] columns, any number of symbols.
+- `time` may be epoch seconds, epoch milliseconds or ISO strings (UTC).
+- Decoded bars are merged into the bar store / candle cache
+  (marketdata.ingest_ohlc); analysis runs later from `AnalysisQueue`, one job
+  per symbol/timeframe however many uploads arrived in between.
+- msgpack and pyarrow are imported on first use; a missing package only
+  disables that format.
+"""
+
+import os
+import json
+import asyncio
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ohlc_decoder import frame_from_columns
+
+logger = logging.getLogger(__name__)
+
+INGEST_ANALYSIS_BARS = int(os.getenv("INGEST_ANALYSIS_BARS", "200"))
+INGEST_DEFAULT_TIMEFRAME = os.getenv("INGEST_DEFAULT_TIMEFRAME", "H1")
+
+JSON_TYPES = ("application/json", "text/json")
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+ARROW_TYPES = ("application/vnd.apache.arrow.stream", "application/vnd.apache.arrow.file", "application/x-arrow")
+
+# Bridge timeframe spellings -> timeframe keys
+TIMEFRAME_ALIASES = {
+    "1": "M1", "1M": "M1", "1MIN": "M1",
+    "5": "M5", "5M": "M5", "5MIN": "M5",
+    "15": "M15", "15M": "M15", "15MIN": "M15",
+    "30": "M30", "30M": "M30", "30MIN": "M30",
+    "60": "H1", "1H": "H1",
+    "240": "H4", "4H": "H4",
+    "D": "D1", "1D": "D1", "1440": "D1",
+    "W": "W1", "1W": "W1",
+}
+
+Series = Tuple[str, str, pd.DataFrame]
+
+
+class IngestError(ValueError):
+    """Payload could not be decoded."""
+
+
+class UnsupportedFormat(IngestError):
+    """Content-Type not understood, or its decoder package is missing."""
+
+
+def normalize_timeframe(timeframe: Any) -> str:
+    """'60', '1h', 'PERIOD_H1', 'H1' -> 'H1'."""
+    key = str(timeframe or INGEST_DEFAULT_TIMEFRAME).upper().replace("PERIOD_", "")
+    return TIMEFRAME_ALIASES.get(key, key)
+
+
+def _epoch_unit(times: Any) -> Optional[str]:
+    """Epoch unit of numeric timestamps (seconds vs milliseconds); None for strings."""
+    values = np.asarray(times)
+    if values.dtype.kind not in "iuf" or len(values) == 0:
+        return None
+    return "ms" if np.nanmax(values) > 1e11 else "s"
+
+
+def _frame(data: Any) -> pd.DataFrame:
+    """Rows (list of dicts) or columns (dict of lists) -> standard OHLCV frame."""
+    if isinstance(data, dict):
+        columns = {str(k).lower(): v for k, v in data.items()}
+        if not all(isinstance(v, (list, np.ndarray)) for v in columns.values()):
+            raise IngestError("data columns must be lists")
+    elif isinstance(data, list) and data:
+        if not all(isinstance(row, dict) for row in data):
+            raise IngestError("data rows must be objects")
+        keys = {str(k).lower(): k for k in data[0]}
+        columns = {
+            name: [row.get(keys[name]) for row in data]
+            for name in ("time", "open", "high", "low", "close", "volume")
+            if name in keys
+        }
+    else:
+        raise IngestError("data must be a non-empty list of rows or a dict of columns")
+    missing = [c for c in ("time", "open", "high", "low", "close") if c not in columns]
+    if missing:
+        raise IngestError(f"missing columns: {', '.join(missing)}")
+    times = columns["time"]
+    return frame_from_columns(
+        times, columns["open"], columns["high"], columns["low"], columns["close"],
+        columns.get("volume"), unit=_epoch_unit(times),
+    )
+
+
+def _series_from_document(doc: Any) -> List[Series]:
+    if isinstance(doc, list):
+        doc = {"series": doc}
+    if not isinstance(doc, dict):
+        raise IngestError("payload must be an object or a list of series")
+    default_tf = doc.get("timeframe")
+    items = doc.get("series") if "series" in doc else [doc]
+    if not isinstance(items, list):
+        raise IngestError("series must be a list")
+    out = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise IngestError("every series must be an object")
+        symbol = item.get("symbol")
+        if not symbol or item.get("data") is None:
+            raise IngestError("every series needs symbol and data")
+        timeframe = normalize_timeframe(item.get("timeframe", default_tf))
+        out.append((str(symbol).upper(), timeframe, _frame(item["data"])))
+    return out
+
+
+def _series_from_arrow(body: bytes) -> List[Series]:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise UnsupportedFormat("Arrow payloads need the pyarrow package")
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid:
+        table = pa.ipc.open_file(pa.BufferReader(body)).read_all()
+    df = table.to_pandas()
+    df.columns = [str(c).lower() for c in df.columns]
+    if "symbol" not in df.columns:
+        raise IngestError("Arrow table needs a symbol column")
+    if "timeframe" not in df.columns:
+        df["timeframe"] = INGEST_DEFAULT_TIMEFRAME
+    out = []
+    for (symbol, timeframe), group in df.groupby(["symbol", "timeframe"], sort=False):
+        columns = {c: group[c].to_numpy() for c in group.columns if c not in ("symbol", "timeframe")}
+        out.append((str(symbol).upper(), normalize_timeframe(timeframe), _frame(columns)))
+    return out
+
+
+def decode_payload(body: bytes, content_type: Optional[str]) -> List[Series]:
+    """
+    Decode an upload into (symbol, timeframe, bars) series.
+
+    Args:
+        body (bytes): Raw request body.
+        content_type (str, optional): Request Content-Type (JSON when missing).
+
+    Returns:
+        list: (symbol, timeframe, DataFrame) per series, in payload order.
+
+    Raises:
+        UnsupportedFormat: Unknown Content-Type or missing decoder package.
+        IngestError: Malformed payload.
+    """
+    media_type = (content_type or "application/json").split(";")[0].strip().lower()
+    if media_type in ARROW_TYPES:
+        return _series_from_arrow(body)
+    if media_type in MSGPACK_TYPES:
+        try:
+            import msgpack
+        except ImportError:
+            raise UnsupportedFormat("msgpack payloads need the msgpack package")
+        try:
+            doc = msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise IngestError(f"invalid msgpack: {e}")
+    elif media_type in JSON_TYPES:
+        try:
+            doc = json.loads(body)
+        except ValueError as e:
+            raise IngestError(f"invalid JSON: {e}")
+    else:
+        raise UnsupportedFormat(f"unsupported Content-Type {media_type}")
+    return _series_from_document(doc)
+
+
+Analyzer = Callable[[pd.DataFrame, str, str], Awaitable[Any]]
+
+
+class AnalysisQueue:
+    """
+    Background analysis of ingested symbols, coalescing repeated uploads.
+    """
+
+    def __init__(self, analyzer: Analyzer, bars: int = INGEST_ANALYSIS_BARS):
+        self.analyzer = analyzer
+        self.bars = bars
+        self.results: Dict[str, Any] = {}
+        self.completed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self._queue: "asyncio.Queue[Tuple[str, str]]" = asyncio.Queue()
+        self._queued: set = set()
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name="ingest-analysis")
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+    def submit(self, symbol: str, timeframe: str) -> None:
+        """Queue analysis of symbol/timeframe unless it is already waiting."""
+        key = (symbol, timeframe)
+        if key in self._queued:
+            self.coalesced += 1
+            return
+        self._queued.add(key)
+        self._queue.put_nowait(key)
+
+    async def _run(self) -> None:
+        from bar_store import bar_store
+
+        while True:
+            symbol, timeframe = await self._queue.get()
+            self._queued.discard((symbol, timeframe))
+            try:
+                df = bar_store.tail(symbol, timeframe, self.bars)
+                self.results[symbol] = await self.analyzer(df, symbol, timeframe)
+                self.completed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception(f"[Ingest] Analysis failed for {symbol} {timeframe}")
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "completed": self.completed,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+        }
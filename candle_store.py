@@ -0,0 +1,223 @@
+"""
+Columnar, memory-mapped on-disk candle store.
+
+- One directory per symbol/timeframe holding contiguous little-endian arrays:
+  time.i8 (int64 epoch nanoseconds, UTC) and open/high/low/close/volume.f8 (float64).
+- Reads are `numpy.memmap` views: nothing is loaded into RAM up front, and
+  backtests or worker processes reading the same files share pages through
+  the OS page cache.
+- Time-range slicing is a binary search on the (sorted, unique) time column.
+- Appends write past the stored end; bars overlapping the stored tail are
+  merged and rewritten in place.
+- Single writer per symbol/timeframe; any number of concurrent readers.
+  The time column is extended only after the value columns, so readers never
+  see a timestamp whose values are missing.
+"""
+
+import os
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+CANDLE_STORE_DIR = os.getenv("CANDLE_STORE_DIR", os.path.join("data", "candles"))
+
+VALUE_COLUMNS = ("open", "high", "low", "close", "volume")
+TIME_DTYPE = np.dtype("<i8")
+VALUE_DTYPE = np.dtype("<f8")
+
+TimeLike = Union[str, int, pd.Timestamp, np.datetime64, None]
+
+
+class CandleView(NamedTuple):
+    """
+    Read-only, zero-copy column views of a contiguous run of bars.
+    `time` holds int64 epoch nanoseconds (UTC).
+    """
+    time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def index(self) -> pd.DatetimeIndex:
+        """Naive UTC DatetimeIndex built from the time column."""
+        return pd.DatetimeIndex(self.time.view("M8[ns]"), name="time")
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        DataFrame whose value columns are backed by the mapped arrays (no copy).
+        Callers that need to modify values must `.copy()` first.
+        """
+        data = {col: getattr(self, col) for col in VALUE_COLUMNS}
+        return pd.DataFrame(data, index=self.index(), copy=False)
+
+
+def _to_ns(value: TimeLike) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return int(ts.value)
+
+
+class CandleStore:
+    """
+    Memory-mapped columnar bar files for every symbol and timeframe.
+    """
+
+    def __init__(self, root: str = CANDLE_STORE_DIR):
+        self.root = root
+
+    def _dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol.upper(), timeframe.upper())
+
+    def _path(self, symbol: str, timeframe: str, column: str) -> str:
+        suffix = "i8" if column == "time" else "f8"
+        return os.path.join(self._dir(symbol, timeframe), f"{column}.{suffix}")
+
+    def symbols(self):
+        """Yield (symbol, timeframe) pairs that have stored bars."""
+        if not os.path.isdir(self.root):
+            return
+        for symbol in sorted(os.listdir(self.root)):
+            for timeframe in sorted(os.listdir(os.path.join(self.root, symbol))):
+                if self.length(symbol, timeframe):
+                    yield symbol, timeframe
+
+    def length(self, symbol: str, timeframe: str) -> int:
+        """Number of bars stored for symbol/timeframe."""
+        try:
+            return os.path.getsize(self._path(symbol, timeframe, "time")) // TIME_DTYPE.itemsize
+        except OSError:
+            return 0
+
+    def _map(self, symbol: str, timeframe: str, column: str, length: int) -> np.ndarray:
+        dtype = TIME_DTYPE if column == "time" else VALUE_DTYPE
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._path(symbol, timeframe, column), dtype=dtype, mode="r", shape=(length,))
+
+    def view(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: TimeLike = None,
+        end: TimeLike = None,
+    ) -> CandleView:
+        """
+        Zero-copy views of the bars with start <= time <= end.
+
+        Args:
+            symbol (str): Internal symbol.
+            timeframe (str): Timeframe key ("H1", "D1", ...).
+            start, end (optional): Inclusive bounds (Timestamp, string or epoch ns).
+
+        Returns:
+            CandleView: Read-only memmap slices.
+        """
+        length = self.length(symbol, timeframe)
+        columns = {
+            col: self._map(symbol, timeframe, col, length)
+            for col in ("time",) + VALUE_COLUMNS
+        }
+        times = columns["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, _to_ns(start), side="left"))
+        hi = length if end is None else int(np.searchsorted(times, _to_ns(end), side="right"))
+        return CandleView(**{col: arr[lo:hi] for col, arr in columns.items()})
+
+    def tail(self, symbol: str, timeframe: str, bars: int) -> CandleView:
+        """Zero-copy views of the newest `bars` bars."""
+        full = self.view(symbol, timeframe)
+        return CandleView(*(arr[max(len(full) - bars, 0):] for arr in full))
+
+    def frame(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: TimeLike = None,
+        end: TimeLike = None,
+    ) -> pd.DataFrame:
+        """
+        DataFrame over the memmap views, ready for indicators.py and pattern_detector.py.
+        """
+        return self.view(symbol, timeframe, start, end).to_frame()
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        """Newest stored bar time (naive UTC), or None."""
+        length = self.length(symbol, timeframe)
+        if not length:
+            return None
+        return pd.Timestamp(int(self._map(symbol, timeframe, "time", length)[-1]))
+
+    def append(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """
+        Append bars. New bars inside the stored range are merged in: a stored
+        bar with the same timestamp is replaced, every other stored bar is kept.
+
+        `df` needs a DatetimeIndex (naive = UTC) and open/high/low/close columns;
+        volume is optional (stored as NaN). Columns are matched case-insensitively.
+
+        Returns:
+            int: Number of bars stored after the write.
+        """
+        if df is None or df.empty:
+            return self.length(symbol, timeframe)
+        new = _columnar(df)
+        length = self.length(symbol, timeframe)
+        times = self._map(symbol, timeframe, "time", length)
+        pos = int(np.searchsorted(times, new["time"][0], side="left"))
+
+        if pos < length:
+            # New bars overlap the stored range: merge with the stored tail.
+            old = {col: np.array(self._map(symbol, timeframe, col, length)[pos:])
+                   for col in ("time",) + VALUE_COLUMNS}
+            keep = ~np.isin(old["time"], new["time"])
+            merged_time = np.concatenate([old["time"][keep], new["time"]])
+            order = np.argsort(merged_time, kind="stable")
+            new = {
+                col: np.concatenate([old[col][keep], new[col]])[order]
+                for col in ("time",) + VALUE_COLUMNS
+            }
+
+        os.makedirs(self._dir(symbol, timeframe), exist_ok=True)
+        # Files only ever grow (the merged tail covers every old bar), so live
+        # mappings in other processes stay valid. Time is written last because
+        # its length defines what readers see.
+        for col in VALUE_COLUMNS + ("time",):
+            dtype = TIME_DTYPE if col == "time" else VALUE_DTYPE
+            path = self._path(symbol, timeframe, col)
+            with open(path, "r+b" if os.path.exists(path) else "wb") as fh:
+                fh.seek(pos * dtype.itemsize)
+                new[col].astype(dtype, copy=False).tofile(fh)
+        return pos + len(new["time"])
+
+
+def _columnar(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Sorted, de-duplicated column arrays from an OHLC frame."""
+    df = df.rename(columns=lambda c: str(c).lower())
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    times = index.values.astype("datetime64[ns]").view("i8")
+    order = np.argsort(times, kind="stable")
+    times = times[order]
+    # Keep the last occurrence of duplicated timestamps
+    unique = np.append(times[1:] != times[:-1], True)
+    out = {"time": times[unique]}
+    for col in VALUE_COLUMNS:
+        values = df[col].to_numpy(dtype=np.float64) if col in df.columns else np.full(len(df), np.nan)
+        out[col] = values[order][unique]
+    return out
+
+
+candle_store = CandleStore()
@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 from datetime import datetime
 import asyncio
 
+from indicator_cache import add_indicator_columns
+
 os.makedirs('charts', exist_ok=True)
 
 def generate_pro_chart(df, symbol, timeframe, score=None, signal_type=None, reasons=None):
@@ -14,19 +16,8 @@ def generate_pro_chart(df, symbol, timeframe, score=None, signal_type=None, reas
     df = df.copy()
     df.columns = df.columns.str.lower()  # Standardize to lowercase
 
-    # Calculate indicators if missing
-    if 'ema9' not in df.columns and 'close' in df.columns:
-        df['ema9'] = df['close'].ewm(span=9, adjust=False).mean()
-    if 'ema21' not in df.columns and 'close' in df.columns:
-        df['ema21'] = df['close'].ewm(span=21, adjust=False).mean()
-    if 'rsi' not in df.columns and 'close' in df.columns:
-        delta = df['close'].diff()
-        gain = delta.clip(lower=0)
-        loss = -delta.clip(upper=0)
-        avg_gain = gain.rolling(window=14).mean()
-        avg_loss = loss.rolling(window=14).mean()
-        rs = avg_gain / avg_loss
-        df['rsi'] = 100 - (100 / (1 + rs))
+    # Indicators if missing (from the shared indicator cache)
+    add_indicator_columns(df, ('ema9', 'ema21', 'rsi'))
 
     # Prepare title lines
     title_lines = []
@@ -0,0 +1,253 @@
+"""
+Per-provider circuit breakers and hedged requests for data-source fallback chains.
+
+- Each provider has a breaker (closed / open / half-open) driven by the
+  rolling error rate of its recent calls; calls slower than the breaker's
+  slow-call threshold count as errors too.
+- An open breaker makes the fallback chain skip the provider instantly.
+  After `open_seconds` one trial call is let through (half-open); its outcome
+  closes or re-opens the breaker.
+- Optional hedging: if the primary has not answered within its p95 latency,
+  the next provider is fired as well and the first good answer wins.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BREAKER_WINDOW_SECONDS = float(os.getenv("BREAKER_WINDOW_SECONDS", "300"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "15"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "60"))
+HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("HEDGE_DEFAULT_DELAY_SECONDS", "3"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+ProviderCall = Tuple[str, Callable[[], Awaitable[Any]]]
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker for one provider.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = BREAKER_WINDOW_SECONDS,
+        min_calls: int = BREAKER_MIN_CALLS,
+        error_rate: float = BREAKER_ERROR_RATE,
+        slow_call_seconds: float = BREAKER_SLOW_CALL_SECONDS,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        max_samples: int = 200,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.skipped = 0
+        self._calls: Deque[Tuple[float, bool, float]] = deque(maxlen=max_samples)
+
+    def _prune(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go to this provider now.
+        """
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self.trial_in_flight = False
+            logger.info(f"[Breaker] {self.name} half-open: allowing a trial call")
+        if self.state == HALF_OPEN and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        self.skipped += 1
+        return False
+
+    def record(self, success: bool, latency: float) -> None:
+        """
+        Record one call outcome and update the breaker state.
+        """
+        now = time.monotonic()
+        ok = success and latency <= self.slow_call_seconds
+        self._calls.append((now, ok, latency if success else float("nan")))
+        self._prune(now)
+
+        if self.state == HALF_OPEN:
+            self.trial_in_flight = False
+            if ok:
+                self.state = CLOSED
+                self._calls.clear()
+                logger.info(f"[Breaker] {self.name} closed after successful trial")
+            else:
+                self._open(now)
+            return
+
+        if self.state == CLOSED and len(self._calls) >= self.min_calls:
+            if self.error_rate() >= self.error_rate_threshold:
+                self._open(now)
+
+    def release(self) -> None:
+        """Forget an allowed call that never completed (e.g. it was cancelled)."""
+        if self.state == HALF_OPEN:
+            self.trial_in_flight = False
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        logger.warning(
+            f"[Breaker] {self.name} OPEN for {self.open_seconds:.0f}s "
+            f"(error rate {self.error_rate():.0%} over {len(self._calls)} calls)"
+        )
+
+    def error_rate(self) -> float:
+        if not self._calls:
+            return 0.0
+        return sum(1 for _, ok, _ in self._calls if not ok) / len(self._calls)
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile (seconds) of recent successful calls, or None."""
+        latencies = sorted(lat for _, ok, lat in self._calls if ok)
+        if not latencies:
+            return None
+        rank = min(len(latencies) - 1, max(0, int(round(pct / 100 * (len(latencies) - 1)))))
+        return latencies[rank]
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._prune(time.monotonic())
+        p95 = self.latency_percentile(95)
+        return {
+            "state": self.state,
+            "calls": len(self._calls),
+            "error_rate": self.error_rate(),
+            "p95_ms": None if p95 is None else 1000 * p95,
+            "skipped": self.skipped,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for `name`, creating it on first use."""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(name)
+    return _breakers[name]
+
+
+def get_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every breaker, keyed by provider name."""
+    return {name: b.snapshot() for name, b in sorted(_breakers.items())}
+
+
+def _non_empty(result: Any) -> bool:
+    return result is not None and not getattr(result, "empty", False)
+
+
+async def _timed(name: str, factory: Callable[[], Awaitable[Any]], is_success) -> Tuple[str, Any, bool]:
+    breaker = get_breaker(name)
+    started = time.monotonic()
+    try:
+        result = await factory()
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+    except Exception as e:
+        logger.error(f"[Breaker] {name} raised {type(e).__name__}: {e}")
+        breaker.record(False, time.monotonic() - started)
+        return name, None, False
+    ok = is_success(result)
+    breaker.record(ok, time.monotonic() - started)
+    return name, result, ok
+
+
+async def call_with_breakers(
+    providers: List[ProviderCall],
+    is_success: Callable[[Any], bool] = _non_empty,
+    hedged: bool = False,
+) -> Tuple[Optional[str], Any]:
+    """
+    Walk a provider fallback chain, skipping providers whose breaker is open.
+
+    Args:
+        providers (list): Ordered (name, coroutine factory) pairs.
+        is_success (callable): Decides whether a result counts as success
+            (default: not None and not an empty DataFrame).
+        hedged (bool): Fire the next provider too when the current one has not
+            answered within its p95 latency; the first success wins.
+
+    Returns:
+        tuple: (provider name, result) of the first success, or (None, last result).
+    """
+    # Breakers are consulted right before a provider is actually called: a
+    # half-open breaker hands out its single trial in allow(), and a provider
+    # that is never reached must not hold on to it
+    queue = list(providers)
+
+    def next_allowed() -> Optional[ProviderCall]:
+        while queue:
+            name, factory = queue.pop(0)
+            if get_breaker(name).allow():
+                return name, factory
+            logger.info(f"[Breaker] Skipping open provider: {name}")
+        return None
+
+    last_result = None
+    if not hedged:
+        while True:
+            call = next_allowed()
+            if call is None:
+                return None, last_result
+            name, result, ok = await _timed(call[0], call[1], is_success)
+            if ok:
+                return name, result
+            last_result = result
+
+    pending = set()
+    current = None
+    try:
+        while queue or pending:
+            if not pending:
+                call = next_allowed()
+                if call is None:
+                    break
+                pending.add(asyncio.ensure_future(_timed(call[0], call[1], is_success)))
+                current = call[0]
+            delay = None
+            if queue:
+                p95 = get_breaker(current).latency_percentile(95)
+                delay = p95 if p95 is not None else HEDGE_DEFAULT_DELAY_SECONDS
+            done, pending = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                call = next_allowed()
+                if call is not None:
+                    logger.info(f"[Breaker] {current} slower than p95; hedging with {call[0]}")
+                    pending.add(asyncio.ensure_future(_timed(call[0], call[1], is_success)))
+                    current = call[0]
+                continue
+            for task in done:
+                name, result, ok = task.result()
+                if ok:
+                    return name, result
+                last_result = result
+        return None, last_result
+    finally:
+        for task in pending:
+            task.cancel()
@@ -1,9 +1,11 @@
 import requests
 import os
-import aiohttp
 from datetime import datetime, timedelta
+from http_client import http_client
+from http_replay import recorded
 
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
+requests_get = recorded("http", requests.get)
 
 def get_news_sentiment(symbol):
     if not NEWS_API_KEY:
@@ -32,7 +34,7 @@ def get_news_sentiment(symbol):
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = requests_get(url, params=params, timeout=10)
         response.raise_for_status()
         articles = response.json().get("articles", [])
     except Exception as e:
@@ -74,9 +76,8 @@ async def get_relevant_news():
         'pageSize': 20
     }
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params) as resp:
-            if resp.status == 200:
-                data = await resp.json()
-                return data.get('articles', [])
-            return []
+    async with http_client.request("GET", url, params=params) as resp:
+        if resp.status == 200:
+            data = await resp.json()
+            return data.get('articles', [])
+        return []
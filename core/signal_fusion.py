@@ -3,6 +3,7 @@ Advanced Signal Fusion Module for TomaForexBot
 Combines Technical Analysis, Pattern Recognition, News Sentiment, and Market Structure
 """
 
+import os
 import logging
 import asyncio
 import pandas as pd
@@ -12,10 +13,18 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Oldest data a decision may be built on when providers are down (seconds)
+FUSION_MAX_STALENESS_SECONDS = float(os.getenv("FUSION_MAX_STALENESS_SECONDS", "7200"))
+FUSION_NEWS_MAX_STALENESS_SECONDS = float(os.getenv("FUSION_NEWS_MAX_STALENESS_SECONDS", "21600"))
+
 class AdvancedSignalFusion:
     """
     Advanced trading signal fusion system with multi-timeframe analysis
     """
+
+    # Indicator features used by the technical and market-structure analyses;
+    # planned together, so sma(20) is shared with the Bollinger middle band
+    FEATURES = ("rsi(14)", "macd(12,26,9)", "bb(20,2)", "sma(9)", "sma(21)", "sma(20)", "sma(50)")
     
     def __init__(self):
         # Signal weights (must sum to 1.0)
@@ -37,19 +46,42 @@ class AdvancedSignalFusion:
         
         # Cache for recent signals
         self.recent_signals = {}
+
+        # Age of stale inputs used in this analysis: source -> seconds
+        self.data_age = {}
+
+        # Feature frames of this analysis: (symbol, timeframe, bars, last bar) -> frame
+        self.feature_frames = {}
+
+    async def _ohlc(self, symbol: str, timeframe: str):
+        """get_ohlc with this module's staleness limit; records the age of stale bars."""
+        from marketdata import get_ohlc
+        from staleness import data_age
+
+        df = await get_ohlc(symbol, timeframe, max_staleness=FUSION_MAX_STALENESS_SECONDS)
+        age = data_age(df)
+        if age:
+            self.data_age[f"{symbol} {timeframe}"] = age
+        return df
+
+    def _features(self, symbol: str, timeframe: str, df: pd.DataFrame) -> pd.DataFrame:
+        """FEATURES over df, computed once per bar set and shared by the analyses."""
+        from feature_planner import compute_features
+
+        key = (symbol, timeframe, len(df), df.index[-1])
+        if key not in self.feature_frames:
+            self.feature_frames[key] = compute_features(df, self.FEATURES)
+        return self.feature_frames[key]
     
     async def get_technical_indicators(self, symbol: str, timeframe: str = "H1") -> Dict:
         """
         Comprehensive technical indicator analysis
         """
         try:
-            # Import your existing modules
-            from marketdata import get_ohlc
-            from indicators import calculate_rsi, calculate_macd, calculate_bollinger_bands
-            
-            df = await get_ohlc(symbol, timeframe)
+            df = await self._ohlc(symbol, timeframe)
             if df is None or df.empty:
                 return self._empty_signal("No market data available")
+            features = self._features(symbol, timeframe, df)
             
             signals = []
             score = 0.0
@@ -57,7 +89,7 @@ class AdvancedSignalFusion:
             
             # === RSI Analysis ===
             try:
-                rsi = calculate_rsi(df['close'], 14)
+                rsi = features['rsi(14)']
                 current_rsi = rsi.iloc[-1] if not rsi.empty else 50
                 
                 if current_rsi <= 25:  # Extremely oversold
@@ -82,7 +114,8 @@ class AdvancedSignalFusion:
             
             # === MACD Analysis ===
             try:
-                macd_line, signal_line, histogram = calculate_macd(df['close'])
+                macd_line = features['macd(12,26,9).macd']
+                signal_line = features['macd(12,26,9).signal']
                 if len(macd_line) > 2:
                     current_macd = macd_line.iloc[-1]
                     current_signal = signal_line.iloc[-1]
@@ -112,7 +145,8 @@ class AdvancedSignalFusion:
             
             # === Bollinger Bands Analysis ===
             try:
-                bb_upper, bb_middle, bb_lower = calculate_bollinger_bands(df['close'], 20, 2)
+                bb_upper = features['bb(20,2).upper_band']
+                bb_lower = features['bb(20,2).lower_band']
                 current_price = df['close'].iloc[-1]
                 bb_position = (current_price - bb_lower.iloc[-1]) / (bb_upper.iloc[-1] - bb_lower.iloc[-1])
                 
@@ -136,8 +170,8 @@ class AdvancedSignalFusion:
             
             # === Moving Average Analysis ===
             try:
-                ma_short = df['close'].rolling(window=9).mean()
-                ma_long = df['close'].rolling(window=21).mean()
+                ma_short = features['sma(9)']
+                ma_long = features['sma(21)']
                 current_price = df['close'].iloc[-1]
                 
                 if current_price > ma_short.iloc[-1] > ma_long.iloc[-1]:
@@ -170,10 +204,9 @@ class AdvancedSignalFusion:
         Advanced candlestick pattern recognition with strength scoring
         """
         try:
-            from marketdata import get_ohlc
             from patterns import detect_candle_patterns
             
-            df = await get_ohlc(symbol, timeframe)
+            df = await self._ohlc(symbol, timeframe)
             if df is None or df.empty:
                 return self._empty_signal("No data for pattern analysis")
             
@@ -261,7 +294,9 @@ class AdvancedSignalFusion:
             from news_fetcher import fetch_combined_news
             from news_signal_logic import analyze_multiple_headlines
             
-            headlines = await fetch_combined_news()
+            headlines = await fetch_combined_news(max_staleness=FUSION_NEWS_MAX_STALENESS_SECONDS)
+            if getattr(headlines, "stale", False):
+                self.data_age["news"] = headlines.age_seconds
             if not headlines:
                 return self._empty_signal("No news data available")
             
@@ -321,9 +356,8 @@ class AdvancedSignalFusion:
         Market structure analysis - support/resistance, trend strength
         """
         try:
-            from marketdata import get_ohlc
             
-            df = await get_ohlc(symbol, timeframe)
+            df = await self._ohlc(symbol, timeframe)
             if df is None or df.empty:
                 return self._empty_signal("No data for market structure analysis")
             
@@ -334,8 +368,9 @@ class AdvancedSignalFusion:
             # === Trend Analysis ===
             # Simple trend using price vs moving averages
             if len(df) >= 50:
-                ma_20 = df['close'].rolling(window=20).mean()
-                ma_50 = df['close'].rolling(window=50).mean()
+                features = self._features(symbol, timeframe, df)
+                ma_20 = features['sma(20)']
+                ma_50 = features['sma(50)']
                 current_price = df['close'].iloc[-1]
                 
                 if current_price > ma_20.iloc[-1] > ma_50.iloc[-1]:
@@ -396,9 +431,8 @@ class AdvancedSignalFusion:
         Volume analysis for signal confirmation
         """
         try:
-            from marketdata import get_ohlc
             
-            df = await get_ohlc(symbol, timeframe)
+            df = await self._ohlc(symbol, timeframe)
             if df is None or df.empty or 'volume' not in df.columns:
                 return self._empty_signal("No volume data available")
             
@@ -572,10 +606,13 @@ async def generate_trade_decision(symbol: str, chat_id: int = None) -> Dict:
             "avg_score": final_score,
             "reason": " | ".join(reasons) if reasons else "No clear signals detected",
             "strength": strength,
+            "stale": bool(fusion.data_age),
+            "data_age_seconds": max(fusion.data_age.values(), default=0.0),
             "details": {
                 "individual_signals": all_signals,
                 "weights_used": fusion.weights,
                 "confidence_threshold": fusion.min_confidence,
+                "stale_sources": fusion.data_age,
                 "analysis_timestamp": datetime.now().isoformat()
             }
         }
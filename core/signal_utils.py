@@ -39,6 +39,7 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import json
+from staleness import format_age
 
 logger = logging.getLogger(__name__)
 
@@ -122,6 +123,10 @@ class SignalFormatter:
                 f"Score: **{score:.2f}** | Strength: **{strength}%**",
                 f"Confirmed: {'✅ YES' if confirmed else '❌ NO'}"
             ]
+
+            # Built on cached data while providers were failing
+            if result.get('stale'):
+                msg_parts.append(f"⚠️ Stale data: {format_age(result.get('data_age_seconds', 0))} old")
             
             # Add reason if available
             reason = result.get('reason', '')
@@ -157,11 +162,12 @@ class SignalFormatter:
 
             status = 'YES' if confirmed else 'NO'
             timestamp = datetime.utcnow().isoformat()
+            stale = f" stale={result.get('data_age_seconds', 0):.0f}s" if result.get('stale') else ""
 
             return (
                 f"{timestamp} {symbol} {signal} "
                 f"score={score:.2f} strength={strength}% "
-                f"confirmed={status} reason={clean_reason}"
+                f"confirmed={status}{stale} reason={clean_reason}"
             )
         except Exception as e:
             logger.error(f"Error formatting signal for log: {e}")
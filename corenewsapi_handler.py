@@ -1,7 +1,9 @@
-import aiohttp
 from datetime import datetime, timedelta
 import os
 
+from http_client import http_client
+from request_planner import request_planner
+
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
 NEWS_KEYWORDS = [
@@ -12,6 +14,8 @@ NEWS_KEYWORDS = [
 ]
 
 async def get_relevant_news():
+    if not request_planner.acquire("newsapi", priority="low"):
+        return []
     now = datetime.utcnow()
     since = (now - timedelta(hours=3)).strftime('%Y-%m-%dT%H:%M:%S')
 
@@ -25,15 +29,14 @@ async def get_relevant_news():
         'pageSize': 20
     }
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params) as resp:
-            if resp.status == 200:
-                data = await resp.json()
-                articles = data.get('articles', [])
-                filtered = []
-                for article in articles:
-                    text = (article.get("title", "") + article.get("description", "")).lower()
-                    if any(keyword in text for keyword in NEWS_KEYWORDS):
-                        filtered.append(article)
-                return filtered
-            return []
+    async with http_client.request("GET", url, params=params) as resp:
+        if resp.status == 200:
+            data = await resp.json()
+            articles = data.get('articles', [])
+            filtered = []
+            for article in articles:
+                text = (article.get("title", "") + article.get("description", "")).lower()
+                if any(keyword in text for keyword in NEWS_KEYWORDS):
+                    filtered.append(article)
+            return filtered
+        return []
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Synthetic FX cross rates from USD legs.
+
+- A cross such as EURJPY is built from the USD pairs of its two currencies
+  (EURJPY = EURUSD × USDJPY, EURGBP = EURUSD / GBPUSD,
+  CADCHF = USDCHF / USDCAD), so only the seven USD majors are ever fetched
+  from providers.
+- Leg bars are aligned on their common timestamps; a bar missing in either
+  leg is missing in the cross.
+- open / close are exact products of the leg opens / closes (bar boundaries
+  are the same instants for both legs).
+- high / low cannot be recovered exactly: the legs need not reach their
+  extremes at the same moment. The true cross high always lies within
+      [max(open, close), product of the leg highs]
+  (leg low instead of high for an inverted leg), and the low symmetrically
+  within [product of the leg lows, min(open, close)]. The reported value sits
+  CROSS_RANGE_WEIGHT of the way from the inner to the outer bound
+  (1 = widest possible range, 0 = body only).
+- volume is the smaller leg tick volume (indicative only).
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
+
+CROSS_RATES_ENABLED = os.getenv("CROSS_RATES_ENABLED", "true").lower() == "true"
+CROSS_RANGE_WEIGHT = float(os.getenv("CROSS_RANGE_WEIGHT", "0.5"))
+
+# Currency -> (USD pair, True when the pair quotes the currency per USD)
+USD_LEGS = {
+    "EUR": ("EURUSD", False),
+    "GBP": ("GBPUSD", False),
+    "AUD": ("AUDUSD", False),
+    "NZD": ("NZDUSD", False),
+    "JPY": ("USDJPY", True),
+    "CHF": ("USDCHF", True),
+    "CAD": ("USDCAD", True),
+}
+
+Leg = Tuple[str, int]  # (USD pair, exponent +1 / -1)
+
+
+def cross_legs(symbol: str) -> Optional[List[Leg]]:
+    """
+    USD legs of a cross and the exponent each enters with.
+
+    Returns:
+        list: [(pair, +1 or -1), (pair, +1 or -1)], or None when `symbol` is
+        not a cross of two USD_LEGS currencies (USD pairs included).
+    """
+    symbol = symbol.upper()
+    base, quote = symbol[:3], symbol[3:]
+    if len(symbol) != 6 or base not in USD_LEGS or quote not in USD_LEGS or base == quote:
+        return None
+    # base/quote = usd_value(base) / usd_value(quote)
+    base_pair, base_inverted = USD_LEGS[base]
+    quote_pair, quote_inverted = USD_LEGS[quote]
+    return [(base_pair, -1 if base_inverted else 1), (quote_pair, 1 if quote_inverted else -1)]
+
+
+def is_cross(symbol: str) -> bool:
+    """True for symbols served by derive_cross when cross rates are enabled."""
+    return CROSS_RATES_ENABLED and cross_legs(symbol) is not None
+
+
+def derive_cross(
+    legs: Sequence[Tuple[pd.DataFrame, int]],
+    range_weight: float = CROSS_RANGE_WEIGHT,
+) -> pd.DataFrame:
+    """
+    Cross OHLCV bars from aligned leg bars.
+
+    Args:
+        legs (list): (leg OHLC DataFrame, exponent) pairs, as from cross_legs.
+        range_weight (float): Position of high/low between the inner (0) and outer (1) bound.
+
+    Returns:
+        pd.DataFrame: open/high/low/close/volume on the legs' common timestamps
+        (empty when a leg is empty or they share no timestamps).
+    """
+    if not legs or any(df is None or df.empty for df, _ in legs):
+        return pd.DataFrame()
+    index = legs[0][0].index
+    for df, _ in legs[1:]:
+        index = index.intersection(df.index)
+    if index.empty:
+        return pd.DataFrame()
+
+    n = len(index)
+    open_, close = np.ones(n), np.ones(n)
+    outer_high, outer_low = np.ones(n), np.ones(n)
+    volume = None
+    for df, exponent in legs:
+        leg = df.loc[index]
+        o, h, l, c = (leg[col].to_numpy(dtype=np.float64) for col in ("open", "high", "low", "close"))
+        if exponent < 0:
+            o, h, l, c = 1 / o, 1 / l, 1 / h, 1 / c
+        open_ *= o
+        close *= c
+        outer_high *= h
+        outer_low *= l
+        if "volume" in leg.columns:
+            v = leg["volume"].to_numpy(dtype=np.float64)
+            volume = v if volume is None else np.minimum(volume, v)
+
+    inner_high = np.maximum(open_, close)
+    inner_low = np.minimum(open_, close)
+    out = pd.DataFrame(
+        {
+            "open": open_,
+            "high": inner_high + range_weight * (np.maximum(outer_high, inner_high) - inner_high),
+            "low": inner_low - range_weight * (inner_low - np.minimum(outer_low, inner_low)),
+            "close": close,
+            "volume": volume if volume is not None else np.zeros(n),
+        },
+        index=index,
+    )
+    return out
+
+
+def derive_cross_from(symbol: str, frames: Dict[str, pd.DataFrame], bars: Optional[int] = None) -> pd.DataFrame:
+    """
+    Cross `symbol` from leg frames keyed by pair (e.g. get_ohlc_many output).
+
+    Args:
+        symbol (str): Cross symbol ("EURJPY").
+        frames (dict): pair -> OHLCV DataFrame; must contain both legs.
+        bars (int, optional): Keep only the last `bars` bars.
+    """
+    legs = cross_legs(symbol)
+    if legs is None:
+        raise ValueError(f"{symbol} is not a USD-leg cross")
+    df = derive_cross([(frames.get(pair, pd.DataFrame()), exponent) for pair, exponent in legs])
+    if bars is not None:
+        df = df.tail(bars)
+    df.attrs["derived_from"] = [pair for pair, _ in legs]
+    return df
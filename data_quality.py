@@ -0,0 +1,300 @@
+"""
+Validation and normalization of provider OHLCV frames before analysis.
+
+- Every provider frame passes through `validate_ohlc` once, right after the
+  fetch and before the bar store, the candle cache or any indicator sees it.
+- All checks run on whole numpy arrays in a single pass:
+  - index: sorted, unique timestamps (the newest copy of a duplicate wins);
+  - rows without a usable close (NaN / <= 0) are dropped, missing opens are
+    taken from the previous close and missing highs / lows from the body;
+  - OHLC consistency: high >= max(open, close) and low <= min(open, close),
+    repaired by widening high / low;
+  - flat fills (zero-range bar repeating the previous close with no volume)
+    and, for intraday bars of symbols that do not trade 24/7, bars inside
+    the FX weekend closure (Yahoo's =X feeds) are dropped;
+  - price spikes: a close whose return in and out of the bar both exceed
+    DQ_MAD_THRESHOLD rolling MADs (over DQ_MAD_WINDOW returns) in opposite
+    directions is replaced by the geometric mean of its neighbours, and wicks
+    beyond the same bound are clipped;
+  - gaps against the expected bar grid (weekends excluded) and off-grid
+    timestamps are counted, never filled.
+- The per-frame report is attached as df.attrs["data_quality"] and
+  aggregated per provider (`get_data_quality_stats`, shown in /status).
+"""
+
+import os
+import time
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional
+
+from resampler import SESSION_CLOSE_HOUR, SESSION_TZ, TIMEFRAME_FREQ
+
+logger = logging.getLogger(__name__)
+
+DATA_QUALITY_ENABLED = os.getenv("DATA_QUALITY_ENABLED", "true").lower() == "true"
+DQ_MAD_WINDOW = int(os.getenv("DQ_MAD_WINDOW", "50"))
+DQ_MAD_THRESHOLD = float(os.getenv("DQ_MAD_THRESHOLD", "10"))
+DQ_MIN_SPIKE_BARS = int(os.getenv("DQ_MIN_SPIKE_BARS", "20"))
+# Symbols that trade through the weekend (no closure filtering / weekend gaps)
+DQ_ALWAYS_OPEN_SYMBOLS = {
+    s.strip().upper()
+    for s in os.getenv("DQ_ALWAYS_OPEN_SYMBOLS", "BTCUSD,ETHUSD,LTCUSD,XRPUSD,SOLUSD").split(",")
+    if s.strip()
+}
+
+# Report counters, in display order
+ISSUES = (
+    "duplicates", "unsorted", "bad_close", "weekend", "filled", "inconsistent",
+    "flat_fills", "zero_range", "spikes", "wick_spikes", "gaps", "missing_bars", "off_grid",
+)
+# Counters that mean bars were changed or removed (the rest are informational)
+REPAIRS = ("duplicates", "bad_close", "weekend", "filled", "inconsistent", "flat_fills", "spikes", "wick_spikes")
+
+_INTRADAY = {"M1", "M5", "M15", "M30", "H1", "H4"}
+_WEEK = 7 * 86400
+_TRADING_WEEK = 5 * 86400
+# Minimum MAD scale (log return), so flat stretches do not make every tick an outlier
+_MIN_SCALE = 1e-5
+
+
+def _trading_seconds(ns: np.ndarray) -> np.ndarray:
+    """
+    Epoch nanoseconds -> seconds of FX trading time (weekend closures removed).
+
+    Times are shifted so the Friday session close falls on Saturday 00:00 and
+    the Sunday open on Monday 00:00; each week then holds five trading days.
+    """
+    local = pd.DatetimeIndex(ns).tz_localize("UTC").tz_convert(SESSION_TZ).tz_localize(None)
+    shifted = local.asi8 // 10**9 + (24 - SESSION_CLOSE_HOUR) * 3600 + 3 * 86400  # epoch Thursday -> Monday
+    week, offset = np.divmod(shifted, _WEEK)
+    return week * _TRADING_WEEK + np.minimum(offset, _TRADING_WEEK)
+
+
+def _market_closed(ns: np.ndarray) -> np.ndarray:
+    """True for timestamps inside the FX weekend closure (vectorised fx_market_open)."""
+    local = pd.DatetimeIndex(ns).tz_localize("UTC").tz_convert(SESSION_TZ).tz_localize(None)
+    shifted = local.asi8 // 10**9 + (24 - SESSION_CLOSE_HOUR) * 3600 + 3 * 86400
+    return shifted % _WEEK >= _TRADING_WEEK
+
+
+def _rolling_scale(returns: np.ndarray, window: int):
+    """
+    Median and robust scale (1.4826 × MAD) of the `window` returns before each
+    return (the first window's statistics for the warm-up), as arrays.
+    """
+    window = max(2, min(window, len(returns)))
+    windows = np.lib.stride_tricks.sliding_window_view(returns, window)
+    med = np.median(windows, axis=1)
+    scale = 1.4826 * np.median(np.abs(windows - med[:, None]), axis=1)
+    which = np.clip(np.arange(len(returns)) - window, 0, len(windows) - 1)
+    return med[which], np.maximum(scale[which], _MIN_SCALE)
+
+
+def _empty_report(bars: int) -> Dict[str, int]:
+    report = {"bars_in": bars, "bars_out": bars}
+    report.update({issue: 0 for issue in ISSUES})
+    return report
+
+
+def validate_ohlc(
+    df: pd.DataFrame,
+    timeframe: str,
+    symbol: str = "",
+    provider: str = "unknown",
+    record: bool = True,
+) -> pd.DataFrame:
+    """
+    Repair or drop bad bars in a provider OHLCV frame.
+
+    Args:
+        df (pd.DataFrame): Provider frame (any column case, DatetimeIndex).
+        timeframe (str): Timeframe key ("H1", "D1", ...) defining the bar grid.
+        symbol (str): Symbol, for the weekend rule and log messages.
+        provider (str): Provider the frame came from (per-provider stats).
+        record (bool): Add the report to the process-wide quality monitor.
+
+    Returns:
+        pd.DataFrame: Cleaned copy (same columns and index type) with the
+        report in df.attrs["data_quality"]; frames without a DatetimeIndex or
+        OHLC columns are returned unchanged.
+    """
+    if not DATA_QUALITY_ENABLED or df is None or df.empty or not isinstance(df.index, pd.DatetimeIndex):
+        return df
+    names = {str(c).lower(): c for c in df.columns}
+    if not all(col in names for col in ("open", "high", "low", "close")):
+        return df
+
+    report = _empty_report(len(df))
+    ns = df.index.values.astype("datetime64[ns]").view("i8")  # UTC nanoseconds for naive and tz-aware indexes alike
+
+    # Sorted, unique index (last copy of a timestamp wins)
+    if np.all(ns[1:] >= ns[:-1]):
+        order = np.arange(len(ns))
+    else:
+        order = np.argsort(ns, kind="stable")
+        report["unsorted"] = 1
+    sorted_ns = ns[order]
+    keep = np.ones(len(order), dtype=bool)
+    keep[:-1] = sorted_ns[1:] != sorted_ns[:-1]
+    report["duplicates"] = int((~keep).sum())
+    pos = order[keep]
+
+    o, h, l, c = (df[names[col]].to_numpy(dtype=np.float64)[pos] for col in ("open", "high", "low", "close"))
+    v = df[names["volume"]].to_numpy(dtype=np.float64)[pos] if "volume" in names else np.zeros(len(pos))
+
+    # Unusable closes and weekend bars are dropped
+    drop = ~(np.isfinite(c) & (c > 0))
+    report["bad_close"] = int(drop.sum())
+    if timeframe.upper() in _INTRADAY and symbol.upper() not in DQ_ALWAYS_OPEN_SYMBOLS:
+        weekend = _market_closed(ns[pos]) & ~drop
+        report["weekend"] = int(weekend.sum())
+        drop |= weekend
+    if drop.any():
+        keep = ~drop
+        pos, o, h, l, c, v = pos[keep], o[keep], h[keep], l[keep], c[keep], v[keep]
+    if not len(pos):
+        report["bars_out"] = 0
+        return _finish(df.iloc[pos], report, symbol, timeframe, provider, record)
+
+    # Missing open / high / low filled from the previous close and the body
+    prev_close = np.concatenate(([c[0]], c[:-1]))
+    bad_o = ~(np.isfinite(o) & (o > 0))
+    bad_h = ~(np.isfinite(h) & (h > 0))
+    bad_l = ~(np.isfinite(l) & (l > 0))
+    report["filled"] = int(bad_o.sum() + bad_h.sum() + bad_l.sum())
+    o = np.where(bad_o, prev_close, o)
+    h = np.where(bad_h, np.nan, h)
+    l = np.where(bad_l, np.nan, l)
+    body_hi, body_lo = np.maximum(o, c), np.minimum(o, c)
+    report["inconsistent"] = int(((h < body_hi) | (l > body_lo) | (h < l)).sum())
+    h, l = np.fmax(h, body_hi), np.fmin(l, body_lo)
+    v = np.where(np.isfinite(v), v, 0.0)
+
+    # Flat fills: zero-range bar repeating the previous close, no volume
+    zero = h == l
+    flat = zero & (c == prev_close) & (v == 0)
+    flat[0] = False
+    report["zero_range"] = int(zero.sum())
+    report["flat_fills"] = int(flat.sum())
+    if flat.any():
+        keep = ~flat
+        pos, o, h, l, c, v = pos[keep], o[keep], h[keep], l[keep], c[keep], v[keep]
+
+    # Spikes: rolling MAD of log returns
+    if len(c) >= DQ_MIN_SPIKE_BARS:
+        r = np.diff(np.log(c))
+        med, scale = _rolling_scale(r, DQ_MAD_WINDOW)
+        z = (r - med) / scale
+        # Bar k spiked when the return into it and out of it are both outliers of opposite sign
+        into, out = z[:-1], z[1:]
+        spike = np.zeros(len(c), dtype=bool)
+        spike[1:-1] = (np.abs(into) > DQ_MAD_THRESHOLD) & (np.abs(out) > DQ_MAD_THRESHOLD) & (into * out < 0)
+        report["spikes"] = int(spike.sum())
+        if spike.any():
+            k = np.flatnonzero(spike)
+            old = c[k]
+            c[k] = np.sqrt(c[k - 1] * c[k + 1])
+            o[k] = c[k - 1]
+            h[k], l[k] = np.maximum(o[k], c[k]), np.minimum(o[k], c[k])
+            # Next bar usually opens at the bad print
+            nxt = k + 1
+            o[nxt] = np.where(np.isclose(o[nxt], old), c[k], o[nxt])
+            h[nxt], l[nxt] = np.maximum(h[nxt], np.maximum(o[nxt], c[nxt])), np.minimum(l[nxt], np.minimum(o[nxt], c[nxt]))
+        # Wicks further from the body than the same robust bound
+        bar_scale = np.concatenate(([scale[0]], scale)) * DQ_MAD_THRESHOLD
+        body_hi, body_lo = np.maximum(o, c), np.minimum(o, c)
+        upper, lower = body_hi * np.exp(bar_scale), body_lo * np.exp(-bar_scale)
+        wick = (h > upper) | (l < lower)
+        report["wick_spikes"] = int(wick.sum())
+        h, l = np.minimum(h, upper), np.maximum(l, lower)
+
+    # Gaps against the bar grid (reported only)
+    step = int(pd.Timedelta(TIMEFRAME_FREQ.get(timeframe.upper(), "1h")).total_seconds())
+    kept_ns = ns[pos]
+    if len(kept_ns) > 1:
+        if timeframe.upper() in _INTRADAY or timeframe.upper() == "D1":
+            seconds = (kept_ns // 10**9 if symbol.upper() in DQ_ALWAYS_OPEN_SYMBOLS
+                       else _trading_seconds(kept_ns))
+            delta = np.diff(seconds)
+            missing = np.maximum(np.round(delta / step).astype(np.int64) - 1, 0)
+            report["gaps"] = int((missing > 0).sum())
+            report["missing_bars"] = int(missing.sum())
+        if step < 4 * 3600:
+            report["off_grid"] = int(((kept_ns // 10**9) % step != 0).sum())
+
+    out = df.iloc[pos].copy()
+    for col, values in (("open", o), ("high", h), ("low", l), ("close", c)):
+        out[names[col]] = values
+    if "volume" in names:
+        out[names["volume"]] = v
+    report["bars_out"] = len(out)
+    return _finish(out, report, symbol, timeframe, provider, record)
+
+
+def _finish(df: pd.DataFrame, report: Dict[str, int], symbol: str, timeframe: str, provider: str, record: bool) -> pd.DataFrame:
+    df.attrs["data_quality"] = report
+    if record:
+        quality_monitor.record(provider, report, f"{symbol} {timeframe}".strip())
+    if any(report[issue] for issue in REPAIRS):
+        logger.warning(f"[Quality] {provider} {symbol} {timeframe}: {summarize(report)}")
+    return df
+
+
+def summarize(report: Dict[str, int]) -> str:
+    """'2 duplicates, 1 spikes, 3 gaps (5 missing_bars)' style one-liner."""
+    parts = [f"{report[issue]} {issue}" for issue in ISSUES if report.get(issue)]
+    return ", ".join(parts) if parts else "clean"
+
+
+class QualityMonitor:
+    """
+    Running data-quality totals per provider.
+    """
+
+    def __init__(self):
+        self._providers: Dict[str, Dict[str, Any]] = {}
+        # Yahoo frames are validated on pool threads too
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, report: Dict[str, int], label: str = "") -> None:
+        """Add one frame report to `provider`'s totals."""
+        repaired = any(report[issue] for issue in REPAIRS)
+        with self._lock:
+            stats = self._providers.get(provider)
+            if stats is None:
+                stats = self._providers[provider] = {
+                    "frames": 0, "frames_repaired": 0, "bars_in": 0, "bars_out": 0,
+                    **{issue: 0 for issue in ISSUES},
+                    "last_issue": None, "last_issue_at": None,
+                }
+            stats["frames"] += 1
+            stats["frames_repaired"] += repaired
+            for field in ("bars_in", "bars_out") + ISSUES:
+                stats[field] += report.get(field, 0)
+            if repaired:
+                stats["last_issue"] = f"{label}: {summarize(report)}"
+                stats["last_issue_at"] = time.time()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Totals per provider plus clean_rate (share of frames needing no repair)."""
+        with self._lock:
+            out = {name: dict(stats) for name, stats in sorted(self._providers.items())}
+        for stats in out.values():
+            stats["clean_rate"] = 1 - stats["frames_repaired"] / stats["frames"] if stats["frames"] else 1.0
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._providers.clear()
+
+
+quality_monitor = QualityMonitor()
+
+
+def get_data_quality_stats(provider: Optional[str] = None) -> Dict[str, Any]:
+    """Per-provider data-quality totals (one provider's when `provider` is given)."""
+    stats = quality_monitor.snapshot()
+    return stats.get(provider, {}) if provider is not None else stats
@@ -5,6 +5,9 @@ import requests
 from datetime import datetime, timedelta
 import pandas as pd
 import feedparser
+from http_replay import recorded
+
+parse_feed = recorded("feeds", feedparser.parse)  # replayable offline, see http_replay
 
 CALENDAR_SOURCES = [
     'https://nfs.faireconomy.media/ff_calendar_thisweek.xml',  # ForexFactory RSS for this week
@@ -41,7 +44,7 @@ def fetch_all_calendar():
     entries = []
     for url in CALENDAR_SOURCES:
         try:
-            feed = feedparser.parse(url)
+            feed = parse_feed(url)
             for item in feed.entries:
                 title = getattr(item, 'title', '')
                 summary = getattr(item, 'summary', '')
@@ -0,0 +1,248 @@
+"""
+Declarative indicator planner: strategies name the features they need, the
+planner computes each shared piece once.
+
+- Features are declared as strings: "rsi(14)", "macd(12,26,9)", "bb(20,2)",
+  "sma(20)", "ema(9)", "wma(10)", "atr(14)", "stoch(14,3)", "cci(20)",
+  "williams_r(14)". Omitted parameters take the defaults of indicators.py.
+- Each feature expands into a DAG of primitive nodes (diff, gains/losses,
+  rolling means, EMAs, ...). Nodes are deduplicated by (op, inputs,
+  parameters), so bb(20,2) and sma(20) share one SMA, rsi(14) and rsi(21)
+  share the diff and gain/loss series, and stoch(14,3) and williams_r(14)
+  share the 14-bar high/low.
+- A FeaturePlan runs its nodes once, in dependency order, into a single
+  feature frame. Single-output features are columns named by their canonical
+  spec ("rsi(14)"); multi-output ones add the output name
+  ("macd(12,26,9).signal"). select() returns one feature's outputs under the
+  column names indicators.py uses, for the *_signal helpers.
+- The node functions are the batch_indicators / rolling_kernels building
+  blocks, so values match the indicators.py functions.
+"""
+
+import re
+import logging
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+
+import batch_indicators as bi
+import rolling_kernels as rk
+
+logger = logging.getLogger(__name__)
+
+NodeKey = Tuple[str, Tuple[int, ...], Tuple[Any, ...]]
+
+# Primitive node operations: op -> fn(*input arrays, *params)
+OPS: Dict[str, Callable[..., np.ndarray]] = {
+    "diff": rk.diff,
+    "started": rk.started,
+    "gains": bi.gains,
+    "losses": bi.losses,
+    "sma": rk.rolling_mean,
+    "ema": rk.ema,
+    "wma": rk.rolling_wma,
+    "std": rk.rolling_std,
+    "mad": rk.rolling_mad,
+    "max": rk.rolling_max,
+    "min": rk.rolling_min,
+    "carry_nonzero": bi.carry_nonzero,
+    "rsi": bi.rsi_from_averages,
+    "sub": np.subtract,
+    "add": np.add,
+    "scale": np.multiply,
+    "true_range": bi.true_range,
+    "typical_price": bi.typical_price,
+    "percent_k": bi.percent_k,
+    "percent_r": bi.percent_r,
+    "cci": bi.cci_from,
+}
+
+
+class FeaturePlan:
+    """
+    Deduplicated node DAG for a set of declared features.
+
+    Attributes:
+        features (list): Canonical feature specs, in declaration order.
+        columns (dict): Output column -> node id.
+        requested (int): Nodes the features asked for before deduplication.
+    """
+
+    def __init__(self, features: Iterable[str]):
+        self.features: List[str] = list(dict.fromkeys(canonical(f) for f in features))
+        self._nodes: List[NodeKey] = []
+        self._ids: Dict[NodeKey, int] = {}
+        self.requested = 0
+        self.columns: Dict[str, int] = {}
+        for spec in self.features:
+            name, params = parse(spec)
+            outputs = FEATURES[name][2](self, *params)
+            if isinstance(outputs, dict):
+                self.columns.update({f"{spec}.{out}": node for out, node in outputs.items()})
+            else:
+                self.columns[spec] = outputs
+
+    def node(self, op: str, *inputs: int, params: Tuple[Any, ...] = ()) -> int:
+        """Id of the node computing `op` over `inputs`, created if not planned yet."""
+        self.requested += 1
+        key = (op, inputs, params)
+        if key not in self._ids:
+            self._ids[key] = len(self._nodes)
+            self._nodes.append(key)
+        return self._ids[key]
+
+    def input(self, column: str) -> int:
+        return self.node("input", params=(column,))
+
+    def stats(self) -> Dict[str, int]:
+        """Planned vs. requested nodes (requested - nodes = shared subexpressions)."""
+        return {"features": len(self.features), "nodes": len(self._nodes),
+                "requested": self.requested, "shared": self.requested - len(self._nodes)}
+
+    def run(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Evaluate every node once over `df`'s OHLC columns (any case).
+
+        Returns:
+            DataFrame: One column per feature output, aligned to df's index.
+        """
+        columns = {str(c).lower(): c for c in df.columns}
+        values: List[np.ndarray] = []
+        for op, inputs, params in self._nodes:
+            if op == "input":
+                values.append(df[columns[params[0]]].to_numpy(dtype=np.float64, na_value=np.nan))
+            else:
+                values.append(OPS[op](*(values[i] for i in inputs), *params))
+        logger.debug(f"[Features] {len(self._nodes)} nodes for {len(self.features)} features over {len(df)} bars")
+        return pd.DataFrame({column: values[node] for column, node in self.columns.items()}, index=df.index)
+
+
+# --- Feature definitions: plan, *params -> node id or {output: node id} ---
+
+def _moving(op: str) -> Callable[[FeaturePlan, int], int]:
+    return lambda p, period: p.node(op, p.input("close"), params=(period,))
+
+
+def _rsi(p: FeaturePlan, period: int) -> int:
+    close = p.input("close")
+    delta, warm = p.node("diff", close), p.node("started", close)
+    avg_gain = p.node("sma", p.node("gains", delta, warm), params=(period,))
+    avg_loss = p.node("carry_nonzero", p.node("sma", p.node("losses", delta, warm), params=(period,)))
+    return p.node("rsi", avg_gain, avg_loss)
+
+
+def _macd(p: FeaturePlan, fast: int, slow: int, signal: int) -> Dict[str, int]:
+    close = p.input("close")
+    line = p.node("sub", p.node("ema", close, params=(fast,)), p.node("ema", close, params=(slow,)))
+    smoothed = p.node("ema", line, params=(signal,))
+    return {"macd": line, "signal": smoothed, "histogram": p.node("sub", line, smoothed)}
+
+
+def _bb(p: FeaturePlan, period: int, num_std: float) -> Dict[str, int]:
+    close = p.input("close")
+    middle = p.node("sma", close, params=(period,))
+    width = p.node("scale", p.node("std", close, params=(period,)), params=(num_std,))
+    return {"middle_band": middle, "upper_band": p.node("add", middle, width), "lower_band": p.node("sub", middle, width)}
+
+
+def _atr(p: FeaturePlan, period: int) -> int:
+    tr = p.node("true_range", p.input("high"), p.input("low"), p.input("close"))
+    return p.node("sma", tr, params=(period,))
+
+
+def _stoch(p: FeaturePlan, k_period: int, d_period: int) -> Dict[str, int]:
+    lowest = p.node("min", p.input("low"), params=(k_period,))
+    highest = p.node("max", p.input("high"), params=(k_period,))
+    k = p.node("percent_k", p.input("close"), lowest, highest)
+    return {"%K": k, "%D": p.node("sma", k, params=(d_period,))}
+
+
+def _cci(p: FeaturePlan, period: int) -> int:
+    tp = p.node("typical_price", p.input("high"), p.input("low"), p.input("close"))
+    return p.node("cci", tp, p.node("sma", tp, params=(period,)), p.node("mad", tp, params=(period,)))
+
+
+def _williams_r(p: FeaturePlan, period: int) -> int:
+    highest = p.node("max", p.input("high"), params=(period,))
+    lowest = p.node("min", p.input("low"), params=(period,))
+    return p.node("percent_r", p.input("close"), highest, lowest)
+
+
+# name -> (parameter types, defaults, definition)
+FEATURES: Dict[str, Tuple[Tuple[type, ...], Tuple[Any, ...], Callable[..., Union[int, Dict[str, int]]]]] = {
+    "sma": ((int,), (9,), _moving("sma")),
+    "ema": ((int,), (9,), _moving("ema")),
+    "wma": ((int,), (9,), _moving("wma")),
+    "rsi": ((int,), (14,), _rsi),
+    "macd": ((int, int, int), (12, 26, 9), _macd),
+    "bb": ((int, float), (20, 2.0), _bb),
+    "atr": ((int,), (14,), _atr),
+    "stoch": ((int, int), (14, 3), _stoch),
+    "cci": ((int,), (20,), _cci),
+    "williams_r": ((int,), (14,), _williams_r),
+}
+
+_SPEC = re.compile(r"^\s*([a-z_]+)\s*(?:\(([^()]*)\))?\s*$")
+
+
+def parse(spec: str) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    'bb(20, 2)' -> ('bb', (20, 2.0)); missing parameters take their defaults.
+
+    Raises:
+        ValueError: Unknown feature, too many or malformed parameters, or a
+            period below 1.
+    """
+    match = _SPEC.match(spec.lower())
+    if not match or match.group(1) not in FEATURES:
+        raise ValueError(f"Unknown feature: {spec!r} (known: {', '.join(FEATURES)})")
+    name, args = match.group(1), match.group(2)
+    types, defaults, _ = FEATURES[name]
+    given = [a.strip() for a in args.split(",")] if args and args.strip() else []
+    if len(given) > len(types):
+        raise ValueError(f"Too many parameters for {name}: {spec!r}")
+    try:
+        values = [kind(float(v)) if kind is int and float(v).is_integer() else kind(v) for kind, v in zip(types, given)]
+    except ValueError:
+        raise ValueError(f"Bad parameters for {name}: {spec!r}") from None
+    if any(kind is int and value < 1 for kind, value in zip(types, values)):
+        raise ValueError(f"Periods must be at least 1 for {name}: {spec!r}")
+    return name, tuple(values) + defaults[len(values):]
+
+
+def canonical(spec: str) -> str:
+    """Normalized spec used as column name: 'BB(20, 2.0)' -> 'bb(20,2)', 'rsi' -> 'rsi(14)'."""
+    name, params = parse(spec)
+    return f"{name}({','.join(f'{v:g}' for v in params)})"
+
+
+@lru_cache(maxsize=128)
+def _plan(features: Tuple[str, ...]) -> FeaturePlan:
+    return FeaturePlan(features)
+
+
+def plan(features: Iterable[str]) -> FeaturePlan:
+    """Plan for `features`, built once per distinct feature set."""
+    return _plan(tuple(canonical(f) for f in features))
+
+
+def compute_features(df: pd.DataFrame, features: Iterable[str]) -> pd.DataFrame:
+    """Run the plan for `features` over `df` into one feature frame."""
+    return plan(features).run(df)
+
+
+def select(frame: pd.DataFrame, feature: str) -> Union[pd.Series, pd.DataFrame]:
+    """
+    One feature from a feature frame: a Series, or a DataFrame whose columns
+    are the bare output names (macd/signal/histogram, middle_band/upper_band/
+    lower_band, %K/%D) that the indicators.py *_signal helpers expect.
+    """
+    spec = canonical(feature)
+    if spec in frame.columns:
+        return frame[spec]
+    prefix = f"{spec}."
+    outputs = [c for c in frame.columns if c.startswith(prefix)]
+    if not outputs:
+        raise KeyError(f"{spec} is not in the feature frame")
+    return frame[outputs].rename(columns=lambda c: c[len(prefix):])
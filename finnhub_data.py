@@ -2,14 +2,30 @@
 # Async OHLC fetcher using Finnhub API for Forex, indices, metals
 
 import os
-import aiohttp
 import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
+from http_client import http_client
 
 # Load .env for API key
 load_dotenv()
 
+# Internal symbol -> Finnhub forex/index symbol
+FINNHUB_SYMBOLS = {
+    "EURUSD": "OANDA:EUR_USD",
+    "GBPUSD": "OANDA:GBP_USD",
+    "USDJPY": "OANDA:USD_JPY",
+    "USDCHF": "OANDA:USD_CHF",
+    "AUDUSD": "OANDA:AUD_USD",
+    "NZDUSD": "OANDA:NZD_USD",
+    "USDCAD": "OANDA:USD_CAD",
+    "XAUUSD": "OANDA:XAU_USD",
+    "XAGUSD": "OANDA:XAG_USD",
+    "US30": "FOREXCOM:DJI",
+    "NAS100": "FOREXCOM:NSX",
+    "SPX500": "FOREXCOM:SPX",
+}
+
 # Get API key from environment
 def get_api_key():
     key = os.getenv("FINNHUB_API_KEY")
@@ -18,9 +34,11 @@ def get_api_key():
     return key
 
 # Async OHLC fetcher
-async def get_finnhub_data(symbol="EURUSD", interval="H1", limit=150):
+async def get_finnhub_data(symbol="EURUSD", interval="H1", limit=150, since=None):
     """
     Fetch OHLC data from Finnhub for supported symbols and intervals.
+    If `since` (epoch seconds) is given, only bars from that time onward are
+    requested instead of the full `limit` window.
     Returns: DataFrame with datetime index and OHLCV columns.
     """
     api_key = get_api_key()
@@ -29,22 +47,8 @@ async def get_finnhub_data(symbol="EURUSD", interval="H1", limit=150):
 
     base_url = "https://finnhub.io/api/v1/forex/candle"
 
-    symbol_map = {
-        "EURUSD": "OANDA:EUR_USD",
-        "GBPUSD": "OANDA:GBP_USD",
-        "USDJPY": "OANDA:USD_JPY",
-        "USDCHF": "OANDA:USD_CHF",
-        "AUDUSD": "OANDA:AUD_USD",
-        "NZDUSD": "OANDA:NZD_USD",
-        "USDCAD": "OANDA:USD_CAD",
-        "XAUUSD": "OANDA:XAU_USD",
-        "XAGUSD": "OANDA:XAG_USD",
-        "US30": "FOREXCOM:DJI",
-        "NAS100": "FOREXCOM:NSX",
-        "SPX500": "FOREXCOM:SPX",
-    }
 
-    mapped_symbol = symbol_map.get(symbol.upper())
+    mapped_symbol = FINNHUB_SYMBOLS.get(symbol.upper())
     if not mapped_symbol:
         print(f"⚠️ Finnhub: Symbol {symbol} not supported.")
         return pd.DataFrame()
@@ -54,9 +58,17 @@ async def get_finnhub_data(symbol="EURUSD", interval="H1", limit=150):
         "H1": "60", "H4": "240", "D1": "D"
     }
 
+    resolution_seconds = {
+        "M1": 60, "M5": 300, "M15": 900, "M30": 1800,
+        "H1": 3600, "H4": 14400, "D1": 86400
+    }
+
     resolution = resolution_map.get(interval.upper(), "60")
     now = int(datetime.utcnow().timestamp())
-    past = now - limit * 3600  # ~1h bars
+    if since is not None:
+        past = int(since)
+    else:
+        past = now - limit * resolution_seconds.get(interval.upper(), 3600)
 
     url = (
         f"{base_url}?symbol={mapped_symbol}&resolution={resolution}"
@@ -64,9 +76,8 @@ async def get_finnhub_data(symbol="EURUSD", interval="H1", limit=150):
     )
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as res:
-                data = await res.json()
+        async with http_client.request("GET", url) as res:
+            data = await res.json()
 
         if "c" not in data or not data["c"]:
             print(f"⚠️ No data from Finnhub for {symbol}")
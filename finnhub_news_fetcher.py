@@ -4,6 +4,8 @@ import os
 import aiohttp
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from http_client import http_client
+from request_planner import request_planner
 
 # Import from news_cache
 from news_cache import load_cache, save_cache, add_to_cache, is_article_sent, clean_cache
@@ -24,6 +26,10 @@ async def fetch_recent_forex_news(hours_ago: int = 6, max_articles_to_return: in
         print("[⚠️] FINNHUB_API_KEY not set — skipping news fetch.")
         return []
 
+    # News only uses Finnhub budget left over after price data
+    if not request_planner.acquire("finnhub", priority="low"):
+        return []
+
     news_cache = load_cache()
     
     # Basic cache cleaning (can be done less frequently in a production system)
@@ -47,13 +53,12 @@ async def fetch_recent_forex_news(hours_ago: int = 6, max_articles_to_return: in
 
     try:
         url = f"https://finnhub.io/api/v1/news?category=forex&token={API_KEY}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status() # Raise an exception for HTTP errors
-                data = await response.json()
-                if not isinstance(data, list):
-                    print(f"[ERROR] Finnhub API did not return a list: {data}")
-                    return []
+        async with http_client.request("GET", url) as response:
+            response.raise_for_status() # Raise an exception for HTTP errors
+            data = await response.json()
+            if not isinstance(data, list):
+                print(f"[ERROR] Finnhub API did not return a list: {data}")
+                return []
 
 
         # Filter by date first (as in original code)
@@ -0,0 +1,323 @@
+"""
+Shared, pooled HTTP client for all outbound provider requests.
+
+- One aiohttp.ClientSession per event loop instead of one per request, so
+  TCP+TLS connections are kept alive and reused. A session is closed on its
+  own loop when asyncio.run() shuts that loop down, so loops started per
+  iteration (pattern_alerts_auto, scanner_loop) do not leak connectors.
+- Per-host and total connection limits, DNS caching and default timeouts.
+- Retry with exponential backoff on connection errors, timeouts and
+  429/5xx responses (honours Retry-After).
+- Per-host stats: requests, errors, retries, new vs reused connections, latency.
+- Every attempt is also recorded in provider_health (provider/endpoint
+  latency percentiles and error rates for /status).
+- Every live attempt is spent against the provider's quota in the
+  request planner (replayed responses are not).
+- HTTP_REPLAY_MODE=record/replay captures responses to / serves them from a
+  cassette directory instead of the network (see http_replay).
+- Started/closed with the application lifecycle (see main.run_asyncio_all);
+  if never started explicitly, the session is created lazily on first use.
+"""
+
+import os
+import asyncio
+import logging
+import aiohttp
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Union
+from urllib.parse import urlsplit
+
+from http_replay import cassette
+from provider_health import endpoint_for_path, provider_for_host, record_request
+from request_planner import request_planner
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+HTTP_LIMIT = int(os.getenv("HTTP_LIMIT", "64"))
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "8"))
+HTTP_DNS_TTL_SECONDS = int(os.getenv("HTTP_DNS_TTL_SECONDS", "300"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("HTTP_BACKOFF_SECONDS", "0.5"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+Timeout = Union[float, int, aiohttp.ClientTimeout, None]
+
+
+class HostStats:
+    """
+    Counters and latency totals for one remote host.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def as_dict(self) -> Dict[str, Any]:
+        connections = self.new_connections + self.reused_connections
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "reuse_rate": self.reused_connections / connections if connections else 0.0,
+            "avg_latency_ms": 1000 * self.latency_total / self.requests if self.requests else 0.0,
+            "max_latency_ms": 1000 * self.latency_max,
+        }
+
+
+class HttpClient:
+    """
+    Process-wide pooled aiohttp client with retry/backoff and per-host stats.
+    """
+
+    def __init__(
+        self,
+        limit: int = HTTP_LIMIT,
+        limit_per_host: int = HTTP_LIMIT_PER_HOST,
+        dns_ttl: int = HTTP_DNS_TTL_SECONDS,
+        keepalive: float = HTTP_KEEPALIVE_SECONDS,
+        timeout: float = HTTP_TIMEOUT_SECONDS,
+        max_retries: int = HTTP_MAX_RETRIES,
+        backoff: float = HTTP_BACKOFF_SECONDS,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._closers: Dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+        self._stats: Dict[str, HostStats] = {}
+
+    def _host_stats(self, host: str) -> HostStats:
+        if host not in self._stats:
+            self._stats[host] = HostStats()
+        return self._stats[host]
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_create(session, ctx, params):
+            host = (ctx.trace_request_ctx or {}).get("host")
+            if host:
+                self._host_stats(host).new_connections += 1
+
+        async def on_reuse(session, ctx, params):
+            host = (ctx.trace_request_ctx or {}).get("host")
+            if host:
+                self._host_stats(host).reused_connections += 1
+
+        trace.on_connection_create_end.append(on_create)
+        trace.on_connection_reuseconn.append(on_reuse)
+        return trace
+
+    def session(self) -> aiohttp.ClientSession:
+        """
+        The shared session for the running event loop (created on demand).
+        """
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            self._forget_closed_loops()
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[self._trace_config()],
+            )
+            self._sessions[loop] = session
+            self._closers[loop] = loop.create_task(self._close_on_shutdown(session))
+        return session
+
+    @staticmethod
+    async def _close_on_shutdown(session: aiohttp.ClientSession) -> None:
+        """
+        Park until cancelled, then close `session`. asyncio.run() cancels the
+        tasks left on its loop before closing it, so the connector and its
+        sockets are released while the loop that owns them is still running.
+        """
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            if not session.closed:
+                await session.close()
+                logger.debug("[HTTP] Closed session of a finished event loop")
+
+    def _forget_closed_loops(self) -> None:
+        for loop in [loop for loop in self._sessions if loop.is_closed()]:
+            session = self._sessions.pop(loop)
+            self._closers.pop(loop, None)
+            if not session.closed:
+                # Loop closed without asyncio.run()'s task cleanup; its sockets cannot be closed any more
+                logger.warning("[HTTP] Dropping session of an event loop closed without closing it")
+
+    async def start(self) -> None:
+        """Create the pooled session up front (optional; it is lazy otherwise)."""
+        self.session()
+        logger.info(
+            f"[HTTP] Client started (limit={self.limit}, per_host={self.limit_per_host}, "
+            f"dns_ttl={self.dns_ttl}s, keepalive={self.keepalive}s)"
+        )
+
+    async def close(self) -> None:
+        """Close the running loop's pooled session and its connections."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        closer = self._closers.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+            logger.info("[HTTP] Client closed")
+        if closer is not None:
+            closer.cancel()
+
+    @asynccontextmanager
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Timeout = None,
+        retries: Optional[int] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Issue a request on the shared session, retrying transient failures.
+
+        Usage:
+            async with http_client.request("GET", url, params=...) as resp:
+                data = await resp.json()
+
+        Args:
+            method (str): HTTP method.
+            url (str): Absolute URL.
+            params, headers (dict, optional): Query parameters and headers.
+            timeout (float or ClientTimeout, optional): Per-attempt timeout; defaults to the client's.
+            retries (int, optional): Retry budget; defaults to HTTP_MAX_RETRIES.
+
+        Yields:
+            aiohttp.ClientResponse: The final response (retryable statuses are
+            only yielded once the retry budget is exhausted); an
+            http_replay.ReplayResponse in replay mode.
+        """
+        parts = urlsplit(url)
+        host = parts.hostname or "unknown"
+        stats = self._host_stats(host)
+        provider, endpoint = provider_for_host(host), endpoint_for_path(parts.path)
+
+        def observe(latency: float, ok: bool, error: Optional[str] = None) -> None:
+            stats.record(latency, ok=ok)
+            record_request(provider, endpoint, latency, ok, error)
+            if cassette.mode != "replay":
+                request_planner.spend(provider)
+
+        loop = asyncio.get_running_loop()
+        if cassette.mode == "replay":
+            started = loop.time()
+            response = await cassette.replay_http(method, url, params, kwargs)
+            ok = response.status < 400
+            observe(loop.time() - started, ok, None if ok else f"HTTP {response.status}")
+            yield response
+            return
+
+        retries = self.max_retries if retries is None else retries
+        if isinstance(timeout, (int, float)):
+            timeout = aiohttp.ClientTimeout(total=timeout)
+        session = self.session()
+
+        attempt = 0
+        while True:
+            started = loop.time()
+            try:
+                response = await session.request(
+                    method, url, params=params, headers=headers,
+                    timeout=timeout or session.timeout,
+                    trace_request_ctx={"host": host}, **kwargs,
+                )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                observe(loop.time() - started, False, type(e).__name__)
+                if attempt >= retries:
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                logger.warning(f"[HTTP] {host} {type(e).__name__}; retry {attempt + 1}/{retries} in {delay:.1f}s")
+            else:
+                if response.status in RETRY_STATUSES and attempt < retries:
+                    observe(loop.time() - started, False, f"HTTP {response.status}")
+                    delay = _retry_after(response) or self.backoff * (2 ** attempt)
+                    response.release()
+                    logger.warning(f"[HTTP] {host} returned {response.status}; retry {attempt + 1}/{retries} in {delay:.1f}s")
+                else:
+                    ok = response.status < 400
+                    observe(loop.time() - started, ok, None if ok else f"HTTP {response.status}")
+                    if cassette.mode == "record":
+                        await cassette.record_http(method, url, params, kwargs, response)
+                    try:
+                        yield response
+                    finally:
+                        response.release()
+                    return
+            attempt += 1
+            stats.retries += 1
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url: str, **kwargs: Any) -> Any:
+        """
+        GET `url` and decode the JSON body (raises aiohttp.ClientResponseError on >= 400).
+        """
+        async with self.request("GET", url, **kwargs) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host connection reuse and latency stats."""
+        return {host: s.as_dict() for host, s in sorted(self._stats.items())}
+
+
+def _retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    try:
+        return min(float(value), 60.0) if value else None
+    except ValueError:
+        return None
+
+
+http_client = HttpClient()
+
+
+async def start_http_client() -> None:
+    """Start the shared HTTP client (call once at application start-up)."""
+    await http_client.start()
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (call once at application shutdown)."""
+    await http_client.close()
+
+
+def get_http_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-host request, retry, connection reuse and latency stats."""
+    return http_client.stats()
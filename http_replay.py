@@ -0,0 +1,315 @@
+"""
+Record / replay of provider responses for offline, deterministic runs.
+
+- HTTP_REPLAY_MODE=off (default): calls go straight to the network.
+- HTTP_REPLAY_MODE=record: calls go to the network and every response is
+  also written to HTTP_CASSETTE_DIR (one file per distinct request).
+- HTTP_REPLAY_MODE=replay: nothing touches the network; responses are served
+  from the cassette directory after HTTP_REPLAY_LATENCY_MS ±
+  HTTP_REPLAY_JITTER_MS (seeded by HTTP_REPLAY_SEED). A request that was never
+  recorded raises CassetteMiss.
+- Covered: the pooled aiohttp client (http_client.request), plus any blocking
+  call wrapped with `recorded()` (yf.download, feedparser.parse, requests.get).
+- Requests are keyed by method/URL/parameters. Credentials (apiKey, token, ...)
+  are never written to disk, and time-window parameters (from, to, start, ...)
+  are left out of the key so a recording keeps matching on later runs.
+"""
+
+import os
+import json
+import time
+import base64
+import pickle
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+import functools
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+HTTP_REPLAY_MODE = os.getenv("HTTP_REPLAY_MODE", "off").lower()
+HTTP_CASSETTE_DIR = os.getenv("HTTP_CASSETTE_DIR", os.path.join("data", "cassettes"))
+HTTP_REPLAY_LATENCY_MS = float(os.getenv("HTTP_REPLAY_LATENCY_MS", "0"))
+HTTP_REPLAY_JITTER_MS = float(os.getenv("HTTP_REPLAY_JITTER_MS", "0"))
+HTTP_REPLAY_SEED = int(os.getenv("HTTP_REPLAY_SEED", "0"))
+HTTP_REPLAY_IGNORE_PARAMS = {
+    p.strip().lower()
+    for p in os.getenv("HTTP_REPLAY_IGNORE_PARAMS", "from,to,start,end,since,_").split(",")
+    if p.strip()
+}
+
+MODES = ("off", "record", "replay")
+
+# Never stored, never part of the key
+SECRET_PARAMS = {"apikey", "api_key", "token", "api_token", "access_key", "key", "client_secret", "password"}
+# Call options that do not change the response
+TRANSPORT_KWARGS = {"headers", "timeout", "progress", "allow_redirects", "verify", "trace_request_ctx"}
+
+
+class CassetteMiss(LookupError):
+    """Replay mode and the request was never recorded."""
+
+
+def _clean(params: Any) -> Any:
+    if not isinstance(params, dict):
+        return params
+    return {
+        str(k): v for k, v in params.items()
+        if str(k).lower() not in SECRET_PARAMS and str(k).lower() not in HTTP_REPLAY_IGNORE_PARAMS
+    }
+
+
+def _split_url(url: str) -> Tuple[str, Dict[str, str]]:
+    """URL without query string, and the query parameters."""
+    parts = urlsplit(str(url))
+    return urlunsplit(parts._replace(query="", fragment="")), dict(parse_qsl(parts.query))
+
+
+def request_descriptor(name: str, args: tuple = (), kwargs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Credential-free, time-independent description of a call (what gets keyed and stored).
+
+    Args:
+        name (str): Call name ("GET", "download", "parse", ...).
+        args (tuple): Positional arguments; URL query strings are folded into `params`.
+        kwargs (dict, optional): Keyword arguments; transport options are dropped.
+
+    Returns:
+        dict: {"call", "args", "kwargs"}, JSON-serialisable.
+    """
+    kwargs = dict(kwargs or {})
+    params = dict(kwargs.pop("params", None) or {})
+    clean_args = []
+    for arg in args:
+        if isinstance(arg, str) and "://" in arg:
+            arg, query = _split_url(arg)
+            params = {**query, **params}
+        clean_args.append(arg)
+    clean_kwargs = {
+        k: v for k, v in kwargs.items()
+        if k not in TRANSPORT_KWARGS and k.lower() not in HTTP_REPLAY_IGNORE_PARAMS
+    }
+    if params:
+        clean_kwargs["params"] = _clean(params)
+    return json.loads(json.dumps(
+        {"call": name, "args": clean_args, "kwargs": _clean(clean_kwargs)},
+        sort_keys=True, default=str,
+    ))
+
+
+def cassette_key(descriptor: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(descriptor, sort_keys=True).encode()).hexdigest()[:24]
+
+
+class ReplayResponse:
+    """
+    Recorded HTTP response with the parts of aiohttp.ClientResponse the providers use.
+    """
+
+    def __init__(self, method: str, url: str, status: int, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.reason = "Replayed"
+        self.headers = headers
+        self._body = body
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: Optional[str] = None) -> str:
+        return self._body.decode(encoding or "utf-8", errors="replace")
+
+    async def json(self, *, content_type: Optional[str] = None, loads: Callable = json.loads) -> Any:
+        return loads(self._body.decode("utf-8"))
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(
+                None, (), status=self.status, message=self.reason, headers=self.headers,
+            )
+
+    def release(self) -> None:
+        pass
+
+
+class Cassette:
+    """
+    Cassette directory plus the record/replay mode and simulated latency.
+    """
+
+    def __init__(
+        self,
+        mode: str = HTTP_REPLAY_MODE,
+        directory: str = HTTP_CASSETTE_DIR,
+        latency_ms: float = HTTP_REPLAY_LATENCY_MS,
+        jitter_ms: float = HTTP_REPLAY_JITTER_MS,
+        seed: int = HTTP_REPLAY_SEED,
+    ):
+        self._lock = threading.Lock()
+        self.configure(mode, directory, latency_ms, jitter_ms, seed)
+
+    def configure(
+        self,
+        mode: Optional[str] = None,
+        directory: Optional[str] = None,
+        latency_ms: Optional[float] = None,
+        jitter_ms: Optional[float] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Change any setting at runtime (benchmarks switch between record and replay)."""
+        if mode is not None:
+            if mode not in MODES:
+                raise ValueError(f"HTTP replay mode must be one of {MODES}, not {mode!r}")
+            self.mode = mode
+        if directory is not None:
+            self.directory = directory
+        if latency_ms is not None:
+            self.latency_ms = latency_ms
+        if jitter_ms is not None:
+            self.jitter_ms = jitter_ms
+        if seed is not None or not hasattr(self, "_rng"):
+            self._rng = random.Random(seed or 0)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.recorded = 0
+
+    def delay(self) -> float:
+        """Simulated latency of the next replayed response, in seconds."""
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def _path(self, kind: str, key: str, ext: str) -> str:
+        return os.path.join(self.directory, kind, f"{key}.{ext}")
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def _write(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._count("recorded")
+
+    # ---- pooled aiohttp client ----
+
+    async def replay_http(self, method: str, url: str, params: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> ReplayResponse:
+        """Recorded response for a request (after the simulated latency)."""
+        descriptor = request_descriptor(method.upper(), (url,), {"params": params, **kwargs})
+        path = self._path("http", cassette_key(descriptor), "json")
+        await asyncio.sleep(self.delay())
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self._count("misses")
+            raise CassetteMiss(f"No recording of {method.upper()} {descriptor['args'][0]} ({path})")
+        self._count("hits")
+        body = entry["body"]
+        body = base64.b64decode(body) if entry.get("base64") else body.encode("utf-8")
+        return ReplayResponse(method.upper(), url, entry["status"], entry.get("headers", {}), body)
+
+    async def record_http(self, method: str, url: str, params: Optional[Dict[str, Any]], kwargs: Dict[str, Any], response: Any) -> None:
+        """Store a live response (its body stays readable for the caller)."""
+        descriptor = request_descriptor(method.upper(), (url,), {"params": params, **kwargs})
+        try:
+            body = await response.read()
+            try:
+                text, encoded = body.decode("utf-8"), False
+            except UnicodeDecodeError:
+                text, encoded = base64.b64encode(body).decode("ascii"), True
+            entry = {
+                "request": descriptor,
+                "status": response.status,
+                "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+                "base64": encoded,
+                "body": text,
+            }
+            self._write(self._path("http", cassette_key(descriptor), "json"), json.dumps(entry, indent=1).encode("utf-8"))
+        except Exception as e:
+            logger.warning(f"[Replay] Could not record {method.upper()} {descriptor['args'][0]}: {e}")
+
+    # ---- blocking calls ----
+
+    def call(self, kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking provider call through the cassette.
+
+        Args:
+            kind (str): Cassette sub-directory ("yahoo", "feeds", "http").
+            fn (callable): The real call, made in off and record mode.
+
+        Returns:
+            Whatever `fn` returns (pickled to disk in record mode).
+        """
+        if self.mode == "off":
+            return fn(*args, **kwargs)
+        descriptor = request_descriptor(getattr(fn, "__name__", "call"), args, kwargs)
+        path = self._path(kind, cassette_key(descriptor), "pkl")
+        if self.mode == "replay":
+            time.sleep(self.delay())
+            try:
+                with open(path, "rb") as f:
+                    _, result = pickle.load(f)
+            except FileNotFoundError:
+                self._count("misses")
+                raise CassetteMiss(f"No recording of {kind} {descriptor['call']}{tuple(descriptor['args'])} ({path})")
+            self._count("hits")
+            return result
+        result = fn(*args, **kwargs)
+        try:
+            self._write(path, pickle.dumps((descriptor, result)))
+        except Exception as e:
+            logger.warning(f"[Replay] Could not record {kind} {descriptor['call']}: {e}")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "directory": self.directory,
+            "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+        }
+
+
+cassette = Cassette()
+
+
+def recorded(kind: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    `fn` routed through the cassette (keeps its __name__, so provider stats are unchanged).
+
+    Usage:
+        yf_download = recorded("yahoo", yf.download)
+        parse_feed = recorded("feeds", feedparser.parse)
+    """
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return cassette.call(kind, fn, *args, **kwargs)
+    return wrapper
+
+
+def get_replay_stats() -> Dict[str, Any]:
+    """Current mode and cassette hit / miss / recorded counters."""
+    return cassette.stats()
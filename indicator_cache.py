@@ -0,0 +1,312 @@
+"""
+Memoized indicator results shared across the analysis pipeline.
+
+- Entries are keyed by (fingerprint of the input columns, last bar timestamp,
+  indicator, parameters). The fingerprint hashes the column contents, so
+  every copy of the same bars (candle cache copies, renamed or lowercased
+  frames) maps to the same entry, and a new bar is a new key.
+- Parameters are normalized with the formula's defaults: rsi() and
+  rsi(period=14) share an entry.
+- LRU eviction under a byte cap (INDICATOR_CACHE_MAX_MB) and an entry cap
+  (INDICATOR_CACHE_MAX_ENTRIES).
+- Formulas come from batch_indicators, so marketdata, botstrategies and
+  charting all get the same RSI. indicator_columns_many() computes the
+  misses of a whole scan in one batched pass.
+- get_indicator_cache_stats() reports hits, misses and hit rate.
+"""
+
+import os
+import hashlib
+import inspect
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import batch_indicators as bi
+
+logger = logging.getLogger(__name__)
+
+INDICATOR_CACHE_MAX_MB = float(os.getenv("INDICATOR_CACHE_MAX_MB", "64"))
+INDICATOR_CACHE_MAX_ENTRIES = int(os.getenv("INDICATOR_CACHE_MAX_ENTRIES", "20000"))
+
+Result = Union[np.ndarray, Dict[str, np.ndarray]]
+CacheKey = Tuple[bytes, Any, str, Tuple[Tuple[str, Any], ...]]
+
+# indicator -> (input columns, formula)
+INDICATORS: Dict[str, Tuple[Tuple[str, ...], Callable[..., Result]]] = {
+    "ema": (("close",), bi.ema),
+    "sma": (("close",), bi.sma),
+    "wma": (("close",), bi.wma),
+    "rsi": (("close",), bi.rsi),
+    "macd": (("close",), bi.macd),
+    "bollinger_bands": (("close",), bi.bollinger_bands),
+    "atr": (("high", "low", "close"), bi.atr),
+    "stochastic": (("high", "low", "close"), bi.stochastic),
+    "cci": (("high", "low", "close"), bi.cci),
+    "williams_r": (("high", "low", "close"), bi.williams_r),
+}
+
+# batch_indicators column -> (indicator, parameters, output of a multi-output indicator)
+COLUMN_SPECS: Dict[str, Tuple[str, Dict[str, Any], Optional[str]]] = {
+    "ema9": ("ema", {"period": 9}, None),
+    "ema21": ("ema", {"period": 21}, None),
+    "rsi": ("rsi", {}, None),
+    "macd": ("macd", {}, "macd"),
+    "signal": ("macd", {}, "signal"),
+    "histogram": ("macd", {}, "histogram"),
+    "middle_band": ("bollinger_bands", {}, "middle_band"),
+    "upper_band": ("bollinger_bands", {}, "upper_band"),
+    "lower_band": ("bollinger_bands", {}, "lower_band"),
+    "atr": ("atr", {}, None),
+    "%K": ("stochastic", {}, "%K"),
+    "%D": ("stochastic", {}, "%D"),
+    "cci": ("cci", {}, None),
+    "williams_r": ("williams_r", {}, None),
+}
+
+# Columns marketdata adds to every OHLC frame
+DEFAULT_COLUMNS = ("ema9", "ema21", "rsi")
+
+
+@lru_cache(maxsize=None)
+def _defaults(indicator: str) -> Dict[str, Any]:
+    inputs, fn = INDICATORS[indicator]
+    return {
+        name: p.default for name, p in inspect.signature(fn).parameters.items()
+        if name not in inputs and p.default is not inspect.Parameter.empty
+    }
+
+
+def _normalize(indicator: str, params: Mapping[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    defaults = _defaults(indicator)
+    unknown = set(params).difference(defaults)
+    if unknown:
+        raise ValueError(f"Unknown {indicator} parameters: {sorted(unknown)}")
+    return tuple(sorted({**defaults, **params}.items()))
+
+
+def _nbytes(value: Result) -> int:
+    return sum(v.nbytes for v in value.values()) if isinstance(value, dict) else value.nbytes
+
+
+def _copy(value: Result) -> Result:
+    return {k: v.copy() for k, v in value.items()} if isinstance(value, dict) else value.copy()
+
+
+class IndicatorCache:
+    """
+    Process-wide LRU of indicator results (numpy arrays).
+
+    - Callers always receive a copy, so they may mutate it freely.
+    - Results larger than the byte cap are returned but not stored.
+    """
+
+    def __init__(self, max_bytes: float = INDICATOR_CACHE_MAX_MB * 2**20, max_entries: int = INDICATOR_CACHE_MAX_ENTRIES):
+        self.max_bytes = int(max_bytes)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[Result, int]]" = OrderedDict()
+        self._bytes = 0
+        # Analyses also run on worker threads
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: CacheKey) -> Optional[Result]:
+        """Copy of the entry for `key` (counted as hit / miss), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy(entry[0])
+
+    def put(self, key: CacheKey, value: Result) -> None:
+        """Store a result, evicting least recently used entries over the caps."""
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        value = _copy(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current sizes."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+
+indicator_cache = IndicatorCache()
+
+
+def _column_map(df: pd.DataFrame) -> Dict[str, Any]:
+    return {str(c).lower(): c for c in df.columns}
+
+
+def _fingerprint(df: pd.DataFrame, inputs: Tuple[str, ...]) -> Tuple[bytes, Any]:
+    """(content digest of the input columns, last index label)."""
+    columns = _column_map(df)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(len(df).to_bytes(8, "little"))
+    for name in inputs:
+        digest.update(np.ascontiguousarray(df[columns[name]].to_numpy(dtype=np.float64, na_value=np.nan)).tobytes())
+    return digest.digest(), (df.index[-1] if len(df) else None)
+
+
+def _compute(df: pd.DataFrame, indicator: str, params: Tuple[Tuple[str, Any], ...]) -> Result:
+    inputs, fn = INDICATORS[indicator]
+    columns = _column_map(df)
+    arrays = [df[columns[name]].to_numpy(dtype=np.float64, na_value=np.nan) for name in inputs]
+    return fn(*arrays, **dict(params))
+
+
+def indicator(df: pd.DataFrame, name: str, **params) -> Result:
+    """
+    One indicator over a frame's OHLC columns, through the cache.
+
+    Args:
+        df (DataFrame): Frame with the indicator's input columns (any case).
+        name (str): Key of INDICATORS (e.g. "rsi", "macd").
+        **params: Formula parameters (e.g. period=14).
+
+    Returns:
+        ndarray aligned to df's rows, or dict of arrays for multi-output
+        indicators (macd, bollinger_bands, stochastic).
+    """
+    key_params = _normalize(name, params)
+    digest, last = _fingerprint(df, INDICATORS[name][0])
+    key = (digest, last, name, key_params)
+    value = indicator_cache.get(key)
+    if value is None:
+        value = _compute(df, name, key_params)
+        indicator_cache.put(key, value)
+    return value
+
+
+def _column_keys(df: pd.DataFrame, names: Iterable[str]) -> Dict[str, CacheKey]:
+    """Cache key per column name, hashing each distinct input set once."""
+    digests: Dict[Tuple[str, ...], Tuple[bytes, Any]] = {}
+    keys = {}
+    for name in names:
+        ind, params, _ = COLUMN_SPECS[name]
+        inputs = INDICATORS[ind][0]
+        if inputs not in digests:
+            digests[inputs] = _fingerprint(df, inputs)
+        keys[name] = (*digests[inputs], ind, _normalize(ind, params))
+    return keys
+
+
+def _pick(value: Result, name: str) -> np.ndarray:
+    output = COLUMN_SPECS[name][2]
+    return value[output] if output else value
+
+
+def indicator_columns(df: pd.DataFrame, names: Iterable[str] = DEFAULT_COLUMNS) -> Dict[str, np.ndarray]:
+    """Named indicator columns (batch_indicators.COLUMNS) for one frame, through the cache."""
+    return indicator_columns_many({"": df}, names).get("", {})
+
+
+def indicator_columns_many(frames: Mapping[str, pd.DataFrame], names: Iterable[str] = DEFAULT_COLUMNS) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Named indicator columns for many frames; cache misses of all symbols are
+    computed together in one batched pass and stored.
+
+    Args:
+        frames (dict): symbol -> OHLCV DataFrame.
+        names (iterable): Columns from COLUMN_SPECS.
+
+    Returns:
+        dict: symbol -> name -> array of len(frame) (empty frames are left out).
+    """
+    names = list(dict.fromkeys(names))
+    out: Dict[str, Dict[str, np.ndarray]] = {}
+    missing: Dict[str, Dict[str, CacheKey]] = {}
+    for symbol, df in frames.items():
+        if df is None or df.empty:
+            continue
+        out[symbol] = {}
+        for name, key in _column_keys(df, names).items():
+            value = indicator_cache.get(key)
+            if value is None:
+                missing.setdefault(symbol, {})[name] = key
+            else:
+                out[symbol][name] = _pick(value, name)
+    if not missing:
+        return out
+
+    # Whole indicators (all outputs) are computed so complete entries get stored
+    specs = {COLUMN_SPECS[n][0] for keys in missing.values() for n in keys}
+    columns = [c for c, spec in COLUMN_SPECS.items() if spec[0] in specs]
+    computed = bi.compute_frames({s: frames[s] for s in missing}, columns)
+    for symbol, keys in missing.items():
+        stored = set()
+        for name, key in keys.items():
+            ind, _, output = COLUMN_SPECS[name]
+            if output:
+                value = {c: computed[symbol][c] for c, spec in COLUMN_SPECS.items() if spec[0] == ind}
+            else:
+                value = computed[symbol][name]
+            if key not in stored:
+                indicator_cache.put(key, value)
+                stored.add(key)
+            out[symbol][name] = _pick(value, name).copy()
+    logger.debug(f"[IndicatorCache] computed {len(specs)} indicators for {len(missing)} symbols in one batch")
+    return out
+
+
+def add_indicator_columns(df: pd.DataFrame, names: Iterable[str] = DEFAULT_COLUMNS, overwrite: bool = False) -> pd.DataFrame:
+    """
+    Add indicator columns to `df` (in place) from the cache.
+
+    Args:
+        names (iterable): Columns from COLUMN_SPECS.
+        overwrite (bool): Replace columns already present; by default they are kept.
+    """
+    wanted = [n for n in names if overwrite or n not in df.columns]
+    if wanted and "close" in _column_map(df):
+        for name, values in indicator_columns(df, wanted).items():
+            df[name] = values
+    return df
+
+
+def get_indicator_cache_stats() -> Dict[str, Any]:
+    """
+    Counters of the process-wide indicator cache (hits, misses, hit_rate, ...).
+    """
+    return indicator_cache.stats()
+
+
+def clear_indicator_cache() -> None:
+    """
+    Empty the process-wide indicator cache.
+    """
+    indicator_cache.clear()
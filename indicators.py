@@ -1,87 +1,81 @@
-"""Utility indicator calculations with logging and extra indicators."""
+"""Utility indicator calculations with logging and extra indicators.
+
+The formulas live in batch_indicators.py (numpy, also used for many symbols
+at once) on the kernels in rolling_kernels.py; these wrappers take and return
+pandas objects aligned to the input index.
+"""
 
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 import logging
 
+import batch_indicators as bi
+
 logger = logging.getLogger(__name__)
 
+def _values(series: pd.Series) -> np.ndarray:
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+def _series(values: np.ndarray, like: pd.Series, name=None) -> pd.Series:
+    return pd.Series(values, index=like.index, name=name)
+
 def calculate_ema(series: pd.Series, period: int = 9) -> pd.Series:
     """Exponential Moving Average."""
     logger.debug(f"Calculating EMA: {series.name}, len={len(series)}, period={period}")
-    return series.ewm(span=period, adjust=False).mean()
+    return _series(bi.ema(_values(series), period), series, series.name)
 
 def calculate_sma(series: pd.Series, period: int = 9) -> pd.Series:
     """Simple Moving Average."""
     logger.debug(f"Calculating SMA: {series.name}, len={len(series)}, period={period}")
-    return series.rolling(window=period).mean()
-
-def calculate_rsi(close: pd.Series, period: int = 14) -> pd.Series:
-    """Relative Strength Index."""
-    delta = close.diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-    rs = avg_gain / avg_loss.replace(to_replace=0, method="ffill")
-    rsi = 100 - (100 / (1 + rs))
-    logger.debug(f"RSI calculated: period={period}")
-    return rsi
+    return _series(bi.sma(_values(series), period), series, series.name)
+
+def calculate_wma(series: pd.Series, period: int = 9) -> pd.Series:
+    """Linearly Weighted Moving Average."""
+    logger.debug(f"Calculating WMA: {series.name}, len={len(series)}, period={period}")
+    return _series(bi.wma(_values(series), period), series, series.name)
+
+def calculate_rsi(close: pd.Series, period: int = 14, smoothing: str = "sma") -> pd.Series:
+    """Relative Strength Index (smoothing "sma" or "wilder", see batch_indicators.rsi)."""
+    rsi = bi.rsi(_values(close), period, smoothing)
+    logger.debug(f"RSI calculated: period={period}, smoothing={smoothing}")
+    return _series(rsi, close, close.name)
 
 def calculate_macd(series: pd.Series, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> pd.DataFrame:
     """MACD, Signal, Histogram."""
-    ema_fast = calculate_ema(series, fast_period)
-    ema_slow = calculate_ema(series, slow_period)
-    macd = ema_fast - ema_slow
-    signal = macd.ewm(span=signal_period, adjust=False).mean()
-    histogram = macd - signal
+    columns = bi.macd(_values(series), fast_period, slow_period, signal_period)
     logger.debug(f"MACD calculated: fast={fast_period}, slow={slow_period}, signal={signal_period}")
-    return pd.DataFrame({'macd': macd, 'signal': signal, 'histogram': histogram})
+    return pd.DataFrame(columns, index=series.index)
 
 def calculate_bollinger_bands(series: pd.Series, period: int = 20, num_std: float = 2.0) -> pd.DataFrame:
     """Bollinger Bands: Middle, Upper, Lower."""
-    middle_band = calculate_sma(series, period)
-    std = series.rolling(window=period).std()
-    upper_band = middle_band + (std * num_std)
-    lower_band = middle_band - (std * num_std)
+    columns = bi.bollinger_bands(_values(series), period, num_std)
     logger.debug(f"Bollinger Bands calculated: period={period}, num_std={num_std}")
-    return pd.DataFrame({"middle_band": middle_band, "upper_band": upper_band, "lower_band": lower_band})
+    return pd.DataFrame(columns, index=series.index)
 
 def calculate_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
     """Average True Range."""
-    high_low = high - low
-    high_close = (high - close.shift()).abs()
-    low_close = (low - close.shift()).abs()
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    atr = tr.rolling(window=period).mean()
+    atr = bi.atr(_values(high), _values(low), _values(close), period)
     logger.debug(f"ATR calculated: period={period}")
-    return atr
+    return _series(atr, close)
 
 def calculate_stochastic_oscillator(high: pd.Series, low: pd.Series, close: pd.Series, k_period: int = 14, d_period: int = 3) -> pd.DataFrame:
     """Stochastic Oscillator (%K, %D)."""
-    lowest_low = low.rolling(window=k_period).min()
-    highest_high = high.rolling(window=k_period).max()
-    percent_k = 100 * (close - lowest_low) / (highest_high - lowest_low)
-    percent_d = percent_k.rolling(window=d_period).mean()
+    columns = bi.stochastic(_values(high), _values(low), _values(close), k_period, d_period)
     logger.debug(f"Stochastic Oscillator calculated: k_period={k_period}, d_period={d_period}")
-    return pd.DataFrame({'%K': percent_k, '%D': percent_d})
+    return pd.DataFrame(columns, index=close.index)
 
 def calculate_cci(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 20) -> pd.Series:
     """Commodity Channel Index."""
-    tp = (high + low + close) / 3
-    sma = tp.rolling(window=period).mean()
-    mad = tp.rolling(window=period).apply(lambda x: pd.Series(x).mad(), raw=False)
-    cci = (tp - sma) / (0.015 * mad)
+    cci = bi.cci(_values(high), _values(low), _values(close), period)
     logger.debug(f"CCI calculated: period={period}")
-    return cci
+    return _series(cci, close)
 
 def calculate_williams_r(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
     """Williams %R."""
-    highest_high = high.rolling(window=period).max()
-    lowest_low = low.rolling(window=period).min()
-    williams_r = -100 * (highest_high - close) / (highest_high - lowest_low)
+    williams_r = bi.williams_r(_values(high), _values(low), _values(close), period)
     logger.debug(f"Williams %R calculated: period={period}")
-    return williams_r
+    return _series(williams_r, close)
 
 # --- Example signal generation functions ---
 
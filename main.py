@@ -9,10 +9,11 @@ Switch modes with: BOT_MODE=multiprocess or BOT_MODE=asyncio
 
 import os
 import sys
+import asyncio
 import logging
 import signal
 
-from config import SYMBOLS, ANALYSIS_INTERVAL_MINUTES, LOG_TO_CONSOLE, LOG_LEVEL
+from config import SYMBOLS, LOG_TO_CONSOLE, LOG_LEVEL
 
 # ----- Setup Logging -----
 def setup_logging():
@@ -39,25 +40,12 @@ def run_api_process():
         logger.exception("API server crashed")
 
 def run_analysis_process():
-    import asyncio
-    from marketdata import get_ohlc
-    from botstrategies import analyze_symbol
-
     async def analysis_loop():
-        while True:
-            logger.info("🔄 Running analysis...")
-            for symbol in SYMBOLS:
-                try:
-                    df = await get_ohlc(symbol, "H1", bars=200)
-                    if df is not None and not df.empty:
-                        await analyze_symbol(df, symbol, "H1")
-                        logger.info(f"✅ Done: {symbol}")
-                    else:
-                        logger.warning(f"❌ No data: {symbol}")
-                except Exception as e:
-                    logger.exception(f"⚠️ Analysis failed for {symbol}")
-            logger.info(f"⏳ Sleeping {ANALYSIS_INTERVAL_MINUTES}min...")
-            await asyncio.sleep(ANALYSIS_INTERVAL_MINUTES * 60)
+        from http_client import close_http_client
+        try:
+            await analysis_task()
+        finally:
+            await close_http_client()
 
     try:
         asyncio.run(analysis_loop())
@@ -98,22 +86,26 @@ def run_multiprocess():
 # =======================
 
 async def analysis_task():
-    from marketdata import get_ohlc
-    from botstrategies import analyze_symbol
-    while True:
-        logger.info("🔄 Running analysis...")
-        for symbol in SYMBOLS:
-            try:
-                df = await get_ohlc(symbol, "H1", bars=200)
-                if df is not None and not df.empty:
-                    await analyze_symbol(df, symbol, "H1")
+    from prefetch_scheduler import PrefetchScheduler
+    from botstrategies import analyze_symbol, SCAN_INDICATORS
+    from indicator_cache import indicator_columns_many
+    # Wakes a few seconds after every H1 close, once fresh bars are in
+    scheduler = PrefetchScheduler(SYMBOLS, ["H1"])
+    queue = scheduler.subscribe("H1")
+    runner = asyncio.create_task(scheduler.run(), name="prefetch")
+    try:
+        while True:
+            event = await queue.get()
+            logger.info(f"🔄 Running analysis on {len(event.frames)} symbols...")
+            precomputed = indicator_columns_many(event.frames, SCAN_INDICATORS)
+            for symbol, df in event.frames.items():
+                try:
+                    await analyze_symbol(df, symbol, "H1", precomputed=precomputed.get(symbol))
                     logger.info(f"✅ Done: {symbol}")
-                else:
-                    logger.warning(f"❌ No data: {symbol}")
-            except Exception:
-                logger.exception(f"⚠️ Analysis failed: {symbol}")
-        logger.info(f"⏳ Sleeping {ANALYSIS_INTERVAL_MINUTES}min...")
-        await asyncio.sleep(ANALYSIS_INTERVAL_MINUTES * 60)
+                except Exception:
+                    logger.exception(f"⚠️ Analysis failed: {symbol}")
+    finally:
+        runner.cancel()
 
 async def uvicorn_task():
     import uvicorn
@@ -126,9 +118,22 @@ async def telegram_task():
     from telegrambot import start_telegram_listener_async
     await start_telegram_listener_async()  # You must implement this async function
 
+async def xtb_stream_task():
+    from xtb_stream import XTBStreamClient
+    from tick_aggregator import tick_aggregator
+    client = XTBStreamClient(on_tick=tick_aggregator.on_xtb_tick)
+    await client.start()
+    try:
+        while True:
+            await asyncio.sleep(1)
+            tick_aggregator.flush()
+    finally:
+        await client.stop()
+
 async def run_asyncio_all():
-    import asyncio
+    from http_client import start_http_client, close_http_client
 
+    await start_http_client()
     stop_event = asyncio.Event()
 
     def handle_shutdown():
@@ -144,12 +149,15 @@ async def run_asyncio_all():
         asyncio.create_task(uvicorn_task(), name="api"),
         asyncio.create_task(telegram_task(), name="telegram"),
     ]
+    if os.getenv("XTB_STREAM_ENABLED", "false").lower() == "true":
+        tasks.append(asyncio.create_task(xtb_stream_task(), name="xtb-stream"))
 
     await stop_event.wait()
     logger.info("🧹 Cancelling tasks...")
     for t in tasks:
         t.cancel()
     await asyncio.gather(*tasks, return_exceptions=True)
+    await close_http_client()
     logger.info("✅ Clean exit")
 
 # ====================
@@ -159,7 +167,6 @@ async def run_asyncio_all():
 if __name__ == "__main__":
     mode = os.getenv("BOT_MODE", "multiprocess")
     if mode.lower() == "asyncio":
-        import asyncio
         asyncio.run(run_asyncio_all())
     else:
         run_multiprocess()
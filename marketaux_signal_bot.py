@@ -1,6 +1,5 @@
 import os
 import re
-import aiohttp
 import asyncio
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
@@ -10,6 +9,9 @@ import yfinance as yf
 import logging
 import csv
 from news_memory import NewsMemory
+from http_client import http_client
+from request_planner import request_planner
+from marketdata import yahoo_executor
 
 # Load environment variables
 load_dotenv()
@@ -43,6 +45,8 @@ KEYWORDS_BEARISH = [
 SIGNAL_LOG_FILE = "signals_log.csv"
 
 async def fetch_news(symbol="US30"):
+    if not request_planner.acquire("marketaux", priority="low"):
+        return []
     try:
         url = "https://api.marketaux.com/v1/news/all"
         params = {
@@ -51,10 +55,9 @@ async def fetch_news(symbol="US30"):
             "language": "en",
             "published_after": (datetime.utcnow() - timedelta(hours=2)).isoformat()
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, timeout=15) as response:
-                data = await response.json()
-                return data.get("data", [])
+        async with http_client.request("GET", url, params=params, timeout=15) as response:
+            data = await response.json()
+            return data.get("data", [])
     except Exception as e:
         logger.error(f"[Marketaux] Error fetching news: {e}")
         return []
@@ -149,12 +152,14 @@ async def analyze_and_alert_asset(asset, memory: NewsMemory):
         if signal == "HOLD":
             continue
 
-        atr = get_atr(detected_asset)
+        atr = await yahoo_executor.run(get_atr, detected_asset)
         if not atr:
             continue
 
         try:
-            df = yf.download(detected_asset, period="2d", interval="1h", progress=False)
+            df = await yahoo_executor.run(
+                yf.download, detected_asset, period="2d", interval="1h", progress=False
+            )
             entry = round(df['Close'][-1], 4) if not df.empty else 0
         except Exception as e:
             logger.warning(f"[YFinance] Failed to get entry for {detected_asset}: {e}")
@@ -5,19 +5,73 @@ Market data utilities for fetching OHLCV and common indicators.
 - Type annotations and docstrings.
 - Uses logging module instead of print.
 - Allows configurable lookback period and columns.
+- Process-wide candle cache: entries live until the next bar closes and
+  concurrent identical requests share one in-flight fetch.
+- Stale-while-revalidate: a caller passing `max_staleness` (seconds) gets an
+  expired entry at once while it is refreshed in the background, and data
+  older than that is refused. Stale frames carry df.attrs["stale"] and
+  df.attrs["age_seconds"] (seconds since the data stopped being current);
+  stored history served because every provider failed is tagged the same way.
+- Incremental fetching against the persistent bar store: once a symbol has
+  history, providers are only asked for bars after the last stored one.
+- Blocking yfinance downloads run on a dedicated, size-bounded thread pool
+  with per-request timeouts, so they never stall the event loop.
+- Per-provider circuit breakers: a provider with a high rolling error rate is
+  skipped until its cool-down ends; optional hedged requests (OHLC_HEDGED_REQUESTS)
+  fire Yahoo when Finnhub is slower than its p95 latency.
+- Multi-timeframe fetches (get_ohlc_mtf): one lower-timeframe fetch per
+  symbol, higher timeframes resampled locally with FX session anchoring.
+  Yahoo has no 4h interval, so H4 is always resampled from 1h downloads.
+- OHLC_SOURCE=synthetic swaps every provider for the deterministic offline
+  generator in synthetic_market (load tests, benchmarks, no network).
+- FX crosses of the USD majors (EURJPY, GBPAUD, CADCHF, ...) are derived
+  from the cached USD legs (cross_rates) instead of being fetched.
+- Provider choice follows the quota-aware request planner: symbols get the
+  first provider in their chain with budget left, and symbols no provider
+  can afford this cycle are served from the bar store.
+- Yahoo downloads go through the http_replay cassette, so recorded sessions
+  can be replayed offline (HTTP_REPLAY_MODE).
+- Every provider frame is validated and repaired by data_quality before it
+  reaches the bar store or the cache (duplicates, NaNs, spikes, weekend bars,
+  inconsistent OHLC), with per-provider quality stats.
 """
 
 import os
+import time
+import asyncio
+import threading
 import pandas as pd
 import yfinance as yf
 from dotenv import load_dotenv
-from finnhub_data import get_finnhub_data
-from typing import Optional, List, Dict, Any, Union
+from finnhub_data import get_finnhub_data, FINNHUB_SYMBOLS
+from bar_store import bar_store
+from cross_rates import cross_legs, derive_cross_from, is_cross
+from data_quality import validate_ohlc
+from indicator_cache import add_indicator_columns, indicator_columns_many
+from http_replay import cassette, recorded
+from circuit_breaker import call_with_breakers
+from provider_health import record_request
+from request_planner import request_planner
+from staleness import data_age, mark_stale, within
+from synthetic_market import get_synthetic_data
+from resampler import TIMEFRAME_FREQ, IncrementalResampler, next_bar_close, resample_ohlc, timeframe_delta
+from typing import Optional, List, Dict, Any, Union, Tuple, Callable, Awaitable
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+BAR_STORE_ENABLED = os.getenv("BAR_STORE_ENABLED", "true").lower() == "true"
+YAHOO_MAX_WORKERS = int(os.getenv("YAHOO_MAX_WORKERS", "4"))
+YAHOO_TIMEOUT_SECONDS = float(os.getenv("YAHOO_TIMEOUT_SECONDS", "20"))
+OHLC_HEDGED_REQUESTS = os.getenv("OHLC_HEDGED_REQUESTS", "false").lower() == "true"
+OHLC_SOURCE = os.getenv("OHLC_SOURCE", "auto").lower()
+MTF_BASE_TIMEFRAME = os.getenv("MTF_BASE_TIMEFRAME", "H1")
+CANDLE_CACHE_STALE_RETENTION_SECONDS = float(os.getenv("CANDLE_CACHE_STALE_RETENTION_SECONDS", "86400"))
+
+yf_download = recorded("yahoo", yf.download)
+
 YAHOO_SYMBOLS = {
     "EURUSD": "EURUSD=X",
     "GBPUSD": "GBPUSD=X",
@@ -48,12 +102,355 @@ TIMEFRAME_MAP = {
     "D1": "1d",
 }
 
+# Timeframes Yahoo cannot serve directly -> timeframe downloaded and resampled
+YAHOO_RESAMPLED = {
+    "H4": "H1",
+}
+
+# Longest history Yahoo serves per intraday interval, in days
+YAHOO_MAX_DAYS = {
+    "1m": 7,
+    "5m": 60,
+    "15m": 60,
+    "30m": 60,
+    "1h": 730,
+}
+
+TIMEFRAME_SECONDS = {
+    "M1": 60,
+    "M5": 300,
+    "M15": 900,
+    "M30": 1800,
+    "H1": 3600,
+    "H4": 14400,
+    "D1": 86400,
+}
+
+CacheKey = Tuple[str, str, int, str]
+
+
+class CandleCache:
+    """
+    Process-wide OHLC cache keyed by (symbol, timeframe, bars, source).
+
+    - An entry expires when the next bar of its timeframe is due to close.
+    - Concurrent misses for the same key coalesce onto one in-flight fetch.
+    - Expired entries are kept for CANDLE_CACHE_STALE_RETENTION_SECONDS so
+      callers accepting stale data can be answered while a background
+      refresh runs.
+    - Empty and stale-tagged frames (failed fetches) are never stored.
+    - Callers always receive a copy, so they may mutate it freely.
+    """
+
+    def __init__(self, stale_retention: float = CANDLE_CACHE_STALE_RETENTION_SECONDS):
+        self.stale_retention = stale_retention
+        self._entries: Dict[CacheKey, Tuple[float, pd.DataFrame]] = {}
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._background: set = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+        self.revalidations = 0
+
+    @staticmethod
+    def next_bar_close(timeframe: str, now: Optional[float] = None) -> float:
+        """
+        Epoch seconds at which the bar currently forming on `timeframe` closes
+        (H4/D1 on the FX session schedule, like the resampler).
+        """
+        now = time.time() if now is None else now
+        if timeframe.upper() in TIMEFRAME_FREQ:
+            return float(next_bar_close(timeframe.upper(), now))
+        step = TIMEFRAME_SECONDS.get(timeframe.upper(), 3600)
+        return (now // step + 1) * step
+
+    def get(self, key: CacheKey) -> Optional[pd.DataFrame]:
+        """Return a copy of a fresh entry, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, df = entry
+        if expires_at <= time.time():
+            if expires_at + self.stale_retention <= time.time():
+                del self._entries[key]
+            return None
+        return df.copy()
+
+    def get_stale(self, key: CacheKey, max_staleness: float) -> Optional[pd.DataFrame]:
+        """Copy of an expired entry at most `max_staleness` seconds past expiry (tagged stale), or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, df = entry
+        age = time.time() - expires_at
+        if age <= 0 or age > max_staleness:
+            return None
+        return mark_stale(df.copy(), age)
+
+    def put(self, key: CacheKey, df: pd.DataFrame) -> None:
+        """Store `df` until the next bar close of the key's timeframe."""
+        if df is None or df.empty or df.attrs.get("stale"):
+            return
+        self._entries[key] = (self.next_bar_close(key[1]), df.copy())
+
+    def spawn(self, coro: Awaitable[Any]) -> None:
+        """Run a background refresh, keeping a reference until it finishes."""
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+
+        def done(t: asyncio.Future) -> None:
+            self._background.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                logger.warning(f"[Cache] Background refresh failed: {t.exception()}")
+
+        task.add_done_callback(done)
+
+    async def get_or_fetch(
+        self,
+        key: CacheKey,
+        fetcher: Callable[[], Awaitable[pd.DataFrame]],
+        max_staleness: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """
+        Serve `key` from cache, join an identical in-flight fetch, or run `fetcher`.
+
+        Args:
+            key (tuple): (symbol, timeframe, bars, source).
+            fetcher (callable): Coroutine factory performing the real fetch.
+            max_staleness (float, optional): Accept an expired entry up to this
+                many seconds old; it is returned at once (tagged stale) and
+                refreshed in the background.
+
+        Returns:
+            pd.DataFrame: Copy of the cached or freshly fetched frame.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        if max_staleness:
+            stale = self.get_stale(key, max_staleness)
+            if stale is not None:
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self.revalidations += 1
+                    self.spawn(self._fetch(key, fetcher))
+                return stale
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                df = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if inflight.cancelled():
+                    # The leading fetch was cancelled, not us: fetch ourselves.
+                    return await self.get_or_fetch(key, fetcher, max_staleness)
+                raise
+            return df.copy()
+
+        self.misses += 1
+        return (await self._fetch(key, fetcher)).copy()
+
+    async def _fetch(self, key: CacheKey, fetcher: Callable[[], Awaitable[pd.DataFrame]]) -> pd.DataFrame:
+        """Run `fetcher` as the in-flight fetch of `key` and store its result."""
+        future = asyncio.get_running_loop().create_future()
+        # Mark exceptions as retrieved so lone leaders don't log "never retrieved".
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            df = await fetcher()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self.put(key, df)
+        future.set_result(df)
+        return df
+
+    def prime(self, symbol: str, timeframe: str, tail: Callable[[int], pd.DataFrame], bars: int = 200) -> None:
+        """
+        Replace every provider-chain entry of symbol/timeframe (and the default
+        `bars` key) with `tail(n)`, e.g. after bars were pushed into the store.
+        """
+        keys = {k for k in self._entries if k[0] == symbol and k[1] == timeframe and k[3] == "auto:"}
+        keys.add((symbol, timeframe, bars, "auto:"))
+        for key in keys:
+            self.put(key, tail(key[2]))
+
+    def invalidate(self, symbol: str, timeframe: str) -> None:
+        """Drop every entry of symbol/timeframe."""
+        for key in [k for k in self._entries if k[0] == symbol and k[1] == timeframe]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all stored entries (in-flight fetches are left alone)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/coalesce counters and current sizes."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "stale_hits": self.stale_hits,
+            "revalidations": self.revalidations,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+        }
+
+
+candle_cache = CandleCache()
+
+
+def get_candle_cache_stats() -> Dict[str, Any]:
+    """
+    Counters of the process-wide candle cache (hits, misses, coalesced, hit_rate, ...).
+    """
+    return candle_cache.stats()
+
+
+def clear_candle_cache() -> None:
+    """
+    Empty the process-wide candle cache.
+    """
+    candle_cache.clear()
+
+class YahooExecutor:
+    """
+    Bounded thread pool for blocking Yahoo Finance calls.
+
+    - At most `max_workers` downloads run at once; further requests queue.
+    - Each request has a timeout; on timeout or cancellation a request that has
+      not started yet is removed from the queue, and a running one is left to
+      finish in the background with its result discarded.
+    - Queue depth, running count and outcome counters are exposed via stats().
+    - Each call's latency and outcome is recorded in provider_health ("yahoo").
+    """
+
+    def __init__(self, max_workers: int = YAHOO_MAX_WORKERS, timeout: float = YAHOO_TIMEOUT_SECONDS):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yahoo")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.cancelled = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Run `fn(*args, **kwargs)` on the pool and await its result.
+
+        Raises:
+            asyncio.TimeoutError: If the call does not finish within the timeout.
+        """
+        def job():
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        def on_done(cf):
+            with self._lock:
+                if cf.cancelled():
+                    # Never started: it was still counted as queued.
+                    self.queued -= 1
+                    self.cancelled += 1
+                elif cf.exception() is not None:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        if cassette.mode != "replay":
+            request_planner.spend("yahoo")
+        cf = self._pool.submit(job)
+        cf.add_done_callback(on_done)
+        # wrap_future propagates cancellation of the awaiting task to `cf`.
+        future = asyncio.wrap_future(cf)
+        endpoint = getattr(fn, "__name__", "call")
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(future, self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            record_request("yahoo", endpoint, time.monotonic() - started, False, "timeout")
+            raise
+        except Exception as e:
+            record_request("yahoo", endpoint, time.monotonic() - started, False, f"{type(e).__name__}: {e}")
+            raise
+        # yfinance reports most failures as an empty frame
+        ok = not (isinstance(result, pd.DataFrame) and result.empty)
+        record_request("yahoo", endpoint, time.monotonic() - started, ok, None if ok else "empty result")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, running downloads and outcome counters."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "cancelled": self.cancelled,
+            }
+
+
+yahoo_executor = YahooExecutor()
+
+
+def get_yahoo_executor_stats() -> Dict[str, Any]:
+    """
+    Queue depth and counters of the Yahoo download thread pool.
+    """
+    return yahoo_executor.stats()
+
+
+def _yahoo_period(timeframe: str, bars: int) -> str:
+    """
+    Yahoo period covering `bars` bars (weekends included), at least 60 days,
+    capped at what Yahoo serves for the interval.
+    """
+    seconds = TIMEFRAME_SECONDS.get(timeframe, 3600)
+    days = max(int(bars * seconds / 86400 * 7 / 5) + 3, 60)
+    limit = YAHOO_MAX_DAYS.get(TIMEFRAME_MAP.get(timeframe, timeframe))
+    return f"{min(days, limit) if limit else days}d"
+
+def _resample_for_yahoo(df: pd.DataFrame, timeframe: str, bars: int) -> pd.DataFrame:
+    source = YAHOO_RESAMPLED.get(timeframe)
+    if source is None or df.empty:
+        return df
+    return resample_ohlc(df, timeframe, source).tail(bars)
+
 async def get_yf_data(
     symbol: str,
     timeframe: str = "H1",
     bars: int = 200,
     period: Optional[str] = None,
     columns: Optional[List[str]] = None,
+    start: Optional[pd.Timestamp] = None,
 ) -> pd.DataFrame:
     """
     Fetch OHLCV data from Yahoo Finance.
@@ -62,23 +459,33 @@ async def get_yf_data(
         symbol (str): Ticker symbol (internal).
         timeframe (str): Standard timeframe key ("H1", "D1", etc).
         bars (int): Number of bars.
-        period (str, optional): Yahoo period string (e.g. "60d"). If None, defaults to "60d".
+        period (str, optional): Yahoo period string (e.g. "60d"). If None, it is derived
+            from `bars` (at least "60d").
         columns (list, optional): Columns to return, defaults to ["open","high","low","close","volume"].
+        start (Timestamp, optional): Only fetch bars from this (UTC) time onward; overrides period.
 
     Returns:
         pd.DataFrame: DataFrame with requested columns, sorted by date ascending.
     """
     yf_symbol = YAHOO_SYMBOLS.get(symbol, symbol)
-    interval = TIMEFRAME_MAP.get(timeframe, timeframe)
+    source_tf = YAHOO_RESAMPLED.get(timeframe, timeframe)
+    interval = TIMEFRAME_MAP.get(source_tf, source_tf)
+    source_bars = bars * int(TIMEFRAME_SECONDS.get(timeframe, 1) // TIMEFRAME_SECONDS.get(source_tf, 1))
     if period is None:
-        period = "60d"
+        period = _yahoo_period(source_tf, source_bars)
     if columns is None:
         columns = ["open", "high", "low", "close", "volume"]
     try:
-        logger.info(f"[Yahoo] Fetching data for {symbol} → {yf_symbol} ({interval}, period={period})")
-        df = yf.download(
-            yf_symbol, period=period, interval=interval, progress=False
-        )
+        if start is not None:
+            logger.info(f"[Yahoo] Fetching data for {symbol} → {yf_symbol} ({interval}, start={start})")
+            df = await yahoo_executor.run(
+                yf_download, yf_symbol, start=start, interval=interval, progress=False
+            )
+        else:
+            logger.info(f"[Yahoo] Fetching data for {symbol} → {yf_symbol} ({interval}, period={period})")
+            df = await yahoo_executor.run(
+                yf_download, yf_symbol, period=period, interval=interval, progress=False
+            )
         if df.empty:
             logger.warning(f"[Yahoo] No data for {symbol}")
             return pd.DataFrame()
@@ -88,13 +495,77 @@ async def get_yf_data(
         df.columns.name = None
         # Only keep the requested columns if present
         available_cols = [c for c in columns if c in df.columns]
-        df = df[available_cols].dropna().tail(bars)
+        df = df[available_cols].dropna().tail(source_bars)
         df = df.sort_index()
-        return df
+        return _resample_for_yahoo(df, timeframe, bars)
+    except asyncio.TimeoutError:
+        logger.error(f"[Yahoo] Timed out fetching {symbol} after {yahoo_executor.timeout}s")
+        return pd.DataFrame()
     except Exception as e:
         logger.error(f"[Yahoo] Error fetching {symbol}: {e}")
         return pd.DataFrame()
 
+async def get_yf_data_many(
+    symbols: List[str],
+    timeframe: str = "H1",
+    bars: int = 200,
+    period: Optional[str] = None,
+    start: Optional[pd.Timestamp] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Fetch several symbols with ONE multi-ticker Yahoo Finance download.
+
+    Args:
+        symbols (list): Internal symbols (mapped through YAHOO_SYMBOLS).
+        timeframe (str): Standard timeframe key.
+        bars (int): Number of bars per symbol.
+        period (str, optional): Yahoo period string, derived from `bars` by default.
+        start (Timestamp, optional): Only fetch bars from this (UTC) time onward; overrides period.
+
+    Returns:
+        dict: symbol -> OHLCV DataFrame; symbols Yahoo had no data for are omitted.
+    """
+    tickers = {YAHOO_SYMBOLS.get(symbol, symbol): symbol for symbol in symbols}
+    source_tf = YAHOO_RESAMPLED.get(timeframe, timeframe)
+    interval = TIMEFRAME_MAP.get(source_tf, source_tf)
+    source_bars = bars * int(TIMEFRAME_SECONDS.get(timeframe, 1) // TIMEFRAME_SECONDS.get(source_tf, 1))
+    window = {"start": start} if start is not None else {"period": period or _yahoo_period(source_tf, source_bars)}
+    try:
+        logger.info(f"[Yahoo] Batch download of {len(tickers)} tickers ({interval}, {window})")
+        raw = await yahoo_executor.run(
+            yf_download, list(tickers), interval=interval, group_by="ticker",
+            progress=False, **window
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"[Yahoo] Batch download timed out after {yahoo_executor.timeout}s")
+        return {}
+    except Exception as e:
+        logger.error(f"[Yahoo] Batch download failed: {e}")
+        return {}
+    if raw is None or raw.empty:
+        logger.warning("[Yahoo] Batch download returned no data")
+        return {}
+
+    frames = {}
+    for ticker, symbol in tickers.items():
+        if isinstance(raw.columns, pd.MultiIndex):
+            if ticker not in raw.columns.get_level_values(0):
+                continue
+            df = raw[ticker].copy()
+        else:
+            df = raw.copy()
+        df.columns = [str(c).lower() for c in df.columns]
+        df.columns.name = None
+        cols = [c for c in ["open", "high", "low", "close", "volume"] if c in df.columns]
+        df = df[cols].dropna(subset=["close"] if "close" in cols else None).tail(source_bars).sort_index()
+        df = _resample_for_yahoo(df, timeframe, bars)
+        if not df.empty:
+            frames[symbol] = df
+    missing = [s for s in symbols if s not in frames]
+    if missing:
+        logger.warning(f"[Yahoo] No batch data for {missing}")
+    return frames
+
 # Backwards compatibility alias
 async def get_yahoo_data(
     symbol: str, bars: int, timeframe: str = "H1"
@@ -125,8 +596,168 @@ async def get_market_data(
     """
     if source == "finnhub":
         # Finnhub does not support custom columns or period
-        return await get_finnhub_data(symbol, interval=timeframe, limit=bars)
-    return await get_yf_data(symbol, timeframe, bars, period=period, columns=columns)
+        key = (symbol, timeframe, bars, "finnhub")
+        return await candle_cache.get_or_fetch(
+            key, lambda: get_finnhub_data(symbol, interval=timeframe, limit=bars)
+        )
+    key = (symbol, timeframe, bars, f"yfinance:{period or ''}")
+    df = await candle_cache.get_or_fetch(
+        key, lambda: get_yf_data(symbol, timeframe, bars, period=period)
+    )
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+def _incremental_since(symbol: str, timeframe: str, bars: int) -> Optional[pd.Timestamp]:
+    """
+    Last stored bar time (naive UTC) when the bar store can already serve
+    `bars` bars, so only newer bars need fetching; None means a full fetch.
+    """
+    if not BAR_STORE_ENABLED:
+        return None
+    stored = bar_store.load(symbol, timeframe)
+    return stored.index[-1] if len(stored) >= bars else None
+
+def _store_fetched(
+    symbol: str,
+    timeframe: str,
+    bars: int,
+    df: pd.DataFrame,
+    since: Optional[pd.Timestamp],
+) -> pd.DataFrame:
+    """
+    Merge fetched bars into the bar store and return the requested tail.
+    """
+    if not BAR_STORE_ENABLED:
+        return df
+    if df.empty:
+        if since is None:
+            return df
+        logger.warning(f"[OHLC] No new bars for {symbol} {timeframe}; serving stored history")
+        stored = bar_store.tail(symbol, timeframe, bars)
+        if stored.empty:
+            return stored
+        last_close = candle_cache.next_bar_close(timeframe, stored.index[-1].timestamp())
+        return mark_stale(stored, time.time() - last_close)
+    bar_store.merge(symbol, timeframe, df)
+    return bar_store.tail(symbol, timeframe, bars)
+
+def ingest_ohlc(symbol: str, timeframe: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge externally pushed bars (API receiver, bridges) into the bar store and
+    prime the candle cache, so get_ohlc/get_ohlc_many serve them without a fetch.
+
+    Returns:
+        pd.DataFrame: The stored hot tail after the merge.
+    """
+    merged = bar_store.merge(symbol, timeframe, validate_ohlc(df, timeframe, symbol, "ingest"))
+    candle_cache.prime(symbol, timeframe, lambda bars: bar_store.tail(symbol, timeframe, bars))
+    return merged
+
+def _utc(ts: Optional[pd.Timestamp]) -> Optional[pd.Timestamp]:
+    return None if ts is None else ts.tz_localize("UTC")
+
+def _epoch(ts: Optional[pd.Timestamp]) -> Optional[int]:
+    return None if ts is None else int(_utc(ts).timestamp())
+
+def _finnhub_supported(symbol: str) -> bool:
+    """Finnhub is only tried (and only counted by its breaker) for symbols it can serve."""
+    return bool(os.getenv("FINNHUB_API_KEY")) and symbol.upper() in FINNHUB_SYMBOLS
+
+def _provider_chain(symbol: str) -> List[str]:
+    """OHLC providers able to serve `symbol`, best first."""
+    return (["finnhub"] if _finnhub_supported(symbol) else []) + ["yahoo"]
+
+async def _fetch_ohlc_with_fallback(
+    symbol: str,
+    timeframe: str,
+    bars: int,
+    period: Optional[str],
+) -> pd.DataFrame:
+    """
+    Uncached Finnhub → Yahoo fallback fetch used behind the candle cache.
+
+    When the bar store already holds at least `bars` bars, only bars from the
+    last stored timestamp onward are requested (the last bar is re-fetched in
+    case it was still forming) and merged into the store. An explicit Yahoo
+    `period` bypasses the store. Providers whose circuit breaker is open, or
+    that the request planner has no quota budget for, are skipped.
+    """
+    since = None if period is not None else _incremental_since(symbol, timeframe, bars)
+    if since is not None:
+        logger.info(f"[OHLC] Incremental fetch for {symbol} {timeframe} since {since}")
+
+    providers = []
+    if OHLC_SOURCE == "synthetic":
+        providers.append(("synthetic", lambda: get_synthetic_data(
+            symbol, timeframe, bars, start=_utc(since))))
+    else:
+        calls = {
+            "finnhub": lambda: get_finnhub_data(symbol, interval=timeframe, limit=bars, since=_epoch(since)),
+            "yahoo": (lambda: get_yf_data(symbol, timeframe, bars, period=period)) if period is not None
+            else (lambda: get_yf_data(symbol, timeframe, bars, start=_utc(since))),
+        }
+        chain = _provider_chain(symbol)
+        plan = request_planner.plan_ohlc([symbol], {symbol: chain})
+        if symbol in plan.assignments:
+            # Planned provider first; later fallbacks only while they have budget
+            first = chain.index(plan.assignments[symbol])
+            providers = [(name, calls[name]) for i, name in enumerate(chain[first:])
+                         if i == 0 or request_planner.has_budget(name)]
+
+    source, df = await call_with_breakers(providers, hedged=OHLC_HEDGED_REQUESTS)
+    if source is None:
+        logger.warning(f"[OHLC] No provider returned data for {symbol} {timeframe}")
+        df = pd.DataFrame()
+    else:
+        logger.info(f"[OHLC] {source} served {symbol} {timeframe}")
+        df = validate_ohlc(df, timeframe, symbol, source)
+    if period is not None:
+        return df
+    return _store_fetched(symbol, timeframe, bars, df, since)
+
+def _finalize_ohlc(df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Lowercase columns, add the default ema9/ema21/rsi columns and apply column selection.
+    """
+    df.columns = df.columns.str.lower()
+    # Add indicators if "close" is present (memoized per bar, shared with the analyzers)
+    add_indicator_columns(df)
+    # Only keep requested columns if specified
+    if columns is not None:
+        available_cols = [c for c in columns if c in df.columns]
+        df = df[available_cols]
+    return df
+
+async def _cached_ohlc(
+    symbol: str,
+    timeframe: str,
+    bars: int,
+    period: Optional[str] = None,
+    max_staleness: Optional[float] = None,
+) -> pd.DataFrame:
+    """Raw OHLCV through the candle cache (copy, no indicator columns)."""
+    key = (symbol, timeframe, bars, f"auto:{period or ''}")
+    if is_cross(symbol):
+        fetcher = lambda: _derive_cross_ohlc(symbol, timeframe, bars, period)
+    else:
+        fetcher = lambda: _fetch_ohlc_with_fallback(symbol, timeframe, bars, period)
+    return await candle_cache.get_or_fetch(key, fetcher, max_staleness)
+
+async def _derive_cross_ohlc(
+    symbol: str,
+    timeframe: str,
+    bars: int,
+    period: Optional[str] = None,
+) -> pd.DataFrame:
+    """Cross bars from its USD legs (each leg through the candle cache / bar store)."""
+    pairs = [pair for pair, _ in cross_legs(symbol)]
+    legs = await asyncio.gather(*[_cached_ohlc(pair, timeframe, bars, period) for pair in pairs])
+    df = derive_cross_from(symbol, dict(zip(pairs, legs)), bars)
+    if any(leg.attrs.get("stale") for leg in legs):
+        mark_stale(df, max(data_age(leg) for leg in legs))
+    logger.info(f"[OHLC] Derived {symbol} {timeframe} from {' / '.join(pairs)} ({len(df)} bars)")
+    return df
 
 async def get_ohlc(
     symbol: str,
@@ -134,50 +765,272 @@ async def get_ohlc(
     bars: int = 200,
     columns: Optional[List[str]] = None,
     period: Optional[str] = None,
+    max_staleness: Optional[float] = None,
 ) -> pd.DataFrame:
     """
     Fetch OHLCV data for a symbol, with fallback from Finnhub to Yahoo Finance.
 
+    Results are served from the process-wide candle cache until the next bar
+    closes; concurrent calls for the same symbol/timeframe share one fetch.
+
     Args:
         symbol (str): Symbol to fetch.
         timeframe (str): Timeframe key.
         bars (int): Number of bars.
         columns (list, optional): Columns to keep.
         period (str, optional): Yahoo period string.
+        max_staleness (float, optional): Seconds of staleness the caller accepts.
+            Expired cached bars within it are returned immediately and
+            refreshed in the background; older data yields an empty frame.
+            None keeps the plain behaviour (no stale cache reads).
 
     Returns:
-        pd.DataFrame: DataFrame with at least 'open','high','low','close','volume' columns.
+        pd.DataFrame: DataFrame with at least 'open','high','low','close','volume'
+        columns; df.attrs["stale"] / ["age_seconds"] are set on stale data.
     """
     logger.info(f"[OHLC] Start fetching {symbol} - {timeframe}")
-    df = await get_finnhub_data(symbol, interval=timeframe, limit=bars)
-    if not df.empty:
-        logger.info(f"[Finnhub] Success for {symbol}")
-    else:
-        logger.warning(f"[Finnhub] Failed. Falling back to Yahoo for {symbol}")
-        df = await get_yf_data(symbol, timeframe, bars, period=period, columns=columns)
+    df = await _cached_ohlc(symbol, timeframe, bars, period, max_staleness)
     if df.empty:
         logger.error(f"[ERROR] No data available for {symbol}")
         return df
-    df.columns = df.columns.str.lower()
-    # Add indicators if "close" is present
-    if "close" in df.columns:
-        if "ema9" not in df.columns:
-            df["ema9"] = df["close"].ewm(span=9, adjust=False).mean()
-        if "ema21" not in df.columns:
-            df["ema21"] = df["close"].ewm(span=21, adjust=False).mean()
-        if "rsi" not in df.columns:
-            delta = df["close"].diff()
-            gain = delta.clip(lower=0)
-            loss = -delta.clip(upper=0)
-            avg_gain = gain.rolling(window=14).mean()
-            avg_loss = loss.rolling(window=14).mean()
-            rs = avg_gain / avg_loss
-            df["rsi"] = 100 - (100 / (1 + rs))
-    # Only keep requested columns if specified
-    if columns is not None:
-        available_cols = [c for c in columns if c in df.columns]
-        df = df[available_cols]
-    return df
+    if not within(df, max_staleness):
+        logger.error(f"[ERROR] {symbol} {timeframe} data is {data_age(df):.0f}s stale (limit {max_staleness:.0f}s)")
+        return pd.DataFrame()
+    return _finalize_ohlc(df, columns)
+
+async def _fetch_ohlc_many_raw(
+    symbols: List[str],
+    timeframe: str,
+    bars: int,
+    max_staleness: Optional[float] = None,
+) -> Dict[str, pd.DataFrame]:
+    """Raw OHLCV per symbol for get_ohlc_many (no indicator columns)."""
+    crosses = [s for s in dict.fromkeys(symbols) if is_cross(s)]
+    if crosses:
+        # Fetch the USD legs once for all crosses, then derive the crosses locally.
+        legs = [pair for s in crosses for pair, _ in cross_legs(s)]
+        direct = [s for s in symbols if s not in crosses]
+        frames = await _fetch_ohlc_many_raw(list(dict.fromkeys(direct + legs)), timeframe, bars, max_staleness)
+        for symbol in crosses:
+            key = (symbol, timeframe, bars, "auto:")
+            df = candle_cache.get(key)
+            if df is None:
+                df = derive_cross_from(symbol, frames, bars)
+                ages = [data_age(frames.get(pair)) for pair, _ in cross_legs(symbol)]
+                if max(ages) > 0:
+                    mark_stale(df, max(ages))
+                candle_cache.put(key, df)
+            frames[symbol] = df
+        return frames
+
+    logger.info(f"[OHLC] Batch fetching {len(symbols)} symbols - {timeframe}")
+    keys = {symbol: (symbol, timeframe, bars, "auto:") for symbol in symbols}
+    frames: Dict[str, pd.DataFrame] = {}
+    pending: List[str] = []
+    for symbol in dict.fromkeys(symbols):
+        cached = candle_cache.get(keys[symbol])
+        if cached is not None:
+            candle_cache.hits += 1
+            frames[symbol] = cached
+        else:
+            stale = candle_cache.get_stale(keys[symbol], max_staleness) if max_staleness else None
+            if stale is not None:
+                candle_cache.stale_hits += 1
+                frames[symbol] = stale
+            else:
+                candle_cache.misses += 1
+                pending.append(symbol)
+
+    # Stale-while-revalidate: serve expired entries now, refresh them in one background batch
+    revalidate = [s for s in frames if frames[s].attrs.get("stale") and keys[s] not in _revalidating]
+    if revalidate:
+        candle_cache.revalidations += len(revalidate)
+        candle_cache.spawn(_revalidate_many(revalidate, timeframe, bars))
+    if not pending:
+        return frames
+
+    since = {symbol: _incremental_since(symbol, timeframe, bars) for symbol in pending}
+
+    fetched: Dict[str, pd.DataFrame] = {}
+    remote = pending
+    if OHLC_SOURCE == "synthetic":
+        for symbol in pending:
+            df = await get_synthetic_data(symbol, timeframe, bars, start=_utc(since[symbol]))
+            fetched[symbol] = validate_ohlc(df, timeframe, symbol, "synthetic")
+        remote = []
+
+    plan = request_planner.plan_ohlc(remote, {s: _provider_chain(s) for s in remote})
+    finnhub_group = plan.symbols_for("finnhub")
+    results = await asyncio.gather(*[
+        call_with_breakers([("finnhub", lambda s=s: get_finnhub_data(
+            s, interval=timeframe, limit=bars, since=_epoch(since[s])))])
+        for s in finnhub_group
+    ])
+    fetched.update({
+        s: validate_ohlc(df, timeframe, s, source)
+        for s, (source, df) in zip(finnhub_group, results) if source is not None
+    })
+
+    # Yahoo takes its planned symbols plus Finnhub failures, in one download
+    yahoo_group = [s for s in remote if s not in fetched and s not in plan.deferred]
+    if yahoo_group and (plan.symbols_for("yahoo") or request_planner.has_budget("yahoo")):
+        starts = [since[s] for s in yahoo_group]
+        start = min(starts) if all(ts is not None for ts in starts) else None
+        source, batch = await call_with_breakers(
+            [("yahoo", lambda: get_yf_data_many(yahoo_group, timeframe, bars, start=_utc(start)))],
+            is_success=bool,
+        )
+        fetched.update({s: validate_ohlc(df, timeframe, s, "yahoo") for s, df in (batch or {}).items()})
+
+    for symbol in pending:
+        df = _store_fetched(symbol, timeframe, bars, fetched.get(symbol, pd.DataFrame()), since[symbol])
+        candle_cache.put(keys[symbol], df)
+        frames[symbol] = df
+
+    return frames
+
+_revalidating: set = set()
+
+async def _revalidate_many(symbols: List[str], timeframe: str, bars: int) -> None:
+    keys = {(symbol, timeframe, bars, "auto:") for symbol in symbols}
+    _revalidating.update(keys)
+    try:
+        await _fetch_ohlc_many_raw(symbols, timeframe, bars)
+    finally:
+        _revalidating.difference_update(keys)
+
+async def get_ohlc_many(
+    symbols: List[str],
+    timeframe: str = "H1",
+    bars: int = 200,
+    columns: Optional[List[str]] = None,
+    max_staleness: Optional[float] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Batch version of get_ohlc for scanners.
+
+    Symbols already in the candle cache are served from it. The rest are
+    grouped by provider: Finnhub-supported symbols are fetched concurrently,
+    and everything Finnhub could not serve goes out as ONE multi-ticker
+    Yahoo download. Results feed the candle cache and bar store under the
+    same keys get_ohlc uses, so later get_ohlc calls are cache hits.
+
+    Args:
+        symbols (list): Internal symbols.
+        timeframe (str): Timeframe key.
+        bars (int): Number of bars per symbol.
+        columns (list, optional): Columns to keep.
+        max_staleness (float, optional): Seconds of staleness accepted, as in get_ohlc.
+
+    Returns:
+        dict: symbol -> DataFrame (empty DataFrame when no source had data
+        recent enough).
+    """
+    frames = await _fetch_ohlc_many_raw(symbols, timeframe, bars, max_staleness)
+    # Indicator cache misses of the whole batch are computed in one vectorized pass
+    indicator_columns_many({s: df for s, df in frames.items() if within(df, max_staleness)})
+    out = {}
+    for symbol in symbols:
+        df = frames.get(symbol, pd.DataFrame())
+        if df.empty or not within(df, max_staleness):
+            logger.error(f"[ERROR] No data available for {symbol}")
+            out[symbol] = pd.DataFrame()
+        else:
+            out[symbol] = _finalize_ohlc(df.copy(), columns)
+    return out
+
+_resamplers: Dict[Tuple[str, str, Tuple[str, ...]], IncrementalResampler] = {}
+
+def _mtf_base_bars(base_timeframe: str, timeframes: List[str], bars: int) -> int:
+    """
+    Base bars needed for `bars` bars of every requested timeframe, capped at
+    what the bar store keeps (so repeat fetches stay incremental).
+    """
+    base_seconds = timeframe_delta(base_timeframe).total_seconds()
+    ratio = max(int(timeframe_delta(tf).total_seconds() // base_seconds) for tf in timeframes)
+    needed = bars * max(ratio, 1)
+    return min(needed, bar_store.max_bars) if BAR_STORE_ENABLED else needed
+
+def _resample_frames(
+    symbol: str,
+    base: pd.DataFrame,
+    base_timeframe: str,
+    timeframes: List[str],
+    bars: int,
+    columns: Optional[List[str]],
+) -> Dict[str, pd.DataFrame]:
+    """
+    Feed new base bars into the symbol's incremental resampler and cut every timeframe.
+    """
+    if base.empty:
+        logger.error(f"[ERROR] No data available for {symbol}")
+        return {tf: pd.DataFrame() for tf in timeframes}
+    targets = tuple(tf for tf in timeframes if tf != base_timeframe)
+    key = (symbol, base_timeframe, targets)
+    if key not in _resamplers:
+        _resamplers[key] = IncrementalResampler(base_timeframe, targets)
+    resampler = _resamplers[key]
+    resampler.update_frame(base)
+
+    out = {}
+    for tf in timeframes:
+        df = base.tail(bars).copy() if tf == base_timeframe else resampler.frame(tf).tail(bars).copy()
+        out[tf] = _finalize_ohlc(df, columns)
+    return out
+
+async def get_ohlc_mtf(
+    symbol: str,
+    timeframes: Tuple[str, ...] = ("H1", "H4", "D1"),
+    bars: int = 200,
+    columns: Optional[List[str]] = None,
+    base_timeframe: str = MTF_BASE_TIMEFRAME,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Several timeframes for one symbol from a single base-timeframe fetch.
+
+    Higher timeframes are resampled locally (D1/H4/W1 anchored to the 17:00
+    New York session) and kept up to date incrementally as base bars arrive.
+    The newest resampled bar is usually still forming: `df.attrs["partial"]`.
+
+    Args:
+        symbol (str): Symbol to fetch.
+        timeframes (tuple): Timeframe keys, none lower than `base_timeframe`.
+        bars (int): Bars per timeframe (higher timeframes may get fewer when
+            the base history is capped by the bar store size).
+        columns (list, optional): Columns to keep.
+        base_timeframe (str): Timeframe actually fetched from the providers.
+
+    Returns:
+        dict: timeframe -> DataFrame.
+    """
+    timeframes = list(timeframes)
+    base_bars = _mtf_base_bars(base_timeframe, timeframes, bars)
+    logger.info(f"[OHLC] Multi-timeframe fetch {symbol} {timeframes} from {base_bars} {base_timeframe} bars")
+    base = await _cached_ohlc(symbol, base_timeframe, base_bars)
+    return _resample_frames(symbol, base, base_timeframe, timeframes, bars, columns)
+
+async def get_ohlc_mtf_many(
+    symbols: List[str],
+    timeframes: Tuple[str, ...] = ("H1", "H4", "D1"),
+    bars: int = 200,
+    columns: Optional[List[str]] = None,
+    base_timeframe: str = MTF_BASE_TIMEFRAME,
+) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    get_ohlc_mtf for several symbols, fetching the base timeframe in one batch.
+
+    Returns:
+        dict: symbol -> timeframe -> DataFrame.
+    """
+    timeframes = list(timeframes)
+    base_bars = _mtf_base_bars(base_timeframe, timeframes, bars)
+    frames = await _fetch_ohlc_many_raw(symbols, base_timeframe, base_bars)
+    return {
+        symbol: _resample_frames(
+            symbol, frames.get(symbol, pd.DataFrame()), base_timeframe, timeframes, bars, columns
+        )
+        for symbol in symbols
+    }
 
 def set_logging_level(level: Union[int, str] = logging.INFO):
     """
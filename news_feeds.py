@@ -1,6 +1,7 @@
 # news_feeds.py
 from economic_calendar_module import fetch_major_events
 import feedparser
+from http_replay import recorded
 import datetime
 from news_signal_logic import analyze_news_headline
 import os # For potential path joining if cache file needs it, not directly used for cache logic here
@@ -34,12 +35,14 @@ UPCOMING_EVENTS = [ # This seems like static data, not directly affected by news
 
 NEWS_CACHE_EXPIRY_HOURS = 72 # Or from a central config
 
+parse_feed = recorded("feeds", feedparser.parse)  # replayable offline, see http_replay
+
 def fetch_rss_headlines(news_cache, cache_updated_flags):
     """Fetches RSS headlines, filters against cache, and updates cache."""
     new_headlines = []
     for url in RSS_FEEDS:
         try:
-            feed = feedparser.parse(url)
+            feed = parse_feed(url)
             for entry in feed.entries:
                 title = entry.get('title', '').strip()
                 published_str = entry.get('published', '') or entry.get('pubDate', '')
@@ -70,7 +73,7 @@ def fetch_reddit_headlines(news_cache, cache_updated_flags):
     for sub in REDDIT_SUBS:
         url = f"https://www.reddit.com/r/{sub}/hot.json?limit=10"
         try:
-            r = requests.get(url, headers=headers, timeout=8)
+            r = recorded("http", requests.get)(url, headers=headers, timeout=8)
             r.raise_for_status() # Check for HTTP errors
             posts = r.json().get("data", {}).get("children", [])
             for p in posts:
@@ -1,9 +1,13 @@
 # news_fetcher.py
 
 import os
-import aiohttp
+import time
+import asyncio
 import asyncpraw
 from dotenv import load_dotenv
+from http_client import http_client
+from request_planner import request_planner
+from staleness import Headlines
 
 load_dotenv()
 
@@ -14,8 +18,14 @@ REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT", "TomaForexBot/1.0")
 
 SUBREDDITS = ["Forex", "StockMarket", "WallStreetBets"]
 
+# Combined headlines are reused for NEWS_FRESH_SECONDS; after that they are stale
+NEWS_FRESH_SECONDS = float(os.getenv("NEWS_FRESH_SECONDS", "300"))
+
+_last_news = {"at": 0.0, "headlines": []}
+_refresh_task = None
+
 async def fetch_newsapi_headlines(limit: int = 5):
-    if not NEWS_API_KEY:
+    if not NEWS_API_KEY or not request_planner.acquire("newsapi", priority="low"):
         return []
     url = "https://newsapi.org/v2/top-headlines"
     params = {
@@ -25,10 +35,9 @@ async def fetch_newsapi_headlines(limit: int = 5):
         "pageSize": limit,
     }
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, timeout=10) as resp:
-                data = await resp.json()
-                return [a.get("title", "") for a in data.get("articles", [])]
+        async with http_client.request("GET", url, params=params, timeout=10) as resp:
+            data = await resp.json()
+            return [a.get("title", "") for a in data.get("articles", [])]
     except Exception:
         return []
 
@@ -53,7 +62,39 @@ async def fetch_reddit_headlines(limit: int = 5):
     await reddit.close()
     return headlines[:limit]
 
-async def fetch_combined_news():
+async def _fetch_combined_live():
     newsapi = await fetch_newsapi_headlines()
     reddit = await fetch_reddit_headlines()
-    return newsapi + reddit
+    headlines = newsapi + reddit
+    if headlines:
+        _last_news.update(at=time.time(), headlines=headlines)
+    return headlines
+
+def _revalidate():
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.ensure_future(_fetch_combined_live())
+        _refresh_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+async def fetch_combined_news(max_staleness=None):
+    """
+    NewsAPI + Reddit headlines with stale-while-revalidate.
+
+    Args:
+        max_staleness (float, optional): Seconds of staleness the caller accepts.
+            Older headlines within it are returned at once and refreshed in the
+            background. None: never served stale.
+
+    Returns:
+        Headlines: list of headline strings with .stale / .age_seconds.
+    """
+    cached = _last_news["headlines"]
+    age = time.time() - _last_news["at"] - NEWS_FRESH_SECONDS
+    if cached and age <= 0:
+        return Headlines(cached)
+    usable = bool(cached) and max_staleness is not None and age <= max_staleness
+    if usable:
+        _revalidate()
+        return Headlines(cached, age)
+    headlines = await _fetch_combined_live()
+    return Headlines(headlines)
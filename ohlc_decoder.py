@@ -0,0 +1,171 @@
+"""
+Columnar decoders for provider OHLC JSON payloads.
+
+- Pulls each field out of a payload in one pass into flat arrays, then
+  converts prices with one `pd.to_numeric` and timestamps with one
+  `pd.to_datetime` call, instead of building a dict per candle.
+- Every decoder returns the standard schema used by the bar store:
+  float64 open/high/low/close/volume columns, naive UTC DatetimeIndex
+  named "time", sorted and without duplicate timestamps.
+- Candles with a missing/invalid timestamp or price are dropped
+  (volume may be missing and is then NaN).
+- Supported payloads: OANDA v3 candles, fxpricing prices, Yahoo v8 chart,
+  Alpha Vantage FX time series and XTB xAPI chart rate infos.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def empty_ohlc() -> pd.DataFrame:
+    """Empty frame in the standard schema."""
+    return pd.DataFrame(
+        {col: pd.Series(dtype="float64") for col in OHLCV_COLUMNS},
+        index=pd.DatetimeIndex([], name="time"),
+    )
+
+
+def frame_from_columns(
+    times: Sequence[Any],
+    open_: Sequence[Any],
+    high: Sequence[Any],
+    low: Sequence[Any],
+    close: Sequence[Any],
+    volume: Optional[Sequence[Any]] = None,
+    unit: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Build a standard OHLCV frame from parallel column sequences.
+
+    Args:
+        times: Timestamps (strings, or epoch numbers when `unit` is given).
+        open_, high, low, close: Prices (numbers or numeric strings; None allowed).
+        volume (optional): Volumes; NaN when omitted.
+        unit (str, optional): Epoch unit for numeric timestamps ("s", "ms").
+
+    Returns:
+        pd.DataFrame: Standard schema, invalid candles dropped.
+    """
+    if len(times) == 0:
+        return empty_ohlc()
+    index = pd.to_datetime(pd.Series(times), unit=unit, utc=True, errors="coerce")
+    data = {
+        name: pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64)
+        for name, values in zip(OHLCV_COLUMNS, (open_, high, low, close))
+    }
+    data["volume"] = (
+        np.full(len(times), np.nan)
+        if volume is None
+        else pd.to_numeric(pd.Series(volume), errors="coerce").to_numpy(dtype=np.float64)
+    )
+    df = pd.DataFrame(data, index=pd.DatetimeIndex(index.dt.tz_convert(None), name="time"))
+
+    valid = df.index.notna() & ~np.isnan(df[OHLCV_COLUMNS[:4]].to_numpy()).any(axis=1)
+    if not valid.all():
+        logger.warning(f"[Decoder] Dropped {int((~valid).sum())} invalid candles")
+        df = df[valid]
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind="stable")
+    if df.index.has_duplicates:
+        df = df[~df.index.duplicated(keep="last")]
+    return df
+
+
+def decode_oanda(payload: Dict[str, Any], complete_only: bool = True) -> pd.DataFrame:
+    """
+    OANDA v3 /instruments/{instrument}/candles with price=M.
+    Still-forming candles are skipped unless `complete_only` is False.
+    """
+    candles = payload.get("candles") or []
+    if complete_only:
+        candles = [c for c in candles if c.get("complete", False)]
+    if not candles:
+        return empty_ohlc()
+    rows = [
+        (c.get("time"), m.get("o"), m.get("h"), m.get("l"), m.get("c"), c.get("volume"))
+        for c in candles
+        for m in (c.get("mid") or {},)
+    ]
+    times, o, h, l, cl, v = zip(*rows)
+    return frame_from_columns(times, o, h, l, cl, v)
+
+
+def decode_fxpricing(payload: Dict[str, Any]) -> pd.DataFrame:
+    """
+    fxpricing /v1/prices: {"prices": [{"time", "open", "high", "low", "close"}, ...]}.
+    """
+    prices = payload.get("prices") or []
+    if not prices:
+        return empty_ohlc()
+    rows = [
+        (p.get("time"), p.get("open"), p.get("high"), p.get("low"), p.get("close"), p.get("volume"))
+        for p in prices
+    ]
+    times, o, h, l, cl, v = zip(*rows)
+    return frame_from_columns(times, o, h, l, cl, v)
+
+
+def decode_yahoo_chart(payload: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Yahoo v8 /finance/chart: already columnar (epoch-second timestamps plus
+    quote arrays), so the arrays are handed over as-is.
+    """
+    results = (payload.get("chart") or {}).get("result") or []
+    if not results:
+        return empty_ohlc()
+    result = results[0]
+    times = result.get("timestamp") or []
+    quote = ((result.get("indicators") or {}).get("quote") or [{}])[0]
+    n = len(times)
+
+    def column(name):
+        values = quote.get(name)
+        return values[:n] if values is not None and len(values) >= n else [None] * n
+
+    return frame_from_columns(
+        times, column("open"), column("high"), column("low"), column("close"),
+        column("volume"), unit="s",
+    )
+
+
+def decode_alpha_vantage(payload: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Alpha Vantage FX_INTRADAY / FX_DAILY: {"Time Series ...": {time: {"1. open": ...}}}.
+    """
+    series = next((v for k, v in payload.items() if "Time Series" in k), None)
+    if not series:
+        return empty_ohlc()
+    times = list(series.keys())
+    rows = [
+        (bar.get("1. open"), bar.get("2. high"), bar.get("3. low"), bar.get("4. close"), bar.get("5. volume"))
+        for bar in series.values()
+    ]
+    o, h, l, cl, v = zip(*rows)
+    return frame_from_columns(times, o, h, l, cl, v)
+
+
+def decode_xtb_rate_infos(return_data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    XTB xAPI getChartLastRequest / getChartRangeRequest returnData.
+    Prices use shifted notation: `open` is an integer number of 10^-digits
+    units and high/low/close are offsets from open.
+    """
+    infos = return_data.get("rateInfos") or []
+    if not infos:
+        return empty_ohlc()
+    digits = int(return_data.get("digits", 0))
+    rows = [(r.get("ctm"), r.get("open"), r.get("high"), r.get("low"), r.get("close"), r.get("vol")) for r in infos]
+    times, o, h, l, cl, v = (np.array(col, dtype=np.float64) for col in zip(*rows))
+
+    def price(units):
+        return np.round(units * 10.0 ** -digits, digits)
+
+    return frame_from_columns(
+        times.astype(np.int64), price(o), price(o + h), price(o + l), price(o + cl), v, unit="ms",
+    )
@@ -3,9 +3,10 @@ import asyncio
 import pandas as pd
 from dotenv import load_dotenv
 from telegram import Bot
-from indicators import calculate_rsi
+from indicator_cache import indicator_columns_many
 from patterns import detect_patterns
-from marketdata import get_ohlc  # Use this instead of MT5
+from marketdata import get_ohlc_many  # Use this instead of MT5
+from staleness import data_age, format_age
 
 load_dotenv()
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
@@ -15,12 +16,16 @@ MONITOR_PAIRS = ["EURUSD", "GBPUSD", "USDJPY"]
 TIMEFRAME = "H1"
 MIN_RSI_BUY = 35
 MAX_RSI_SELL = 65
+MAX_STALENESS_SECONDS = 3600  # oldest cached bars worth alerting on
 
 bot = Bot(token=TELEGRAM_TOKEN)
 
 async def analyze_and_alert():
+    frames = await get_ohlc_many(MONITOR_PAIRS, TIMEFRAME, bars=100, max_staleness=MAX_STALENESS_SECONDS)
+    # RSI for every pair from the indicator cache (misses in one batched pass)
+    rsi_by_symbol = indicator_columns_many(frames, ("rsi",))
     for symbol in MONITOR_PAIRS:
-        df = await get_ohlc(symbol, TIMEFRAME, bars=100)
+        df = frames.get(symbol)
 
         if df is None or df.empty:
             print(f"[{symbol}] No data.")
@@ -46,8 +51,7 @@ async def analyze_and_alert():
         elif patterns['pin_bar'] == "bearish":
             last_pattern = "Bearish Pin Bar"
 
-        rsi = calculate_rsi(df["Close"], 14)
-        df["RSI"] = rsi
+        df["RSI"] = rsi_by_symbol[symbol]["rsi"]
 
         last = df.iloc[-1]
         last_rsi = last.get("RSI", None)
@@ -66,6 +70,9 @@ async def analyze_and_alert():
                 reason = "Pattern + RSI overbought"
 
         if alert:
+            age = data_age(df)
+            if age:
+                alert += f"\n⚠️ Stale data: {format_age(age)} old"
             print(f"[ALERT] {alert} ({reason})")
             try:
                 bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=alert)
@@ -0,0 +1,192 @@
+"""
+Bar-close aligned market data prefetch.
+
+- Wakes PREFETCH_DELAY_SECONDS after each bar close of every scheduled
+  timeframe (H4/D1/W1 on the 17:00 New York session schedule, see resampler)
+  and fetches all symbols with get_ohlc_many.
+- Symbols are fetched in batches of PREFETCH_BATCH_SIZE, spaced so that no
+  more than PREFETCH_REQUESTS_PER_MINUTE symbol requests go out per minute.
+- A symbol is fresh once its data contains the bar that just closed. Fresh
+  symbols are published to subscribers at once; late ones are re-fetched
+  (cache entry dropped) every PREFETCH_RETRY_SECONDS, up to
+  PREFETCH_MAX_RETRIES times, and published when they arrive.
+- FX symbols are skipped while the market is closed (Friday 17:00 to Sunday
+  17:00 New York); ALWAYS_OPEN_SYMBOLS (crypto) are fetched around the clock.
+
+Usage:
+    scheduler = PrefetchScheduler(SYMBOLS, ["H1"])
+    queue = scheduler.subscribe("H1")
+    asyncio.create_task(scheduler.run())
+    while True:
+        event = await queue.get()      # FreshBars
+        for symbol, df in event.frames.items(): ...
+"""
+
+import os
+import time
+import asyncio
+import logging
+import pandas as pd
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from marketdata import candle_cache, get_ohlc_many
+from resampler import bucket_start_seconds, fx_market_open, next_bar_close
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_DELAY_SECONDS = float(os.getenv("PREFETCH_DELAY_SECONDS", "5"))
+PREFETCH_BATCH_SIZE = int(os.getenv("PREFETCH_BATCH_SIZE", "10"))
+PREFETCH_REQUESTS_PER_MINUTE = float(os.getenv("PREFETCH_REQUESTS_PER_MINUTE", "60"))
+PREFETCH_RETRY_SECONDS = float(os.getenv("PREFETCH_RETRY_SECONDS", "15"))
+PREFETCH_MAX_RETRIES = int(os.getenv("PREFETCH_MAX_RETRIES", "8"))
+ALWAYS_OPEN_SYMBOLS = {s.strip().upper() for s in os.getenv("ALWAYS_OPEN_SYMBOLS", "BTCUSD,ETHUSD").split(",") if s.strip()}
+
+Fetcher = Callable[[List[str], str, int], Awaitable[Dict[str, pd.DataFrame]]]
+
+
+class FreshBars(NamedTuple):
+    timeframe: str
+    bar_close: Optional[pd.Timestamp]  # None for the start-up fetch
+    frames: Dict[str, pd.DataFrame]
+    delay: float  # seconds from bar close to publication
+
+
+class PrefetchScheduler:
+    """
+    Fetches symbols right after each bar close and publishes fresh frames.
+    """
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        timeframes: Iterable[str] = ("H1",),
+        bars: int = 200,
+        delay: float = PREFETCH_DELAY_SECONDS,
+        batch_size: int = PREFETCH_BATCH_SIZE,
+        requests_per_minute: float = PREFETCH_REQUESTS_PER_MINUTE,
+        retry_seconds: float = PREFETCH_RETRY_SECONDS,
+        max_retries: int = PREFETCH_MAX_RETRIES,
+        fetch: Fetcher = get_ohlc_many,
+    ):
+        self.symbols = list(dict.fromkeys(symbols))
+        self.timeframes = list(dict.fromkeys(timeframes))
+        self.bars = bars
+        self.delay = delay
+        self.batch_size = max(1, batch_size)
+        self.requests_per_minute = requests_per_minute
+        self.retry_seconds = retry_seconds
+        self.max_retries = max_retries
+        self.fetch = fetch
+        self.cycles = 0
+        self.published = 0
+        self.stale = 0
+        self.last_delay: Dict[str, float] = {}
+        self._subscribers: List[tuple] = []
+        self._budget_lock = asyncio.Lock()
+        self._next_request = 0.0
+        self._cycles: set = set()
+
+    def subscribe(self, timeframe: Optional[str] = None) -> "asyncio.Queue[FreshBars]":
+        """Queue receiving FreshBars for `timeframe` (all timeframes when None)."""
+        queue: "asyncio.Queue[FreshBars]" = asyncio.Queue()
+        self._subscribers.append((timeframe, queue))
+        return queue
+
+    def _publish(self, event: FreshBars) -> None:
+        self.published += 1
+        self.last_delay[event.timeframe] = event.delay
+        for timeframe, queue in self._subscribers:
+            if timeframe is None or timeframe == event.timeframe:
+                queue.put_nowait(event)
+
+    async def run(self, initial: bool = True) -> None:
+        """
+        Schedule loop (runs until cancelled).
+
+        Args:
+            initial (bool): Fetch and publish every timeframe once at start-up.
+        """
+        if initial:
+            for tf in self.timeframes:
+                self._spawn(self._cycle(tf, None))
+        try:
+            while True:
+                now = time.time()
+                closes = {tf: next_bar_close(tf, now) for tf in self.timeframes}
+                close = min(closes.values())
+                await asyncio.sleep(max(0.0, close + self.delay - time.time()))
+                for tf, tf_close in closes.items():
+                    if tf_close == close:
+                        self._spawn(self._cycle(tf, close))
+        finally:
+            for task in list(self._cycles):
+                task.cancel()
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._cycles.add(task)
+        task.add_done_callback(self._cycles.discard)
+
+    def _open_symbols(self, bar_start: Optional[int]) -> List[str]:
+        if bar_start is None or fx_market_open(bar_start):
+            return list(self.symbols)
+        return [s for s in self.symbols if s.upper() in ALWAYS_OPEN_SYMBOLS]
+
+    async def _throttle(self, requests: int) -> None:
+        """Wait for `requests` slots of the per-minute request budget."""
+        async with self._budget_lock:
+            wait = self._next_request - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_request = max(self._next_request, time.monotonic()) + requests * 60.0 / self.requests_per_minute
+
+    async def _fetch(self, symbols: List[str], timeframe: str) -> Dict[str, pd.DataFrame]:
+        frames: Dict[str, pd.DataFrame] = {}
+        for i in range(0, len(symbols), self.batch_size):
+            batch = symbols[i:i + self.batch_size]
+            await self._throttle(len(batch))
+            try:
+                frames.update(await self.fetch(batch, timeframe, self.bars))
+            except Exception as e:
+                logger.error(f"[Prefetch] {timeframe} fetch failed for {batch}: {e}")
+        return frames
+
+    async def _cycle(self, timeframe: str, close: Optional[int]) -> None:
+        """Fetch every open symbol for the bar closing at `close` until it is fresh everywhere."""
+        self.cycles += 1
+        bar_start = None if close is None else bucket_start_seconds(close - 1, timeframe)
+        pending = self._open_symbols(bar_start)
+        if not pending:
+            logger.debug(f"[Prefetch] Market closed, skipping {timeframe} close")
+            return
+        attempt = 0
+        while pending:
+            frames = await self._fetch(pending, timeframe)
+            fresh = {
+                symbol: df for symbol, df in frames.items()
+                if df is not None and not df.empty
+                and (bar_start is None or df.index[-1] >= pd.Timestamp(bar_start, unit="s"))
+            }
+            if fresh:
+                delay = 0.0 if close is None else time.time() - close
+                self._publish(FreshBars(timeframe, None if close is None else pd.Timestamp(close, unit="s"), fresh, delay))
+                logger.info(f"[Prefetch] {timeframe}: {len(fresh)} fresh symbols {delay:.1f}s after close")
+            pending = [s for s in pending if s not in fresh]
+            if not pending or close is None:
+                break
+            if attempt >= self.max_retries:
+                self.stale += len(pending)
+                logger.warning(f"[Prefetch] {timeframe}: no bar closing {pd.Timestamp(close, unit='s')} for {pending}")
+                break
+            attempt += 1
+            await asyncio.sleep(self.retry_seconds)
+            for symbol in pending:
+                candle_cache.invalidate(symbol, timeframe)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "cycles": self.cycles,
+            "published": self.published,
+            "stale": self.stale,
+            "last_delay_seconds": dict(self.last_delay),
+        }
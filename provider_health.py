@@ -0,0 +1,161 @@
+"""
+Passive health monitor for market data providers.
+
+- The shared data layer records every real request outcome here: the pooled
+  HTTP client (per host → provider and normalized endpoint path), the Yahoo
+  download pool and the XTB command socket. Nothing is probed on demand.
+- Per provider/endpoint: rolling window of the last HEALTH_WINDOW_SAMPLES
+  outcomes within HEALTH_WINDOW_SECONDS, giving p50/p95/p99 latency and error
+  rate, plus last success / last error time and message.
+- `snapshot()` is served from memory, so /status answers instantly.
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+import numpy as np
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEALTH_WINDOW_SAMPLES = int(os.getenv("HEALTH_WINDOW_SAMPLES", "500"))
+HEALTH_WINDOW_SECONDS = float(os.getenv("HEALTH_WINDOW_SECONDS", "3600"))
+
+# Host suffix -> provider name
+HOST_PROVIDERS = {
+    "finnhub.io": "finnhub",
+    "finance.yahoo.com": "yahoo",
+    "oanda.com": "oanda",
+    "alphavantage.co": "alphavantage",
+    "fxpricing.com": "fxpricing",
+    "newsapi.org": "newsapi",
+    "marketaux.com": "marketaux",
+}
+
+_STATIC_SEGMENT = re.compile(r"[a-z][a-z\-]*|v\d+(\.\d+)?")
+
+
+def provider_for_host(host: str) -> str:
+    """Provider name of a remote host (the host itself when unknown)."""
+    for suffix, name in HOST_PROVIDERS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return name
+    return host
+
+
+def endpoint_for_path(path: str) -> str:
+    """URL path with symbol-like segments collapsed: /v3/instruments/EUR_USD/candles -> /v3/instruments/*/candles."""
+    segments = [s if _STATIC_SEGMENT.fullmatch(s) else "*" for s in path.split("/") if s]
+    return "/" + "/".join(segments)
+
+
+class _EndpointHealth:
+    __slots__ = ("samples", "calls", "errors", "last_success", "last_error", "last_error_message")
+
+    def __init__(self, max_samples: int):
+        # (monotonic time, latency seconds, ok)
+        self.samples: Deque[Tuple[float, float, bool]] = deque(maxlen=max_samples)
+        self.calls = 0
+        self.errors = 0
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[float] = None
+        self.last_error_message: Optional[str] = None
+
+
+class ProviderHealth:
+    """
+    Rolling latency/error statistics per (provider, endpoint).
+    """
+
+    def __init__(self, max_samples: int = HEALTH_WINDOW_SAMPLES, window_seconds: float = HEALTH_WINDOW_SECONDS):
+        self.max_samples = max_samples
+        self.window_seconds = window_seconds
+        self._endpoints: Dict[Tuple[str, str], _EndpointHealth] = {}
+        # Yahoo records from pool threads
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        provider: str,
+        endpoint: str,
+        latency: float,
+        ok: bool,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Record one request outcome.
+
+        Args:
+            provider (str): Provider name ("finnhub", "yahoo", ...).
+            endpoint (str): Endpoint / operation within the provider.
+            latency (float): Seconds the request took.
+            ok (bool): Whether it succeeded.
+            error (str, optional): Failure description.
+        """
+        with self._lock:
+            key = (provider, endpoint)
+            health = self._endpoints.get(key)
+            if health is None:
+                health = self._endpoints[key] = _EndpointHealth(self.max_samples)
+            health.samples.append((time.monotonic(), latency, ok))
+            health.calls += 1
+            if ok:
+                health.last_success = time.time()
+            else:
+                health.errors += 1
+                health.last_error = time.time()
+                health.last_error_message = error
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Window statistics per "provider endpoint", sorted by name.
+
+        Returns:
+            dict: provider, endpoint, calls (window), error_rate, p50_ms/p95_ms/p99_ms,
+            last_success / last_error (epoch seconds or None), last_error_message,
+            total_calls, total_errors.
+        """
+        cutoff = time.monotonic() - self.window_seconds
+        out = {}
+        with self._lock:
+            items = sorted(self._endpoints.items())
+            windows = [[s for s in h.samples if s[0] >= cutoff] for _, h in items]
+        for ((provider, endpoint), health), window in zip(items, windows):
+            latencies = np.array([s[1] for s in window], dtype=np.float64) * 1000
+            failures = sum(not s[2] for s in window)
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (None, None, None)
+            out[f"{provider} {endpoint}"] = {
+                "provider": provider,
+                "endpoint": endpoint,
+                "calls": len(window),
+                "error_rate": failures / len(window) if window else 0.0,
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "last_success": health.last_success,
+                "last_error": health.last_error,
+                "last_error_message": health.last_error_message,
+                "total_calls": health.calls,
+                "total_errors": health.errors,
+            }
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+provider_health = ProviderHealth()
+
+
+def record_request(provider: str, endpoint: str, latency: float, ok: bool, error: Optional[str] = None) -> None:
+    """Record one request outcome in the process-wide monitor."""
+    provider_health.record(provider, endpoint, latency, ok, error)
+
+
+def get_provider_health() -> Dict[str, Dict[str, Any]]:
+    """Rolling per-provider/endpoint latency percentiles and error rates."""
+    return provider_health.snapshot()
@@ -0,0 +1,328 @@
+"""
+Quota-aware request planning across data providers.
+
+- Every provider has one or more token buckets (e.g. Alpha Vantage 25/day and
+  5/min, Finnhub 60/min). QUOTA_<PROVIDER> overrides the defaults, e.g.
+  QUOTA_FINNHUB="30/min" or QUOTA_NEWSAPI="100/day,10/hour".
+- Buckets refill continuously and live in a JSON ledger (REQUEST_LEDGER_PATH),
+  so consumption survives restarts and deploys.
+- Actual usage is spent by the shared data layer as requests go out (pooled
+  HTTP client per host, Yahoo download pool); nothing else has to remember to
+  count.
+- `plan_ohlc()` takes the symbols due this cycle and assigns each one a
+  provider: symbols are served in priority order (PLANNER_PRIORITY_SYMBOLS
+  first), each gets the first provider in its chain with budget left (budget
+  needed by symbols without an alternative is held back for them), and
+  symbols no provider can afford are deferred (served from the bar store).
+- Low-priority callers (news) only get a token while the provider keeps
+  PLANNER_RESERVE_FRACTION of its bucket free for price data.
+- Planned vs. actual requests per provider and UTC day are kept in the ledger
+  and exported by `get_quota_usage()` (shown on /status).
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LEDGER_PATH = os.getenv("REQUEST_LEDGER_PATH", os.path.join("data", "quota_ledger.json"))
+REQUEST_LEDGER_SAVE_SECONDS = float(os.getenv("REQUEST_LEDGER_SAVE_SECONDS", "10"))
+PLANNER_RESERVE_FRACTION = float(os.getenv("PLANNER_RESERVE_FRACTION", "0.2"))
+PLANNER_PRIORITY_SYMBOLS = [
+    s.strip().upper()
+    for s in os.getenv("PLANNER_PRIORITY_SYMBOLS", "EURUSD,GBPUSD,USDJPY,XAUUSD,US30").split(",")
+    if s.strip()
+]
+PLANNER_HISTORY_DAYS = 7
+
+DEFAULT_QUOTAS = {
+    "finnhub": "60/min",
+    "alphavantage": "25/day,5/min",
+    "marketaux": "100/day",
+    "newsapi": "100/day",
+    "yahoo": "2000/hour",
+}
+
+# Providers that serve a whole symbol list with one request
+BATCH_PROVIDERS = {"yahoo"}
+
+PERIODS = {"sec": 1, "min": 60, "hour": 3600, "day": 86400}
+PERIOD_NAMES = {seconds: name for name, seconds in PERIODS.items()}
+
+
+def parse_quota(spec: str) -> List[Tuple[float, float]]:
+    """'25/day,5/min' -> [(25, 86400), (5, 60)] as (capacity, period seconds)."""
+    buckets = []
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        count, _, unit = part.strip().partition("/")
+        unit = unit.strip().lower().rstrip("s") or "min"
+        if unit not in PERIODS:
+            raise ValueError(f"Unknown quota period {unit!r} in {spec!r}")
+        buckets.append((float(count), float(PERIODS[unit])))
+    return buckets
+
+
+def configured_quotas() -> Dict[str, List[Tuple[float, float]]]:
+    """DEFAULT_QUOTAS with QUOTA_<PROVIDER> environment overrides."""
+    quotas = {}
+    for provider in set(DEFAULT_QUOTAS) | {
+        k[len("QUOTA_"):].lower() for k in os.environ if k.startswith("QUOTA_")
+    }:
+        spec = os.getenv(f"QUOTA_{provider.upper()}", DEFAULT_QUOTAS.get(provider, ""))
+        if spec:
+            quotas[provider] = parse_quota(spec)
+    return quotas
+
+
+class TokenBucket:
+    """
+    Continuously refilling bucket of `capacity` requests per `period` seconds.
+    """
+
+    def __init__(self, capacity: float, period: float, tokens: Optional[float] = None, updated: Optional[float] = None):
+        self.capacity = capacity
+        self.period = period
+        self.tokens = capacity if tokens is None else tokens
+        self.updated = time.time() if updated is None else updated
+
+    def refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.period)
+            self.updated = now
+
+    def as_dict(self) -> Dict[str, float]:
+        return {"capacity": self.capacity, "period": self.period, "tokens": self.tokens, "updated": self.updated}
+
+
+class OhlcPlan(NamedTuple):
+    assignments: Dict[str, str]  # symbol -> provider
+    deferred: List[str]  # no provider had budget
+
+    def symbols_for(self, provider: str) -> List[str]:
+        return [s for s, p in self.assignments.items() if p == provider]
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class RequestPlanner:
+    """
+    Per-provider token buckets with a persistent ledger and planned/actual usage.
+    """
+
+    def __init__(
+        self,
+        quotas: Optional[Dict[str, List[Tuple[float, float]]]] = None,
+        ledger_path: Optional[str] = REQUEST_LEDGER_PATH,
+        reserve_fraction: float = PLANNER_RESERVE_FRACTION,
+        priority_symbols: Sequence[str] = PLANNER_PRIORITY_SYMBOLS,
+    ):
+        self.quotas = configured_quotas() if quotas is None else quotas
+        self.ledger_path = ledger_path
+        self.reserve_fraction = reserve_fraction
+        self.priority = {s: i for i, s in enumerate(priority_symbols)}
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, List[TokenBucket]] = {
+            provider: [TokenBucket(capacity, period) for capacity, period in buckets]
+            for provider, buckets in self.quotas.items()
+        }
+        # provider -> {"planned": {day: n}, "actual": {day: n}, "denied": {day: n}}
+        self._usage: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._dirty = False
+        self._saved_at = 0.0
+        self._load()
+
+    # ---- ledger ----
+
+    def _load(self) -> None:
+        if not self.ledger_path or not os.path.exists(self.ledger_path):
+            return
+        try:
+            with open(self.ledger_path, "r", encoding="utf-8") as f:
+                ledger = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[Planner] Ignoring unreadable ledger {self.ledger_path}: {e}")
+            return
+        for provider, entry in ledger.get("providers", {}).items():
+            self._usage[provider] = entry.get("usage", {})
+            saved = entry.get("buckets", [])
+            for bucket in self._buckets.get(provider, []):
+                # Quotas may have been reconfigured: only restore matching buckets
+                match = next((b for b in saved if b["capacity"] == bucket.capacity and b["period"] == bucket.period), None)
+                if match is not None:
+                    bucket.tokens, bucket.updated = match["tokens"], match["updated"]
+
+    def save(self, force: bool = False) -> None:
+        """Write the ledger (at most every REQUEST_LEDGER_SAVE_SECONDS unless forced)."""
+        if not self.ledger_path:
+            return
+        with self._lock:
+            if not self._dirty or (not force and time.time() - self._saved_at < REQUEST_LEDGER_SAVE_SECONDS):
+                return
+            text = json.dumps({
+                "updated": time.time(),
+                "providers": {
+                    provider: {
+                        "buckets": [b.as_dict() for b in self._buckets.get(provider, [])],
+                        "usage": self._usage.get(provider, {}),
+                    }
+                    for provider in sorted(set(self._buckets) | set(self._usage))
+                },
+            }, indent=1)
+            self._dirty = False
+            self._saved_at = time.time()
+        try:
+            os.makedirs(os.path.dirname(self.ledger_path) or ".", exist_ok=True)
+            tmp = f"{self.ledger_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.ledger_path)
+        except OSError as e:
+            logger.warning(f"[Planner] Could not write ledger {self.ledger_path}: {e}")
+
+    def _count(self, provider: str, kind: str, n: int = 1) -> None:
+        days = self._usage.setdefault(provider, {}).setdefault(kind, {})
+        today = _today()
+        days[today] = days.get(today, 0) + n
+        for day in sorted(days)[:-PLANNER_HISTORY_DAYS]:
+            del days[day]
+        self._dirty = True
+
+    # ---- budget ----
+
+    def _headroom(self, provider: str, priority: str, now: float) -> float:
+        """Tokens a caller of `priority` ("high" / "low") may still use."""
+        buckets = self._buckets.get(provider)
+        if not buckets:
+            return float("inf")
+        reserve = self.reserve_fraction if priority == "low" else 0.0
+        for bucket in buckets:
+            bucket.refill(now)
+        return min(b.tokens - b.capacity * reserve for b in buckets)
+
+    def acquire(self, provider: str, priority: str = "high") -> bool:
+        """
+        Plan one request: True (and counted as planned) when the budget allows it.
+
+        Args:
+            provider (str): Provider name ("finnhub", "newsapi", ...).
+            priority (str): "high" for price data, "low" for news / background
+                work (must leave PLANNER_RESERVE_FRACTION of every bucket free).
+        """
+        with self._lock:
+            ok = self._headroom(provider, priority, time.time()) >= 1
+            self._count(provider, "planned" if ok else "denied")
+        if not ok:
+            logger.info(f"[Planner] {provider} quota exhausted for {priority}-priority request")
+        self.save()
+        return ok
+
+    def has_budget(self, provider: str, priority: str = "high") -> bool:
+        """Whether one more (unplanned, e.g. fallback) request to `provider` fits the budget."""
+        with self._lock:
+            return self._headroom(provider, priority, time.time()) >= 1
+
+    def spend(self, provider: str, requests: int = 1) -> None:
+        """Record requests that actually went out (called by the data layer)."""
+        if provider not in self._buckets:
+            return
+        with self._lock:
+            now = time.time()
+            for bucket in self._buckets.get(provider, []):
+                bucket.refill(now)
+                bucket.tokens -= requests
+            self._count(provider, "actual", requests)
+        self.save()
+
+    def plan_ohlc(self, symbols: Iterable[str], chains: Dict[str, List[str]]) -> OhlcPlan:
+        """
+        Assign a provider to every symbol due this cycle.
+
+        Args:
+            symbols (iterable): Symbols to refresh.
+            chains (dict): symbol -> provider fallback chain, best first.
+
+        Returns:
+            OhlcPlan: provider per symbol, and the symbols deferred for lack of budget.
+        """
+        ordered = sorted(dict.fromkeys(symbols), key=lambda s: self.priority.get(s.upper(), len(self.priority)))
+        assignments: Dict[str, str] = {}
+        deferred: List[str] = []
+        # Budget still owed to later symbols that have no alternative provider
+        exclusive = Counter(chains[s][0] for s in ordered if len(chains.get(s, [])) == 1)
+        with self._lock:
+            now = time.time()
+            budget: Dict[str, float] = {}
+            for symbol in ordered:
+                chain = chains.get(symbol, [])
+                if len(chain) == 1:
+                    exclusive[chain[0]] -= 1
+                for provider in chain:
+                    if provider not in budget:
+                        budget[provider] = self._headroom(provider, "high", now)
+                    batched = provider in BATCH_PROVIDERS and provider in assignments.values()
+                    reserved = 0 if provider == chain[-1] else exclusive[provider]
+                    if batched or budget[provider] - reserved >= 1:
+                        if not batched:
+                            budget[provider] -= 1
+                            self._count(provider, "planned")
+                        assignments[symbol] = provider
+                        break
+                else:
+                    deferred.append(symbol)
+            for symbol in deferred:
+                for provider in chains.get(symbol, [])[:1]:
+                    self._count(provider, "denied")
+        if deferred:
+            logger.warning(f"[Planner] No provider budget for {deferred}; serving stored bars")
+        self.save()
+        return OhlcPlan(assignments, deferred)
+
+    # ---- export ----
+
+    def usage(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Budget and planned/actual usage per provider.
+
+        Returns:
+            dict: provider -> {"remaining": tokens of the tightest bucket,
+            "quota": "25/day, 5/min", "planned_today", "actual_today",
+            "denied_today", "history": {day: {"planned", "actual", "denied"}}}.
+        """
+        today = _today()
+        out = {}
+        with self._lock:
+            now = time.time()
+            for provider in sorted(set(self._buckets) | set(self._usage)):
+                usage = self._usage.get(provider, {})
+                days = sorted(set().union(*[usage.get(k, {}).keys() for k in ("planned", "actual", "denied")]))
+                remaining = self._headroom(provider, "high", now)
+                out[provider] = {
+                    "remaining": None if remaining == float("inf") else remaining,
+                    "quota": ", ".join(f"{c:g}/{PERIOD_NAMES.get(p, f'{p:g}s')}" for c, p in self.quotas.get(provider, [])),
+                    "planned_today": usage.get("planned", {}).get(today, 0),
+                    "actual_today": usage.get("actual", {}).get(today, 0),
+                    "denied_today": usage.get("denied", {}).get(today, 0),
+                    "history": {
+                        day: {k: usage.get(k, {}).get(day, 0) for k in ("planned", "actual", "denied")}
+                        for day in days
+                    },
+                }
+        return out
+
+
+request_planner = RequestPlanner()
+
+
+def get_quota_usage() -> Dict[str, Dict[str, Any]]:
+    """Remaining budget and planned vs. actual requests per provider."""
+    return request_planner.usage()
@@ -0,0 +1,323 @@
+"""
+Timeframe resampling: derive higher-timeframe OHLCV bars from lower-timeframe bars.
+
+- FX session anchoring: the trading day opens at 17:00 New York time (DST
+  aware), so D1 bars run 17:00→17:00 NY, H4 bars start at 17:00/21:00/01:00...
+  NY and W1 bars open Sunday 17:00 NY. Timeframes up to H1 align to the UTC clock.
+- Output uses the bar store schema (open/high/low/close/volume, naive UTC
+  "time" index = bar open time).
+- Partial bars: the last bucket is flagged via `df.attrs["partial"]` when the
+  source data does not reach its end; `include_partial=False` drops it.
+- `resample_ohlc` is vectorized (numpy reduceat) for whole histories;
+  `IncrementalResampler` updates every target timeframe as each lower
+  timeframe bar arrives (re-sent forming bars replace the previous copy) and
+  reports bars as they close.
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SESSION_TZ = os.getenv("FX_SESSION_TZ", "America/New_York")
+SESSION_CLOSE_HOUR = int(os.getenv("FX_SESSION_CLOSE_HOUR", "17"))
+RESAMPLE_MAX_BARS = int(os.getenv("RESAMPLE_MAX_BARS", "1000"))
+
+OHLCV = ["open", "high", "low", "close", "volume"]
+
+TIMEFRAME_FREQ = {
+    "M1": "1min",
+    "M5": "5min",
+    "M15": "15min",
+    "M30": "30min",
+    "H1": "1h",
+    "H4": "4h",
+    "D1": "1D",
+    "W1": "7D",
+}
+
+_SESSION_ZONE = ZoneInfo(SESSION_TZ)
+_EPOCH = datetime(1970, 1, 1)
+_TIMEFRAME_SECONDS = {tf: int(pd.Timedelta(freq).total_seconds()) for tf, freq in TIMEFRAME_FREQ.items()}
+
+Bar = Tuple[pd.Timestamp, float, float, float, float, float]
+
+
+def timeframe_delta(timeframe: str) -> pd.Timedelta:
+    """Nominal bar length of a timeframe key."""
+    return pd.Timedelta(TIMEFRAME_FREQ[timeframe])
+
+
+def bucket_start(index: pd.DatetimeIndex, timeframe: str) -> pd.DatetimeIndex:
+    """
+    Open time (naive UTC) of the `timeframe` bar each timestamp belongs to.
+
+    Args:
+        index (DatetimeIndex): Naive UTC timestamps.
+        timeframe (str): Target timeframe key ("M5" .. "W1").
+
+    Returns:
+        pd.DatetimeIndex: Bucket open times, aligned with `index`.
+    """
+    if _TIMEFRAME_SECONDS[timeframe] <= 3600:
+        return pd.DatetimeIndex(index.floor(TIMEFRAME_FREQ[timeframe]), name="time")
+    shift = pd.Timedelta(hours=24 - SESSION_CLOSE_HOUR)
+    # Session-shifted wall clock: the 17:00 NY open becomes midnight.
+    local = index.tz_localize("UTC").tz_convert(SESSION_TZ).tz_localize(None) + shift
+    if timeframe == "W1":
+        floored = (local - pd.to_timedelta(local.dayofweek, unit="D")).normalize()
+    else:
+        floored = local.floor(TIMEFRAME_FREQ[timeframe])
+    # Map the bucket's wall-clock open back to UTC (not `index - offset`), so a
+    # bucket spanning a DST change keeps one open time; repeated hours use the first.
+    start = (floored - shift).tz_localize(
+        SESSION_TZ, ambiguous=np.ones(len(floored), dtype=bool), nonexistent="shift_forward"
+    )
+    return pd.DatetimeIndex(start.tz_convert("UTC").tz_localize(None), name="time")
+
+
+def bucket_start_seconds(seconds: int, timeframe: str) -> int:
+    """
+    Scalar `bucket_start` on epoch seconds (no pandas; for per-tick paths).
+    """
+    step = _TIMEFRAME_SECONDS[timeframe]
+    if step <= 3600:
+        return seconds - seconds % step
+    shift = (24 - SESSION_CLOSE_HOUR) * 3600
+    local = seconds + int(datetime.fromtimestamp(seconds, _SESSION_ZONE).utcoffset().total_seconds()) + shift
+    if timeframe == "W1":
+        days = local // 86400
+        floored = (days - (days + 3) % 7) * 86400  # 1970-01-01 was a Thursday
+    else:
+        floored = local - local % step
+    wall = _EPOCH + timedelta(seconds=floored - shift)
+    return int(wall.replace(tzinfo=_SESSION_ZONE).timestamp())
+
+
+def bucket_end_seconds(start: int, timeframe: str) -> int:
+    """Open time (epoch seconds) of the bucket after the one opening at `start`."""
+    step = _TIMEFRAME_SECONDS[timeframe]
+    if step <= 3600:
+        return start + step
+    # Session buckets stretch/shrink around DST changes; boundaries stay on the hour
+    end = start + 3600
+    while bucket_start_seconds(end, timeframe) == start:
+        end += 3600
+    return end
+
+
+def next_bar_close(timeframe: str, now: float) -> int:
+    """Epoch seconds at which the `timeframe` bar forming at `now` closes."""
+    return bucket_end_seconds(bucket_start_seconds(int(now), timeframe), timeframe)
+
+
+def fx_market_open(seconds: float) -> bool:
+    """False from the Friday session close to the Sunday session open."""
+    local = int(seconds) + int(datetime.fromtimestamp(seconds, _SESSION_ZONE).utcoffset().total_seconds())
+    # Session-shifted day of week (Mon=0); Friday 17:00 NY becomes Saturday 00:00
+    days = (local + (24 - SESSION_CLOSE_HOUR) * 3600) // 86400
+    return (days + 3) % 7 < 5
+
+
+def _naive_utc(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.rename(columns=lambda c: str(c).lower())
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    df = df.set_axis(index, axis=0)
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind="stable")
+    return df
+
+
+def _infer_delta(index: pd.DatetimeIndex) -> pd.Timedelta:
+    if len(index) < 2:
+        return pd.Timedelta(0)
+    return pd.Timedelta(int(np.median(np.diff(index.asi8))))
+
+
+def resample_ohlc(
+    df: pd.DataFrame,
+    timeframe: str,
+    source_timeframe: Optional[str] = None,
+    include_partial: bool = True,
+) -> pd.DataFrame:
+    """
+    Aggregate OHLCV bars into `timeframe` bars.
+
+    Args:
+        df (DataFrame): Lower-timeframe bars (open/high/low/close[/volume], any case).
+        timeframe (str): Target timeframe key.
+        source_timeframe (str, optional): Timeframe of `df`; inferred when omitted.
+        include_partial (bool): Keep the last bar when the source does not cover it fully.
+
+    Returns:
+        pd.DataFrame: Resampled bars; `attrs["partial"]` tells whether the last one is incomplete.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=OHLCV)
+    df = _naive_utc(df)
+    starts = bucket_start(df.index, timeframe)
+    keys = starts.asi8
+    first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    last = np.r_[first[1:] - 1, len(df) - 1]
+
+    def col(name):
+        return df[name].to_numpy(dtype=np.float64) if name in df.columns else np.full(len(df), np.nan)
+
+    volume = col("volume")
+    has_volume = np.add.reduceat(~np.isnan(volume), first) > 0
+    out = pd.DataFrame(
+        {
+            "open": col("open")[first],
+            "high": np.fmax.reduceat(col("high"), first),
+            "low": np.fmin.reduceat(col("low"), first),
+            "close": col("close")[last],
+            "volume": np.where(has_volume, np.add.reduceat(np.nan_to_num(volume), first), np.nan),
+        },
+        index=starts[first],
+    )
+
+    step = timeframe_delta(source_timeframe) if source_timeframe else _infer_delta(df.index)
+    after_last = bucket_start(pd.DatetimeIndex([df.index[-1] + step]), timeframe)[0]
+    partial = after_last == out.index[-1]
+    if partial and not include_partial:
+        out = out.iloc[:-1]
+        partial = False
+    out.attrs["partial"] = bool(partial)
+    return out
+
+
+class IncrementalResampler:
+    """
+    Keeps higher-timeframe bars up to date from a stream of lower-timeframe bars.
+    """
+
+    def __init__(
+        self,
+        source_timeframe: str,
+        timeframes: Iterable[str],
+        max_bars: int = RESAMPLE_MAX_BARS,
+        on_bar_closed: Optional[Callable[[str, Bar], None]] = None,
+    ):
+        self.source_timeframe = source_timeframe
+        self.timeframes = [tf for tf in timeframes if tf != source_timeframe]
+        self.on_bar_closed = on_bar_closed
+        self.last_time: Optional[pd.Timestamp] = None
+        self._closed: Dict[str, Deque[Bar]] = {tf: deque(maxlen=max_bars) for tf in self.timeframes}
+        self._start: Dict[str, Optional[pd.Timestamp]] = {tf: None for tf in self.timeframes}
+        self._agg: Dict[str, List[float]] = {}
+        # Source bars of each forming bucket, for revisions of the newest bar
+        self._rows: Dict[str, Dict[pd.Timestamp, Tuple[float, ...]]] = {tf: {} for tf in self.timeframes}
+
+    def update(
+        self,
+        time: pd.Timestamp,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float = float("nan"),
+    ) -> List[Tuple[str, Bar]]:
+        """
+        Feed one lower-timeframe bar (a repeated timestamp replaces the previous copy).
+
+        Returns:
+            list: (timeframe, bar) for every higher-timeframe bar this closed.
+        """
+        time = pd.Timestamp(time)
+        if self.last_time is not None and time < self.last_time:
+            logger.debug(f"[Resampler] Ignoring out-of-order bar {time} < {self.last_time}")
+            return []
+        revision = time == self.last_time
+        self.last_time = time
+        row = (open, high, low, close, volume)
+        closed = []
+        for tf in self.timeframes:
+            start = bucket_start(pd.DatetimeIndex([time]), tf)[0]
+            if self._start[tf] is not None and start != self._start[tf]:
+                bar = (self._start[tf], *self._agg[tf])
+                self._closed[tf].append(bar)
+                closed.append((tf, bar))
+                self._start[tf] = None
+            if self._start[tf] is None:
+                self._start[tf] = start
+                self._agg[tf] = list(row)
+                self._rows[tf] = {time: row}
+                continue
+            self._rows[tf][time] = row
+            if revision:
+                self._agg[tf] = self._aggregate(self._rows[tf])
+            else:
+                agg = self._agg[tf]
+                agg[1] = np.fmax(agg[1], high)
+                agg[2] = np.fmin(agg[2], low)
+                agg[3] = close
+                agg[4] = volume if np.isnan(agg[4]) else agg[4] + np.nan_to_num(volume)
+        if self.on_bar_closed is not None:
+            for tf, bar in closed:
+                self.on_bar_closed(tf, bar)
+        return closed
+
+    @staticmethod
+    def _aggregate(rows: Dict[pd.Timestamp, Tuple[float, ...]]) -> List[float]:
+        values = np.array([rows[t] for t in sorted(rows)], dtype=np.float64)
+        volume = values[:, 4]
+        return [
+            values[0, 0],
+            np.nanmax(values[:, 1]),
+            np.nanmin(values[:, 2]),
+            values[-1, 3],
+            np.nansum(volume) if not np.isnan(volume).all() else np.nan,
+        ]
+
+    def update_frame(self, df: pd.DataFrame) -> List[Tuple[str, Bar]]:
+        """
+        Feed every bar of `df` that is not older than the last bar seen.
+        The first call loads the whole history with the vectorized resampler.
+        """
+        if df is None or df.empty:
+            return []
+        df = _naive_utc(df).reindex(columns=OHLCV)
+        if self.last_time is None and len(df) > 1:
+            self._load_history(df)
+            return []
+        if self.last_time is not None:
+            df = df[df.index >= self.last_time]
+        closed = []
+        for row in df.itertuples():
+            closed.extend(self.update(row.Index, row.open, row.high, row.low, row.close, row.volume))
+        return closed
+
+    def _load_history(self, df: pd.DataFrame) -> None:
+        for tf in self.timeframes:
+            bars = resample_ohlc(df, tf, self.source_timeframe)
+            self._closed[tf].extend(bars.iloc[:-1].itertuples(name=None))
+            start = bars.index[-1]
+            current = df[bucket_start(df.index, tf) == start]
+            self._start[tf] = start
+            self._agg[tf] = [float(v) for v in bars.iloc[-1]]
+            self._rows[tf] = {t: tuple(r) for t, r in zip(current.index, current.itertuples(index=False, name=None))}
+        self.last_time = df.index[-1]
+
+    def frame(self, timeframe: str, include_partial: bool = True) -> pd.DataFrame:
+        """
+        Closed bars plus (optionally) the forming one; `attrs["partial"]` marks the latter.
+        """
+        bars = list(self._closed[timeframe])
+        partial = include_partial and self._start[timeframe] is not None
+        if partial:
+            bars.append((self._start[timeframe], *self._agg[timeframe]))
+        if not bars:
+            df = pd.DataFrame(columns=OHLCV)
+        else:
+            times, *columns = zip(*bars)
+            df = pd.DataFrame(dict(zip(OHLCV, columns)), index=pd.DatetimeIndex(times, name="time"))
+        df.attrs["partial"] = partial
+        return df
@@ -0,0 +1,211 @@
+"""
+Rolling-window kernels on numpy arrays (the engine under indicators.py).
+
+- Every kernel works along the last axis, so a (symbols x bars) matrix is
+  processed in one pass; rows are independent and may start with different
+  amounts of NaN padding (each row warms up from its own first valid value).
+- Means, standard deviations and exponential smoothing (EMA, Wilder) run on
+  pandas' compiled rollers, with each row of a matrix as one DataFrame
+  column, which is faster than any numpy equivalent.
+- The numpy kernels replace what pandas only offers through rolling.apply:
+  mean absolute deviation (CCI) and WMA run on `sliding_window_view`, in
+  chunks of ROLLING_CHUNK_ROWS windows to bound memory, and min / max use
+  the van Herk / Gil-Werman block scans (O(n) for any window).
+- Semantics follow pandas `rolling(window)` (min_periods = window): a result
+  is NaN until the window is full or while it contains a NaN, and constant
+  windows give exact values (mean = the value, std / MAD = 0).
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Callable, Optional, Union
+
+ROLLING_CHUNK_ROWS = int(os.getenv("ROLLING_CHUNK_ROWS", "65536"))
+
+
+def _as_float(x) -> np.ndarray:
+    return np.asarray(x, dtype=np.float64)
+
+
+def started(x: np.ndarray) -> np.ndarray:
+    """True from the first non-NaN value of each row onwards (False over leading NaNs)."""
+    return np.logical_or.accumulate(~np.isnan(x), axis=-1)
+
+
+def run_lengths(x: np.ndarray) -> np.ndarray:
+    """Length of the run of identical values ending at each position."""
+    n = x.shape[-1]
+    if not n:
+        return np.zeros(x.shape, dtype=np.int64)
+    change = np.empty(x.shape, dtype=bool)
+    change[..., 0] = True
+    change[..., 1:] = x[..., 1:] != x[..., :-1]
+    index = np.arange(n)
+    return index - np.maximum.accumulate(np.where(change, index, 0), axis=-1) + 1
+
+
+def ffill(x: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs (leading NaNs stay NaN)."""
+    x = _as_float(x)
+    nan = np.isnan(x)
+    if not nan.any():
+        return x.copy()
+    # NaNs point at the last valid index; leading NaNs point at x[0], itself NaN
+    index = np.where(nan, 0, np.arange(x.shape[-1]))
+    np.maximum.accumulate(index, axis=-1, out=index)
+    return np.take_along_axis(x, index, axis=-1)
+
+
+def _by_row(x, roll: Callable[[Union[pd.Series, pd.DataFrame]], Union[pd.Series, pd.DataFrame]]) -> np.ndarray:
+    """Run a pandas roller along the last axis: one Series, or one DataFrame column per row."""
+    x = _as_float(x)
+    if not x.size:
+        return np.full(x.shape, np.nan)
+    if x.ndim == 1:
+        return np.array(roll(pd.Series(x, copy=False)), dtype=np.float64)
+    n = x.shape[-1]
+    return np.array(roll(pd.DataFrame(x.reshape(-1, n).T, copy=False)), dtype=np.float64).T.reshape(x.shape)
+
+
+def rolling_mean(x, window: int) -> np.ndarray:
+    """Mean of each full window (pandas rolling(window).mean())."""
+    if window < 1:
+        return np.full(np.shape(x), np.nan)
+    return _by_row(x, lambda values: values.rolling(window).mean())
+
+
+def _window_reduce(x: np.ndarray, window: int, reduce: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    """Apply `reduce` (windows on the last axis) over all full windows, chunk by chunk."""
+    out = np.full(x.shape, np.nan)
+    if window < 1 or x.shape[-1] < window:
+        return out
+    views = sliding_window_view(x, window, axis=-1)
+    rows = max(1, int(np.prod(x.shape[:-1])))
+    step = max(1, ROLLING_CHUNK_ROWS // rows)
+    for start in range(0, views.shape[-2], step):
+        chunk = views[..., start:start + step, :]
+        out[..., window - 1 + start: window - 1 + start + chunk.shape[-2]] = reduce(chunk)
+    return out
+
+
+def rolling_std(x, window: int, ddof: int = 1) -> np.ndarray:
+    """Standard deviation of each full window (pandas rolling(window).std())."""
+    if window < 1:
+        return np.full(np.shape(x), np.nan)
+    return _by_row(x, lambda values: values.rolling(window).std(ddof=ddof))
+
+
+def rolling_mad(x, window: int) -> np.ndarray:
+    """Mean absolute deviation from the window mean (the former Series.mad per window)."""
+    x = _as_float(x)
+
+    def mad(w: np.ndarray) -> np.ndarray:
+        return np.abs(w - w.mean(axis=-1, keepdims=True)).mean(axis=-1)
+
+    out = _window_reduce(x, window, mad)
+    out[run_lengths(x) >= window] = 0.0
+    return out
+
+
+def _rolling_extreme(x, window: int, op: np.ufunc) -> np.ndarray:
+    """van Herk / Gil-Werman: prefix scan within blocks of `window`, suffix scan, combine."""
+    x = _as_float(x)
+    n = x.shape[-1]
+    out = np.full(x.shape, np.nan)
+    if window < 1 or n < window:
+        return out
+    padded = np.empty(x.shape[:-1] + (-(-n // window) * window,))
+    padded[..., :n] = x
+    padded[..., n:] = x[..., -1:]
+    blocks = padded.reshape(x.shape[:-1] + (-1, window))
+    prefix = op.accumulate(blocks, axis=-1).reshape(padded.shape)
+    suffix = op.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+    out[..., window - 1:] = op(suffix[..., :n - window + 1], prefix[..., window - 1:n])
+    return out
+
+
+def rolling_max(x, window: int) -> np.ndarray:
+    """Maximum of each full window (NaN if it holds a NaN)."""
+    return _rolling_extreme(x, window, np.maximum)
+
+
+def rolling_min(x, window: int) -> np.ndarray:
+    """Minimum of each full window (NaN if it holds a NaN)."""
+    return _rolling_extreme(x, window, np.minimum)
+
+
+def rolling_wma(x, window: int, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Weighted moving average of each full window.
+
+    Args:
+        weights (array, optional): One weight per window position, oldest
+            first; defaults to linear 1..window (classic WMA).
+    """
+    x = _as_float(x)
+    weights = np.arange(1, window + 1, dtype=np.float64) if weights is None else _as_float(weights)
+    weights = weights / weights.sum()
+    if x.ndim > 1:
+        return _window_reduce(x, window, lambda w: w @ weights)
+    out = np.full(len(x), np.nan)
+    if window < 1 or len(x) < window:
+        return out
+    out[window - 1:] = np.convolve(x, weights[::-1], mode="valid")
+    return out
+
+
+def ewm_mean(x, alpha: float) -> np.ndarray:
+    """
+    Exponentially weighted mean y[t] = (1 - alpha) * y[t-1] + alpha * x[t]
+    (pandas ewm(alpha=alpha, adjust=False).mean()): leading NaNs give NaN,
+    each row starts at its first valid value, and later NaNs hold the output.
+    """
+    return _by_row(x, lambda values: values.ewm(alpha=alpha, adjust=False).mean())
+
+
+def ema(x, period: int) -> np.ndarray:
+    """EMA with span `period` (pandas ewm(span=period, adjust=False))."""
+    return ewm_mean(x, 2.0 / (period + 1))
+
+
+def wilder(x, period: int) -> np.ndarray:
+    """
+    Wilder smoothing (RMA): the first value is the mean of the first `period`
+    valid values, then y[t] = y[t-1] + (x[t] - y[t-1]) / period.
+    """
+    x = _as_float(x)
+    if not x.shape[-1]:
+        return np.full(x.shape, np.nan)
+    valid = ~np.isnan(x)
+    count = np.cumsum(valid, axis=-1)
+    reached = count >= period
+    seed = np.where(valid & (count <= period), x, 0.0).sum(axis=-1) / period
+    seed_at = np.argmax(reached, axis=-1)[..., None]
+    # Blank everything before the seed so ewm starts from it
+    seeded = np.where(np.arange(x.shape[-1]) < seed_at, np.nan, x)
+    np.put_along_axis(seeded, seed_at, seed[..., None], axis=-1)
+    out = ewm_mean(seeded, 1.0 / period)
+    out[~reached] = np.nan
+    return out
+
+
+def diff(x) -> np.ndarray:
+    """x[t] - x[t-1] along the last axis, NaN first (Series.diff())."""
+    x = _as_float(x)
+    out = np.empty(x.shape)
+    if x.shape[-1]:
+        out[..., 0] = np.nan
+        out[..., 1:] = x[..., 1:] - x[..., :-1]
+    return out
+
+
+def shift(x, periods: int = 1) -> np.ndarray:
+    """x moved `periods` positions later along the last axis, NaN-filled (Series.shift())."""
+    x = _as_float(x)
+    out = np.full(x.shape, np.nan)
+    n = x.shape[-1]
+    if periods < n:
+        out[..., periods:] = x[..., :n - periods]
+    return out
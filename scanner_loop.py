@@ -7,18 +7,21 @@ from dotenv import load_dotenv
 from news_signal_logic import fetch_and_analyze_news
 from telegramsender import send_telegram_message
 from core.signal_fusion import generate_trade_decision 
+from prefetch_scheduler import PrefetchScheduler
 
 # --- CONFIG ---
 SYMBOLS = ["EURUSD", "USDJPY", "XAUUSD", "US30"]
-SCAN_INTERVAL_MINUTES = 30
+SCAN_TIMEFRAME = "H1"  # scans run right after each close of this timeframe
+NEWS_SCAN_INTERVAL_MINUTES = 30  # news runs on its own timer, also while FX is closed
 
 load_dotenv()
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(message)s")
 
-async def run_scan():
-    for symbol in SYMBOLS:
+async def run_scan(symbols=SYMBOLS):
+    # The scheduler's batched prefetch warmed the candle cache; these analyses hit it.
+    for symbol in symbols:
         logging.info(f"Scanning {symbol}...")
         try:
             msg = await generate_trade_decision(symbol)
@@ -29,6 +32,7 @@ async def run_scan():
         except Exception as e:
             logging.error(f"Error scanning {symbol}: {e}")
 
+async def run_news_scan():
     logging.info("Scanning news only (no specific symbol)...")
     try:
         news_results = await fetch_and_analyze_news()
@@ -41,12 +45,26 @@ async def run_scan():
     except Exception as e:
         logging.error(f"Error during news scan: {e}")
 
-async def loop_scanner():
+async def news_loop():
     while True:
-        logging.info("Starting full scan cycle")
-        await run_scan()
-        logging.info(f"Sleeping for {SCAN_INTERVAL_MINUTES} minutes")
-        await asyncio.sleep(SCAN_INTERVAL_MINUTES * 60)
+        await run_news_scan()
+        logging.info(f"Next news scan in {NEWS_SCAN_INTERVAL_MINUTES} minutes")
+        await asyncio.sleep(NEWS_SCAN_INTERVAL_MINUTES * 60)
+
+async def loop_scanner():
+    scheduler = PrefetchScheduler(SYMBOLS, [SCAN_TIMEFRAME])
+    queue = scheduler.subscribe(SCAN_TIMEFRAME)
+    # A bar close can publish several events (late symbols arrive separately),
+    # so symbol scans follow the events and news keeps its own cadence
+    runners = [asyncio.create_task(scheduler.run()), asyncio.create_task(news_loop())]
+    try:
+        while True:
+            event = await queue.get()
+            logging.info(f"Starting scan cycle for {len(event.frames)} symbols (bar close {event.bar_close})")
+            await run_scan(list(event.frames))
+    finally:
+        for runner in runners:
+            runner.cancel()
 
 if __name__ == "__main__":
     try:
@@ -1,28 +1,27 @@
 import logging
+from feature_planner import compute_features, select
 from indicators import (
-    calculate_rsi, rsi_signal,
-    calculate_macd, macd_signal,
-    calculate_bollinger_bands, bollinger_signal,
-    calculate_stochastic_oscillator, stochastic_signal,
-    calculate_cci, cci_signal,
-    calculate_williams_r, williams_r_signal
+    rsi_signal, macd_signal, bollinger_signal,
+    stochastic_signal, cci_signal, williams_r_signal
 )
 
 logger = logging.getLogger(__name__)
 
+# Indicator features behind the signals, computed in one planned pass
+SIGNAL_FEATURES = ("rsi(14)", "macd(12,26,9)", "bb(20,2)", "stoch(14,3)", "cci(20)", "williams_r(14)")
+
 def generate_signals(df):
     """Generate trading signals from a DataFrame of OHLCV data."""
     close = df['close']
-    high = df['high']
-    low = df['low']
 
     # Calculate indicators
-    rsi = calculate_rsi(close)
-    macd_df = calculate_macd(close)
-    bb_df = calculate_bollinger_bands(close)
-    stoch_df = calculate_stochastic_oscillator(high, low, close)
-    cci = calculate_cci(high, low, close)
-    wr = calculate_williams_r(high, low, close)
+    features = compute_features(df, SIGNAL_FEATURES)
+    rsi = select(features, "rsi(14)")
+    macd_df = select(features, "macd(12,26,9)")
+    bb_df = select(features, "bb(20,2)")
+    stoch_df = select(features, "stoch(14,3)")
+    cci = select(features, "cci(20)")
+    wr = select(features, "williams_r(14)")
 
     # Generate signals
     signals = {
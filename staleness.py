@@ -0,0 +1,54 @@
+"""
+Staleness tags for data served in degraded (stale-while-revalidate) mode.
+
+- DataFrames carry df.attrs["stale"] and df.attrs["age_seconds"]: seconds
+  since the data stopped being current (0 / absent for fresh data).
+- Headline lists are returned as `Headlines`, a list with the same two
+  attributes, so existing list consumers keep working.
+- Consumers declare the staleness they accept (`within`) and pass the age on
+  to signals, which SignalFormatter shows as a warning.
+"""
+
+from typing import Any, Iterable, Optional
+
+
+def mark_stale(df: Any, age: float) -> Any:
+    """Tag a DataFrame as stale by `age` seconds (in place) and return it."""
+    df.attrs["stale"] = True
+    df.attrs["age_seconds"] = max(0.0, float(age))
+    return df
+
+
+def data_age(data: Any) -> float:
+    """Seconds `data` (DataFrame or Headlines) is behind; 0.0 when fresh."""
+    if data is None:
+        return 0.0
+    attrs = getattr(data, "attrs", None)
+    if isinstance(attrs, dict):
+        return float(attrs.get("age_seconds", 0.0)) if attrs.get("stale") else 0.0
+    return float(getattr(data, "age_seconds", 0.0)) if getattr(data, "stale", False) else 0.0
+
+
+def within(data: Any, max_staleness: Optional[float]) -> bool:
+    """Whether `data` is recent enough for a consumer accepting `max_staleness` seconds (None = any)."""
+    return max_staleness is None or data_age(data) <= max_staleness
+
+
+def format_age(seconds: float) -> str:
+    """3725 -> '1.0h', 300 -> '5m', 40 -> '40s'."""
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+class Headlines(list):
+    """
+    List of headlines that may be served stale.
+    """
+
+    def __init__(self, items: Iterable[Any] = (), age_seconds: float = 0.0):
+        super().__init__(items)
+        self.stale = age_seconds > 0
+        self.age_seconds = max(0.0, float(age_seconds))
@@ -3,8 +3,13 @@ from telegram.ext import ContextTypes
 
 from marketdata import get_yf_data
 from finnhub_data import get_finnhub_data
+from circuit_breaker import get_breaker_states
+from provider_health import get_provider_health
+from request_planner import get_quota_usage
+from data_quality import get_data_quality_stats
+from indicator_cache import get_indicator_cache_stats
 
-import asyncio
+import time
 
 async def connect_finnhub():
     """Async ping for Finnhub."""
@@ -25,14 +30,99 @@ async def connect_yahoo():
         return False
 
 async def handle_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    finnhub_ok, yahoo_ok = await asyncio.gather(connect_finnhub(), connect_yahoo())
-
-    status_lines = [
-        f"Finnhub: {'🟢 Connected' if finnhub_ok else '❌ Not connected'}",
-        f"Yahoo: {'🟢 Connected' if yahoo_ok else '❌ Not connected'}"
-    ]
-    overall = "✅ All data sources OK" if all([finnhub_ok, yahoo_ok]) else "⚠️ Some data sources failed"
-    await update.message.reply_text('\n'.join(status_lines + [overall]))
+    """Answered from the in-memory provider health monitor (no live probes)."""
+    health = get_provider_health()
+    status_lines = format_provider_health(health)
+    if not health:
+        overall = "ℹ️ No provider requests recorded yet"
+    elif all(h["error_rate"] < 0.5 for h in health.values() if h["calls"]):
+        overall = "✅ All data sources OK"
+    else:
+        overall = "⚠️ Some data sources failing"
+    await update.message.reply_text('\n'.join(
+        status_lines + [overall] + format_breaker_states() + format_quota_usage()
+        + format_data_quality() + format_indicator_cache()
+    ))
+
+def _age(ts):
+    if ts is None:
+        return "never"
+    seconds = time.time() - ts
+    if seconds < 120:
+        return f"{seconds:.0f}s ago"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}m ago"
+    return f"{seconds / 3600:.1f}h ago"
+
+def format_provider_health(health=None):
+    """One line per provider endpoint: latency percentiles, error rate, last success."""
+    health = get_provider_health() if health is None else health
+    lines = []
+    for h in health.values():
+        if not h["calls"]:
+            icon = "⚪"
+        elif h["error_rate"] >= 0.5:
+            icon = "❌"
+        elif h["error_rate"] > 0.1:
+            icon = "🟡"
+        else:
+            icon = "🟢"
+        latency = (
+            f"p50 {h['p50_ms']:.0f} / p95 {h['p95_ms']:.0f} / p99 {h['p99_ms']:.0f}ms"
+            if h["p50_ms"] is not None else "no recent calls"
+        )
+        lines.append(
+            f"{icon} {h['provider']} {h['endpoint']}: {latency}, "
+            f"errors {h['error_rate']:.0%} of {h['calls']}, last ok {_age(h['last_success'])}"
+        )
+    return lines
+
+def format_breaker_states():
+    """One line per provider circuit breaker seen so far."""
+    icons = {"closed": "🟢", "half-open": "🟡", "open": "🔴"}
+    lines = []
+    for name, state in get_breaker_states().items():
+        p95 = f", p95 {state['p95_ms']:.0f}ms" if state["p95_ms"] is not None else ""
+        lines.append(
+            f"{icons.get(state['state'], '⚪')} {name}: {state['state']} "
+            f"(errors {state['error_rate']:.0%} of {state['calls']}{p95})"
+        )
+    return ["", "Circuit breakers:"] + lines if lines else []
+
+def format_quota_usage():
+    """One line per provider quota: remaining budget and planned vs. actual requests today."""
+    lines = []
+    for name, usage in get_quota_usage().items():
+        remaining = f"{usage['remaining']:.0f} left" if usage["remaining"] is not None else "no quota"
+        denied = f", {usage['denied_today']} denied" if usage["denied_today"] else ""
+        lines.append(
+            f"• {name}: {remaining} ({usage['quota'] or '-'}); today planned "
+            f"{usage['planned_today']} / actual {usage['actual_today']}{denied}"
+        )
+    return ["", "Quotas:"] + lines if lines else []
+
+def format_data_quality():
+    """One line per provider: share of clean frames, bars dropped, spikes and gaps."""
+    lines = []
+    for name, q in get_data_quality_stats().items():
+        last = f"; last: {q['last_issue']} ({_age(q['last_issue_at'])})" if q["last_issue"] else ""
+        lines.append(
+            f"• {name}: {q['clean_rate']:.0%} clean of {q['frames']} frames, "
+            f"{q['bars_in'] - q['bars_out']} bars dropped, {q['spikes'] + q['wick_spikes']} spikes, "
+            f"{q['gaps']} gaps{last}"
+        )
+    return ["", "Data quality:"] + lines if lines else []
+
+def format_indicator_cache():
+    """Indicator memo cache: hit rate, entries and memory against the cap."""
+    c = get_indicator_cache_stats()
+    if not c["hits"] + c["misses"]:
+        return []
+    return ["", (
+        f"Indicator cache: {c['hit_rate']:.0%} hits ({c['hits']}/{c['hits'] + c['misses']}), "
+        f"{c['entries']} entries, {c['bytes'] / 2**20:.1f}/{c['max_bytes'] / 2**20:.0f} MB, "
+        f"{c['evictions']} evicted"
+    )]
 
 def get_bot_status():
     return "Bot is running."
@@ -0,0 +1,601 @@
+"""
+Stateful streaming indicators: one new bar in, O(1) update out.
+
+- Each indicator keeps only the state it needs (the last EMA value, a window
+  deque with running sums, monotonic min/max deques) and returns its current
+  value from `update(bar)`. `peek(bar)` returns what a still-forming bar would
+  give without committing it.
+- Values match the batch functions in indicators.py (same EMA recursion,
+  SMA-smoothed RSI, sample-std Bollinger Bands, SMA ATR, Stochastic,
+  Williams %R) over the bars a stream has seen since it was seeded.
+- Windowed min/max use monotonic deques (amortised O(1) per bar); running
+  sums are re-summed from the window every few window lengths so they never
+  drift.
+- Every indicator serialises to JSON (`state()` / `from_state()`), and
+  `IndicatorStreams` keeps one stream per symbol/timeframe, persisted to
+  STREAMING_STATE_PATH, so streams survive restarts.
+- `indicator_streams.sync(symbol, timeframe, df)` keeps a stream in step with
+  an OHLCV frame: only bars newer than the last one seen are fed, a
+  still-forming last bar is peeked, and the stream is re-seeded from the frame
+  when it cannot be continued (first use, or the frame no longer contains the
+  last bar seen).
+"""
+
+import os
+import json
+import math
+import time
+import logging
+import itertools
+import threading
+import numpy as np
+import pandas as pd
+from collections import deque, namedtuple
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from resampler import TIMEFRAME_FREQ, next_bar_close
+
+logger = logging.getLogger(__name__)
+
+STREAMING_STATE_PATH = os.getenv("STREAMING_STATE_PATH", os.path.join("data", "indicator_state.json"))
+STREAMING_STATE_SAVE_SECONDS = float(os.getenv("STREAMING_STATE_SAVE_SECONDS", "60"))
+
+NAN = float("nan")
+
+Bar = namedtuple("Bar", "open high low close volume")
+
+# Indicator class name -> class (for from_state)
+INDICATORS: Dict[str, type] = {}
+
+
+def _div(a: float, b: float) -> float:
+    """a / b with numpy semantics: NaN or ±inf instead of ZeroDivisionError."""
+    if b == 0:
+        return NAN if a == 0 or a != a else math.copysign(math.inf, a)
+    return a / b
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, StreamingIndicator):
+        return {"__indicator__": type(value).__name__, **{k: _encode(v) for k, v in vars(value).items()}}
+    if isinstance(value, deque):
+        return {"__deque__": [_encode(v) for v in value]}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "__deque__" in value:
+            return deque(_decode(v) for v in value["__deque__"])
+        if "__indicator__" in value:
+            cls = INDICATORS[value["__indicator__"]]
+            obj = cls.__new__(cls)
+            for key, item in value.items():
+                if key != "__indicator__":
+                    setattr(obj, key, _decode(item))
+            return obj
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+class StreamingIndicator:
+    """
+    Base class: `update(bar)` commits a closed bar, `peek(bar)` previews a forming one.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        INDICATORS[cls.__name__] = cls
+
+    def update(self, bar: Bar) -> Any:
+        raise NotImplementedError
+
+    def peek(self, bar: Bar) -> Any:
+        raise NotImplementedError
+
+    def state(self) -> Dict[str, Any]:
+        """JSON-serialisable state (NaN is written as the JSON NaN literal)."""
+        return _encode(self)
+
+    @staticmethod
+    def from_state(state: Dict[str, Any]) -> "StreamingIndicator":
+        return _decode(state)
+
+
+# ---- building blocks ----
+
+class EMA(StreamingIndicator):
+    """Exponential moving average, like Series.ewm(span=period, adjust=False).mean()."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value = NAN
+
+    def _next(self, x: float) -> float:
+        if self.value != self.value:
+            return x
+        if x != x or self.value == x:
+            return self.value
+        # pandas' update, operation for operation
+        old = 1.0 - self.alpha
+        return (old * self.value + self.alpha * x) / (old + self.alpha)
+
+    def push(self, x: float) -> float:
+        self.value = self._next(x)
+        return self.value
+
+    def peek_value(self, x: float) -> float:
+        return self._next(x)
+
+    def update(self, bar: Bar) -> float:
+        return self.push(bar.close)
+
+    def peek(self, bar: Bar) -> float:
+        return self._next(bar.close)
+
+
+class RollingWindow(StreamingIndicator):
+    """
+    Mean and sample standard deviation of the last `period` values, like
+    rolling(period).mean() / .std(): NaN until the window is full or while it
+    holds a NaN, exact for constant windows.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.values = deque()
+        # Sums of (x - shift) and (x - shift)², shift ~ window mean, for precision
+        self.shift = NAN
+        self.s1 = 0.0
+        self.s2 = 0.0
+        self.nans = 0
+        # Length of the run of identical trailing values (constant windows are exact)
+        self.run = 0
+        self.pushes = 0
+
+    def _advance(self, x: float) -> Tuple[float, float, float, int, int]:
+        """(shift, s1, s2, nans, run) after pushing x, without committing."""
+        shift = self.shift if self.shift == self.shift else x
+        s1, s2, nans = self.s1, self.s2, self.nans
+        if x != x:
+            nans += 1
+        else:
+            d = x - shift
+            s1 += d
+            s2 += d * d
+        if len(self.values) >= self.period:
+            old = self.values[0]
+            if old != old:
+                nans -= 1
+            else:
+                d = old - shift
+                s1 -= d
+                s2 -= d * d
+        run = self.run + 1 if self.values and self.values[-1] == x else 1
+        return shift, s1, s2, nans, run
+
+    def _stats(self, shift: float, s1: float, s2: float, nans: int, run: int, count: int, last: float) -> Tuple[float, float]:
+        n = self.period
+        if count < n or nans:
+            return NAN, NAN
+        if run >= n:
+            return last, 0.0 if n > 1 else NAN
+        mean = shift + s1 / n
+        if n < 2:
+            return mean, NAN
+        return mean, math.sqrt(max((s2 - s1 * s1 / n) / (n - 1), 0.0))
+
+    def push(self, x: float) -> Tuple[float, float]:
+        self.shift, self.s1, self.s2, self.nans, self.run = self._advance(x)
+        self.values.append(x)
+        if len(self.values) > self.period:
+            self.values.popleft()
+        self.pushes += 1
+        if self.pushes % (4 * self.period) == 0:
+            self._resum()
+        return self.current()
+
+    def peek_value(self, x: float) -> Tuple[float, float]:
+        return self._stats(*self._advance(x), min(len(self.values) + 1, self.period), x)
+
+    def current(self) -> Tuple[float, float]:
+        last = self.values[-1] if self.values else NAN
+        return self._stats(self.shift, self.s1, self.s2, self.nans, self.run, len(self.values), last)
+
+    def _resum(self) -> None:
+        """Re-sum around the current window mean (O(period), every 4 periods)."""
+        finite = [v for v in self.values if v == v]
+        if not finite:
+            return
+        self.shift = math.fsum(finite) / len(finite)
+        self.s1 = math.fsum(v - self.shift for v in finite)
+        self.s2 = math.fsum((v - self.shift) ** 2 for v in finite)
+
+    def update(self, bar: Bar) -> float:
+        return self.push(bar.close)[0]
+
+    def peek(self, bar: Bar) -> float:
+        return self.peek_value(bar.close)[0]
+
+
+class RollingExtreme(StreamingIndicator):
+    """Rolling max (or min) of the last `period` values via a monotonic deque."""
+
+    def __init__(self, period: int, highest: bool = True):
+        self.period = period
+        self.highest = highest
+        self.items = deque()  # [index, value], values monotonic from the front
+        self.count = 0
+
+    def push(self, x: float) -> float:
+        i = self.count
+        self.count += 1
+        items = self.items
+        if self.highest:
+            while items and items[-1][1] <= x:
+                items.pop()
+        else:
+            while items and items[-1][1] >= x:
+                items.pop()
+        items.append([i, x])
+        while items[0][0] <= i - self.period:
+            items.popleft()
+        return self.current()
+
+    def current(self) -> float:
+        return self.items[0][1] if self.count >= self.period else NAN
+
+    def peek_value(self, x: float) -> float:
+        if self.count + 1 < self.period:
+            return NAN
+        first = self.count + 1 - self.period
+        # The front may drop out of the window; the next item is then the extreme of the rest
+        for index, value in itertools.islice(self.items, 2):
+            if index >= first:
+                return max(value, x) if self.highest else min(value, x)
+        return x
+
+    def update(self, bar: Bar) -> float:
+        return self.push(bar.high if self.highest else bar.low)
+
+    def peek(self, bar: Bar) -> float:
+        return self.peek_value(bar.high if self.highest else bar.low)
+
+
+# ---- indicators ----
+
+class SMA(RollingWindow):
+    """Simple moving average (calculate_sma)."""
+
+
+class RSI(StreamingIndicator):
+    """
+    RSI as calculate_rsi: rolling-mean gains / losses, a zero average loss
+    replaced by the last non-zero one.
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = NAN
+        self.gains = RollingWindow(period)
+        self.losses = RollingWindow(period)
+        self.last_loss = NAN
+
+    def _split(self, close: float) -> Tuple[float, float]:
+        delta = close - self.prev_close
+        return (delta if delta > 0 else 0.0), (-delta if delta < 0 else 0.0)
+
+    def _rsi(self, avg_gain: float, avg_loss: float) -> Tuple[float, float]:
+        """(rsi, last non-zero average loss)."""
+        last_loss = avg_loss if avg_loss != 0 else self.last_loss
+        rs = _div(avg_gain, last_loss)
+        if rs != rs:
+            return NAN, last_loss
+        return 100 - (100 / (1 + rs)), last_loss
+
+    def update(self, bar: Bar) -> float:
+        gain, loss = self._split(bar.close)
+        self.prev_close = bar.close
+        rsi, self.last_loss = self._rsi(self.gains.push(gain)[0], self.losses.push(loss)[0])
+        return rsi
+
+    def peek(self, bar: Bar) -> float:
+        gain, loss = self._split(bar.close)
+        return self._rsi(self.gains.peek_value(gain)[0], self.losses.peek_value(loss)[0])[0]
+
+
+class MACD(StreamingIndicator):
+    """MACD line, signal and histogram (calculate_macd)."""
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        self.fast = EMA(fast_period)
+        self.slow = EMA(slow_period)
+        self.signal = EMA(signal_period)
+
+    def update(self, bar: Bar) -> Dict[str, float]:
+        macd = self.fast.push(bar.close) - self.slow.push(bar.close)
+        signal = self.signal.push(macd)
+        return {"macd": macd, "signal": signal, "histogram": macd - signal}
+
+    def peek(self, bar: Bar) -> Dict[str, float]:
+        macd = self.fast.peek_value(bar.close) - self.slow.peek_value(bar.close)
+        signal = self.signal.peek_value(macd)
+        return {"macd": macd, "signal": signal, "histogram": macd - signal}
+
+
+class BollingerBands(StreamingIndicator):
+    """Middle / upper / lower band (calculate_bollinger_bands)."""
+
+    def __init__(self, period: int = 20, num_std: float = 2.0):
+        self.num_std = num_std
+        self.window = RollingWindow(period)
+
+    def _bands(self, mean: float, std: float) -> Dict[str, float]:
+        return {"middle_band": mean, "upper_band": mean + std * self.num_std, "lower_band": mean - std * self.num_std}
+
+    def update(self, bar: Bar) -> Dict[str, float]:
+        return self._bands(*self.window.push(bar.close))
+
+    def peek(self, bar: Bar) -> Dict[str, float]:
+        return self._bands(*self.window.peek_value(bar.close))
+
+
+class ATR(StreamingIndicator):
+    """Average true range, simple mean of the true range (calculate_atr)."""
+
+    def __init__(self, period: int = 14):
+        self.prev_close = NAN
+        self.window = RollingWindow(period)
+
+    def _true_range(self, bar: Bar) -> float:
+        if self.prev_close != self.prev_close:
+            return bar.high - bar.low
+        return max(bar.high - bar.low, abs(bar.high - self.prev_close), abs(bar.low - self.prev_close))
+
+    def update(self, bar: Bar) -> float:
+        tr = self._true_range(bar)
+        self.prev_close = bar.close
+        return self.window.push(tr)[0]
+
+    def peek(self, bar: Bar) -> float:
+        return self.window.peek_value(self._true_range(bar))[0]
+
+
+class Stochastic(StreamingIndicator):
+    """%K / %D (calculate_stochastic_oscillator)."""
+
+    def __init__(self, k_period: int = 14, d_period: int = 3):
+        self.highs = RollingExtreme(k_period, highest=True)
+        self.lows = RollingExtreme(k_period, highest=False)
+        self.d = RollingWindow(d_period)
+
+    @staticmethod
+    def _k(close: float, highest: float, lowest: float) -> float:
+        return _div(100 * (close - lowest), highest - lowest)
+
+    def update(self, bar: Bar) -> Dict[str, float]:
+        k = self._k(bar.close, self.highs.push(bar.high), self.lows.push(bar.low))
+        return {"%K": k, "%D": self.d.push(k)[0]}
+
+    def peek(self, bar: Bar) -> Dict[str, float]:
+        k = self._k(bar.close, self.highs.peek_value(bar.high), self.lows.peek_value(bar.low))
+        return {"%K": k, "%D": self.d.peek_value(k)[0]}
+
+
+class WilliamsR(StreamingIndicator):
+    """Williams %R (calculate_williams_r)."""
+
+    def __init__(self, period: int = 14):
+        self.highs = RollingExtreme(period, highest=True)
+        self.lows = RollingExtreme(period, highest=False)
+
+    @staticmethod
+    def _r(close: float, highest: float, lowest: float) -> float:
+        return _div(-100 * (highest - close), highest - lowest)
+
+    def update(self, bar: Bar) -> float:
+        return self._r(bar.close, self.highs.push(bar.high), self.lows.push(bar.low))
+
+    def peek(self, bar: Bar) -> float:
+        return self._r(bar.close, self.highs.peek_value(bar.high), self.lows.peek_value(bar.low))
+
+
+# ---- per symbol/timeframe streams ----
+
+# Output name -> factory; dict outputs are flattened under their own keys
+DEFAULT_INDICATORS: Dict[str, Callable[[], StreamingIndicator]] = {
+    "ema9": lambda: EMA(9),
+    "ema21": lambda: EMA(21),
+    "rsi": lambda: RSI(14),
+    "macd": lambda: MACD(12, 26, 9),
+    "bollinger": lambda: BollingerBands(20, 2.0),
+    "atr": lambda: ATR(14),
+    "stochastic": lambda: Stochastic(14, 3),
+    "williams_r": lambda: WilliamsR(14),
+}
+
+
+def _flatten(outputs: Dict[str, Any]) -> Dict[str, float]:
+    flat = {}
+    for name, value in outputs.items():
+        if isinstance(value, dict):
+            flat.update(value)
+        else:
+            flat[name] = value
+    return flat
+
+
+class IndicatorStream:
+    """
+    A set of streaming indicators fed the bars of one symbol/timeframe.
+    """
+
+    def __init__(self, indicators: Optional[Dict[str, Callable[[], StreamingIndicator]]] = None):
+        self.indicators = {name: factory() for name, factory in (indicators or DEFAULT_INDICATORS).items()}
+        self.last_time: Optional[int] = None
+        self.bars = 0
+        self.values: Dict[str, float] = {}
+
+    def update(self, ts: int, bar: Bar) -> Dict[str, float]:
+        """Commit the closed bar opening at `ts` (epoch seconds) and return all values."""
+        self.values = _flatten({name: ind.update(bar) for name, ind in self.indicators.items()})
+        self.last_time = ts
+        self.bars += 1
+        return self.values
+
+    def peek(self, bar: Bar) -> Dict[str, float]:
+        """Values if `bar` were the next bar, without committing it."""
+        return _flatten({name: ind.peek(bar) for name, ind in self.indicators.items()})
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "last_time": self.last_time,
+            "bars": self.bars,
+            "values": self.values,
+            "indicators": {name: ind.state() for name, ind in self.indicators.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "IndicatorStream":
+        stream = cls.__new__(cls)
+        stream.indicators = {name: StreamingIndicator.from_state(s) for name, s in state["indicators"].items()}
+        stream.last_time = state["last_time"]
+        stream.bars = state["bars"]
+        stream.values = state["values"]
+        return stream
+
+
+def _bars(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """(epoch seconds, N×5 float array of open/high/low/close/volume) of a frame."""
+    names = {str(c).lower(): c for c in df.columns}
+    close = df[names["close"]].to_numpy(dtype=np.float64)
+    columns = [
+        df[names[col]].to_numpy(dtype=np.float64) if col in names else (np.zeros(len(df)) if col == "volume" else close)
+        for col in ("open", "high", "low", "close", "volume")
+    ]
+    return pd.DatetimeIndex(df.index).values.astype("datetime64[ns]").view("i8") // 10**9, np.column_stack(columns)
+
+
+class IndicatorStreams:
+    """
+    Streams per (symbol, timeframe), persisted as JSON.
+    """
+
+    def __init__(self, state_path: Optional[str] = STREAMING_STATE_PATH):
+        self.state_path = state_path
+        self._streams: Dict[Tuple[str, str], IndicatorStream] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+        self.seeded = 0
+        self.updated = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            for key, state in saved.get("streams", {}).items():
+                symbol, timeframe = key.split("|", 1)
+                stream = IndicatorStream.from_state(state)
+                # Streams saved with another indicator set are re-seeded on next use
+                if set(stream.indicators) == set(DEFAULT_INDICATORS):
+                    self._streams[(symbol, timeframe)] = stream
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"[Streams] Ignoring unreadable indicator state {self.state_path}: {e}")
+            self._streams.clear()
+
+    def save(self, force: bool = False) -> None:
+        """Write all streams (at most every STREAMING_STATE_SAVE_SECONDS unless forced)."""
+        if not self.state_path:
+            return
+        with self._lock:
+            if not self._dirty or (not force and time.time() - self._saved_at < STREAMING_STATE_SAVE_SECONDS):
+                return
+            text = json.dumps({
+                "updated": time.time(),
+                "streams": {f"{s}|{tf}": stream.state() for (s, tf), stream in sorted(self._streams.items())},
+            })
+            self._dirty = False
+            self._saved_at = time.time()
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            tmp = f"{self.state_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            logger.warning(f"[Streams] Could not write indicator state {self.state_path}: {e}")
+
+    def get(self, symbol: str, timeframe: str) -> Optional[IndicatorStream]:
+        return self._streams.get((symbol.upper(), timeframe.upper()))
+
+    def sync(self, symbol: str, timeframe: str, df: pd.DataFrame, now: Optional[float] = None) -> Dict[str, float]:
+        """
+        Bring the symbol/timeframe stream up to date with `df` and return the
+        latest indicator values (the forming last bar peeked, not committed).
+
+        Args:
+            symbol (str): Symbol.
+            timeframe (str): Timeframe key ("H1", "D1", ...).
+            df (pd.DataFrame): OHLCV frame (DatetimeIndex of bar open times, any column case).
+            now (float, optional): Epoch seconds used to decide whether the last bar has closed.
+
+        Returns:
+            dict: ema9, ema21, rsi, macd, signal, histogram, middle_band,
+            upper_band, lower_band, atr, %K, %D, williams_r (empty for an empty frame).
+        """
+        if df is None or df.empty:
+            return {}
+        key = (symbol.upper(), timeframe.upper())
+        now = time.time() if now is None else now
+        times, values = _bars(df)
+        closed = len(times)
+        if key[1] in TIMEFRAME_FREQ and next_bar_close(key[1], int(times[-1])) > now:
+            closed -= 1
+
+        with self._lock:
+            stream = self._streams.get(key)
+            start = 0
+            if stream is not None and stream.last_time is not None:
+                at = int(np.searchsorted(times, stream.last_time))
+                if at < len(times) and times[at] == stream.last_time:
+                    start = at + 1
+                else:
+                    stream = None
+            if stream is None:
+                stream = self._streams[key] = IndicatorStream()
+                self.seeded += 1
+            for i in range(start, closed):
+                stream.update(int(times[i]), Bar(*values[i].tolist()))
+            self.updated += max(closed - start, 0)
+            self._dirty = self._dirty or closed > start
+            if start <= closed < len(times):
+                result = stream.peek(Bar(*values[-1].tolist()))
+            else:
+                result = dict(stream.values)
+        self.save()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {"streams": len(self._streams), "seeded": self.seeded, "bars_updated": self.updated}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._streams.clear()
+            self._dirty = True
+
+
+indicator_streams = IndicatorStreams()
+
+
+def get_indicator_stream_stats() -> Dict[str, Any]:
+    """Number of streams, re-seeds and bars fed incrementally."""
+    return indicator_streams.stats()
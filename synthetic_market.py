@@ -0,0 +1,336 @@
+"""
+Deterministic, vectorized synthetic OHLCV generator (offline data provider).
+
+- Per-instrument `numpy.random.Generator` streams seeded from
+  (SYNTHETIC_SEED, symbol, timeframe): no global reseeding, and every
+  instrument is reproducible on its own.
+- Returns: GBM with a two-state (calm / volatile) regime-switching volatility.
+- Trading calendar: FX-style intraday weeks from the Sunday to the Friday
+  session close of resampler (17:00 New York, DST-aware: 22:00 UTC in
+  winter, 21:00 UTC in summer), so bars agree with fx_market_open and
+  data_quality; a price gap at every weekly open; crypto instruments trade
+  around the clock.
+- Intrabar high/low from the Brownian-bridge maximum distribution; volume
+  follows |return| and the London/New York session cycle.
+- Bars are generated in fixed-size chunks counted from a fixed origin, and
+  chunk end levels come from their own stream, so a bar has the same values
+  whichever window it is requested in (incremental fetches merge cleanly),
+  and cost is proportional to the window, not to its distance from origin.
+- Millions of bars across hundreds of symbols generate in seconds
+  (see benchmark_synthetic_market.py).
+"""
+
+import os
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, NamedTuple, Optional, Union
+
+from resampler import SESSION_CLOSE_HOUR, SESSION_TZ
+
+SYNTHETIC_SEED = int(os.getenv("SYNTHETIC_SEED", "42"))
+SYNTHETIC_CHUNK_BARS = int(os.getenv("SYNTHETIC_CHUNK_BARS", "4096"))
+
+TIMEFRAME_SECONDS = {
+    "M1": 60,
+    "M5": 300,
+    "M15": 900,
+    "M30": 1800,
+    "H1": 3600,
+    "H4": 14400,
+    "D1": 86400,
+    "W1": 604800,
+}
+
+# CloudBot-style keys ("1H") -> marketdata keys ("H1")
+TIMEFRAME_ALIASES = {
+    "1M": "M1",
+    "5M": "M5",
+    "15M": "M15",
+    "30M": "M30",
+    "1H": "H1",
+    "4H": "H4",
+    "1D": "D1",
+    "1W": "W1",
+}
+
+WEEK_SECONDS = 7 * 86400
+FX_WEEK_SECONDS = 120 * 3600
+# A Sunday 22:00 UTC (FX week open in winter); bar index 0 of every timeframe
+# starts here, and week w nominally at ORIGIN_SECONDS + w * WEEK_SECONDS.
+ORIGIN_SECONDS = int(pd.Timestamp("2000-01-02 22:00").value // 10**9)
+# Instruments trade near their base price around this date.
+ANCHOR_SECONDS = int(pd.Timestamp(os.getenv("SYNTHETIC_ANCHOR", "2024-01-01")).value // 10**9)
+
+# Regime vol multipliers; both regimes are equally likely, so the mean
+# variance (0.6² + 1.28²) / 2 ≈ 1 keeps the configured annual vol.
+CALM_VOL, VOLATILE_VOL = 0.6, 1.28
+GAP_VOL = 3.0
+LEVEL_STREAM = 0xC0FFEE
+
+TimeLike = Union[str, pd.Timestamp, None]
+
+
+class Instrument(NamedTuple):
+    base_price: float
+    annual_vol: float
+    base_volume: float
+    digits: int
+    always_open: bool = False
+
+
+INSTRUMENTS = {
+    "EURUSD": Instrument(1.08, 0.07, 1500, 5),
+    "GBPUSD": Instrument(1.25, 0.08, 1200, 5),
+    "USDJPY": Instrument(150.0, 0.09, 1300, 3),
+    "USDCHF": Instrument(0.90, 0.07, 800, 5),
+    "AUDUSD": Instrument(0.65, 0.10, 900, 5),
+    "NZDUSD": Instrument(0.60, 0.10, 600, 5),
+    "USDCAD": Instrument(1.35, 0.06, 900, 5),
+    "XAUUSD": Instrument(2000.0, 0.15, 3000, 2),
+    "XAGUSD": Instrument(24.0, 0.25, 1500, 3),
+    "BTCUSD": Instrument(60000.0, 0.60, 500, 2, True),
+    "ETHUSD": Instrument(3000.0, 0.75, 800, 2, True),
+    "US30": Instrument(38000.0, 0.15, 2000, 1),
+    "NAS100": Instrument(17000.0, 0.20, 2500, 1),
+    "SPX500": Instrument(5000.0, 0.16, 2500, 1),
+    "WTI": Instrument(75.0, 0.35, 2000, 2),
+    "NGAS": Instrument(2.5, 0.60, 1500, 3),
+    "COFFEE": Instrument(180.0, 0.35, 500, 2),
+}
+
+
+def instrument(symbol: str) -> Instrument:
+    """Parameters for `symbol`; unknown symbols get stable hash-derived ones."""
+    known = INSTRUMENTS.get(symbol.upper())
+    if known is not None:
+        return known
+    h = zlib.crc32(symbol.upper().encode())
+    u, v = (h & 0xFFFF) / 0xFFFF, ((h >> 16) & 0xFFFF) / 0xFFFF
+    base = round(10 ** (4 * u - 1), 4)  # 0.1 .. 1000
+    digits = 5 if base < 10 else 3 if base < 1000 else 2
+    return Instrument(base, 0.05 + 0.35 * v, 1000.0, digits)
+
+
+def synthetic_universe(n: int, prefix: str = "SYN") -> List[str]:
+    """`n` synthetic symbol names (SYN0001, SYN0002, ...) for load tests."""
+    return [f"{prefix}{i:04d}" for i in range(1, n + 1)]
+
+
+class _Calendar(NamedTuple):
+    tf: int          # bar length, seconds
+    per_week: int    # bars per calendar week
+    first: int       # offset of the week's first bar from the week origin, seconds
+    gaps: bool       # weekly open gaps
+    session: bool    # weeks open at the FX session open (DST-aware), not on the fixed UTC grid
+
+
+def _calendar(timeframe: str, always_open: bool) -> _Calendar:
+    tf = TIMEFRAME_SECONDS[timeframe]
+    if tf >= 86400:
+        # Daily/weekly bars open at 00:00 UTC (Monday for weekly bars)
+        days = 7 if always_open else 5
+        per_week = max(days * 86400 // tf, 1)
+        return _Calendar(tf, per_week, 2 * 3600, not always_open, False)
+    span = WEEK_SECONDS if always_open else FX_WEEK_SECONDS
+    return _Calendar(tf, span // tf, 0, not always_open, not always_open)
+
+
+def _week_start(cal: _Calendar, weeks: np.ndarray) -> np.ndarray:
+    """
+    UTC open (epoch seconds) of each calendar week. Session weeks open at the
+    Sunday session close hour in SESSION_TZ; DST changes fall on the weekend,
+    so the trading week itself stays FX_WEEK_SECONDS long.
+    """
+    weeks = np.asarray(weeks, dtype=np.int64)
+    nominal = ORIGIN_SECONDS + weeks * WEEK_SECONDS
+    if not cal.session:
+        return nominal
+    unique, inverse = np.unique(weeks, return_inverse=True)
+    local = pd.Timestamp("2000-01-02") + pd.to_timedelta(unique * 7, unit="D") + pd.Timedelta(hours=SESSION_CLOSE_HOUR)
+    opens = pd.DatetimeIndex(local).tz_localize(SESSION_TZ, nonexistent="shift_forward", ambiguous=True)
+    seconds = opens.tz_convert("UTC").tz_localize(None).values.astype("datetime64[ns]").view("i8") // 10**9
+    return seconds[inverse.reshape(weeks.shape)]
+
+
+def _week_of(cal: _Calendar, t: int):
+    """(week, seconds since that week's first bar slot) for time `t`."""
+    week = (t - ORIGIN_SECONDS) // WEEK_SECONDS
+    while t < _week_start(cal, week):
+        week -= 1
+    while t >= _week_start(cal, week + 1):
+        week += 1
+    return int(week), int(t - _week_start(cal, week) - cal.first)
+
+
+def _index_at_or_before(cal: _Calendar, t: int) -> int:
+    week, within = _week_of(cal, t)
+    if within < 0:
+        return week * cal.per_week - 1
+    return week * cal.per_week + min(within // cal.tf, cal.per_week - 1)
+
+
+def _index_at_or_after(cal: _Calendar, t: int) -> int:
+    week, within = _week_of(cal, t)
+    offset = 0 if within <= 0 else -(-within // cal.tf)
+    if offset >= cal.per_week:
+        return (week + 1) * cal.per_week
+    return week * cal.per_week + offset
+
+
+def _bar_seconds(cal: _Calendar, k: np.ndarray) -> np.ndarray:
+    week, offset = np.divmod(k, cal.per_week)
+    return _week_start(cal, week) + cal.first + offset * cal.tf
+
+
+def _seconds(value: TimeLike, default: float) -> int:
+    if value is None:
+        return int(default)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return int(ts.value // 10**9)
+
+
+class SyntheticMarket:
+    """
+    Reproducible synthetic OHLCV source for any symbol and timeframe.
+    """
+
+    def __init__(self, seed: int = SYNTHETIC_SEED, chunk_bars: int = SYNTHETIC_CHUNK_BARS):
+        self.seed = seed
+        self.chunk_bars = chunk_bars
+
+    def _streams(self, symbol: str, cal: _Calendar):
+        return [self.seed, zlib.crc32(symbol.upper().encode()), cal.tf]
+
+    def _chunk(self, symbol: str, inst: Instrument, cal: _Calendar, c: int, level: float, drift: float):
+        """Log open/high/low/close and volume activity for bars c*C .. (c+1)*C - 1."""
+        n = self.chunk_bars
+        sigma = inst.annual_vol / np.sqrt(52 * cal.per_week)
+        rng = np.random.default_rng(self._streams(symbol, cal) + [c])
+        z = rng.standard_normal(n)
+        gap_z = rng.standard_normal(n)
+        u = 1.0 - rng.random((2, n))
+        switches = rng.random(n) < 1.0 / max(2 * cal.per_week, 4)
+        regime = (rng.integers(2) + np.cumsum(switches)) % 2
+        volume_noise = rng.standard_normal(n)
+
+        scale = np.where(regime == 1, VOLATILE_VOL, CALM_VOL) * sigma
+        k = np.arange(c * n, (c + 1) * n)
+        gap = np.where(k % cal.per_week == 0, GAP_VOL * sigma * gap_z, 0.0) if cal.gaps else 0.0
+        step = scale * z - 0.5 * scale ** 2 + gap
+        # Brownian bridge: pin the chunk's end to the level path
+        step += (drift - step.sum()) / n
+        log_close = level + np.cumsum(step)
+        log_open = np.concatenate(([level], log_close[:-1])) + gap
+        log_high = np.maximum(log_open, log_close) + scale * np.sqrt(-np.log(u[0]) / 2)
+        log_low = np.minimum(log_open, log_close) - scale * np.sqrt(-np.log(u[1]) / 2)
+        activity = (0.5 + 0.5 * np.abs(z)) * np.exp(0.4 * volume_noise)
+        return log_open, log_high, log_low, log_close, activity
+
+    def _levels(self, symbol: str, inst: Instrument, cal: _Calendar, last_chunk: int) -> np.ndarray:
+        """Log price at the start of chunks 0..last_chunk+1 (base price at the anchor chunk)."""
+        sigma = inst.annual_vol / np.sqrt(52 * cal.per_week)
+        mean_var = 0.5 * (CALM_VOL ** 2 + VOLATILE_VOL ** 2) * sigma ** 2
+        anchor = max(_index_at_or_before(cal, ANCHOR_SECONDS), 0) // self.chunk_bars
+        rng = np.random.default_rng(self._streams(symbol, cal) + [LEVEL_STREAM])
+        drifts = rng.standard_normal(max(last_chunk, anchor) + 1) * np.sqrt(mean_var * self.chunk_bars)
+        drifts -= 0.5 * mean_var * self.chunk_bars
+        levels = np.concatenate(([0.0], np.cumsum(drifts)))
+        return np.log(inst.base_price) + levels - levels[anchor]
+
+    def bars(
+        self,
+        symbol: str,
+        timeframe: str = "H1",
+        bars: int = 200,
+        end: TimeLike = None,
+        start: TimeLike = None,
+    ) -> pd.DataFrame:
+        """
+        Synthetic OHLCV bars in the bar store schema.
+
+        Args:
+            symbol (str): Any symbol (known instruments get realistic prices/vols).
+            timeframe (str): "M1" .. "W1" (CloudBot keys like "1H" accepted).
+            bars (int): Number of bars ending at `end` (ignored when `start` is given).
+            end (optional): Last bar opens at or before this time (default: now).
+            start (optional): Return every bar from this time up to `end`.
+
+        Returns:
+            pd.DataFrame: open/high/low/close/volume, naive UTC index "time".
+        """
+        timeframe = TIMEFRAME_ALIASES.get(timeframe.upper(), timeframe.upper())
+        inst = instrument(symbol)
+        cal = _calendar(timeframe, inst.always_open)
+        k1 = _index_at_or_before(cal, _seconds(end, time.time()))
+        if start is not None:
+            k0 = _index_at_or_after(cal, _seconds(start, 0))
+        else:
+            k0 = k1 - bars + 1
+        k0 = max(k0, 0)
+        if k1 < k0:
+            return pd.DataFrame(
+                {c: pd.Series(dtype="float64") for c in ("open", "high", "low", "close", "volume")},
+                index=pd.DatetimeIndex([], name="time"),
+            )
+
+        n = self.chunk_bars
+        c0, c1 = k0 // n, k1 // n
+        levels = self._levels(symbol, inst, cal, c1)
+        parts = [
+            self._chunk(symbol, inst, cal, c, levels[c], levels[c + 1] - levels[c])
+            for c in range(c0, c1 + 1)
+        ]
+        lo, hi = k0 - c0 * n, k1 - c0 * n + 1
+        log_open, log_high, log_low, log_close, activity = (
+            np.concatenate(col)[lo:hi] for col in zip(*parts)
+        )
+
+        seconds = _bar_seconds(cal, np.arange(k0, k1 + 1, dtype=np.int64))
+        hour = (seconds % 86400) // 3600
+        if cal.tf < 86400:
+            session = 1.0 + 0.8 * ((hour >= 7) & (hour < 16)) + 0.8 * ((hour >= 12) & (hour < 21))
+        else:
+            session = 1.0
+        volume = np.round(inst.base_volume * (cal.tf / 3600) * session * activity)
+
+        digits = inst.digits
+        return pd.DataFrame(
+            {
+                "open": np.round(np.exp(log_open), digits),
+                "high": np.round(np.exp(log_high), digits),
+                "low": np.round(np.exp(log_low), digits),
+                "close": np.round(np.exp(log_close), digits),
+                "volume": volume,
+            },
+            index=pd.DatetimeIndex((seconds * 10**9).view("M8[ns]"), name="time"),
+        )
+
+    def many(
+        self,
+        symbols: List[str],
+        timeframe: str = "H1",
+        bars: int = 200,
+        end: TimeLike = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """`bars()` for several symbols, all ending at the same `end`."""
+        end = end if end is not None else pd.Timestamp(int(time.time()), unit="s")
+        return {symbol: self.bars(symbol, timeframe, bars, end=end) for symbol in symbols}
+
+
+synthetic_market = SyntheticMarket()
+
+
+async def get_synthetic_data(
+    symbol: str,
+    timeframe: str = "H1",
+    bars: int = 200,
+    start: Optional[pd.Timestamp] = None,
+) -> pd.DataFrame:
+    """
+    Async provider wrapper (same shape as get_finnhub_data / get_yf_data).
+    """
+    return synthetic_market.bars(symbol, timeframe, bars, start=start)
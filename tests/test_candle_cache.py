@@ -0,0 +1,59 @@
+"""
+Regression tests for marketdata.CandleCache.get_or_fetch.
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import time
+import unittest
+
+import pandas as pd
+
+from marketdata import CandleCache
+
+KEY = ("EURUSD", "H1", 50, "auto:")
+
+
+def _frame(close):
+    index = pd.date_range("2024-01-02", periods=3, freq="h", tz="UTC")
+    return pd.DataFrame({"open": close, "high": close, "low": close, "close": close}, index=index)
+
+
+class CancelledLeaderTest(unittest.TestCase):
+
+    def test_retry_keeps_max_staleness(self):
+        async def scenario():
+            cache = CandleCache()
+            started = asyncio.Event()
+            fetched = []
+
+            async def slow():
+                started.set()
+                await asyncio.sleep(60)
+
+            async def fresh():
+                fetched.append(True)
+                return _frame(2.0)
+
+            leader = asyncio.ensure_future(cache.get_or_fetch(KEY, slow))
+            await started.wait()
+            follower = asyncio.ensure_future(cache.get_or_fetch(KEY, fresh, max_staleness=600))
+            await asyncio.sleep(0)
+            # An entry that expired 10s ago lands while the follower waits
+            cache._entries[KEY] = (time.time() - 10, _frame(1.0))
+            leader.cancel()
+            df = await follower
+            await asyncio.gather(*cache._background)
+            return df, fetched, cache
+
+        df, fetched, cache = asyncio.run(scenario())
+        self.assertTrue(df.attrs.get("stale"))
+        self.assertEqual(df["close"].iloc[-1], 1.0)
+        self.assertEqual(cache.stale_hits, 1)
+        self.assertEqual(cache.revalidations, 1)
+        self.assertEqual(fetched, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
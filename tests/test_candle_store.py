@@ -0,0 +1,52 @@
+"""
+Regression tests for candle_store.CandleStore.append.
+
+Run with: python -m unittest discover tests
+"""
+
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from candle_store import CandleStore
+
+
+def _bars(times, close):
+    index = pd.DatetimeIndex(pd.to_datetime(times))
+    values = np.full(len(index), close, dtype=np.float64)
+    return pd.DataFrame({"open": values, "high": values, "low": values, "close": values}, index=index)
+
+
+class AppendMergeTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = CandleStore(self._tmp.name)
+        hours = pd.date_range("2024-01-02 00:00", periods=6, freq="h")
+        self.store.append("EURUSD", "H1", _bars(hours, 1.0))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_overlap_replaces_matching_bars_and_keeps_the_rest(self):
+        # 01:00 and 03:00 are restated, 03:30 is new; 02:00, 04:00, 05:00 stay
+        self.store.append("EURUSD", "H1", _bars(["2024-01-02 01:00", "2024-01-02 03:00", "2024-01-02 03:30"], 2.0))
+        frame = self.store.frame("EURUSD", "H1")
+        self.assertEqual(
+            [str(t.time()) for t in frame.index],
+            ["00:00:00", "01:00:00", "02:00:00", "03:00:00", "03:30:00", "04:00:00", "05:00:00"],
+        )
+        self.assertEqual(frame["close"].tolist(), [1.0, 2.0, 1.0, 2.0, 2.0, 1.0, 1.0])
+
+    def test_live_mapping_survives_an_overlapping_append(self):
+        before = self.store.view("EURUSD", "H1")
+        self.store.append("EURUSD", "H1", _bars(["2024-01-02 04:00", "2024-01-02 06:00"], 3.0))
+        self.assertEqual(len(before), 6)
+        self.assertEqual(before.close[4], 3.0)
+        self.assertEqual(self.store.length("EURUSD", "H1"), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Regression tests for circuit_breaker.call_with_breakers.
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import unittest
+
+import circuit_breaker as cb
+
+
+async def _answer(value):
+    return value
+
+
+class HalfOpenFallbackTest(unittest.TestCase):
+
+    def setUp(self):
+        cb._breakers.clear()
+        fallback = cb.get_breaker("fallback")
+        fallback.state = cb.OPEN
+        fallback.opened_at = 0.0
+        fallback.open_seconds = 0.0
+
+    def tearDown(self):
+        cb._breakers.clear()
+
+    def _chain(self, fallback_value="fallback"):
+        return [("primary", lambda: _answer("primary")), ("fallback", lambda: _answer(fallback_value))]
+
+    def test_untried_fallback_keeps_its_trial(self):
+        for hedged in (False, True):
+            with self.subTest(hedged=hedged):
+                name, result = asyncio.run(cb.call_with_breakers(self._chain(), hedged=hedged))
+                self.assertEqual((name, result), ("primary", "primary"))
+                self.assertFalse(cb.get_breaker("fallback").trial_in_flight)
+
+    def test_fallback_trial_runs_once_primary_fails(self):
+        asyncio.run(cb.call_with_breakers(self._chain()))
+        chain = [("primary", lambda: _answer(None)), ("fallback", lambda: _answer("fallback"))]
+        name, result = asyncio.run(cb.call_with_breakers(chain))
+        self.assertEqual((name, result), ("fallback", "fallback"))
+        self.assertEqual(cb.get_breaker("fallback").state, cb.CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
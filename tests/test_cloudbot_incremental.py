@@ -0,0 +1,64 @@
+"""
+Regression tests for the incremental bar-store path of cloudbot_data_integration.
+
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import circuit_breaker as cb
+import cloudbot_data_integration as cdi
+from bar_store import BarStore
+from candle_store import CandleStore
+
+
+async def _no_bars(*args, **kwargs):
+    return None
+
+
+class IncrementalFetchFailureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = BarStore(CandleStore(self.tmp.name), legacy_dir=self.tmp.name)
+        # A full store whose last H1 bar closed just now
+        index = pd.date_range(end=pd.Timestamp.utcnow().floor("h").tz_localize(None) - pd.Timedelta(hours=1),
+                              periods=50, freq="h", name="time")
+        close = 1.1 + np.arange(50) * 1e-4
+        self.store.merge("EURUSD", "H1", pd.DataFrame(
+            {"open": close, "high": close, "low": close, "close": close, "volume": 0.0}, index=index))
+        patches = [
+            mock.patch.object(cdi, "bar_store", self.store),
+            mock.patch.object(cdi, "INCREMENTAL_SOURCES", {"Mock Data"}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        cb._breakers.clear()
+        self.integration = cdi.CloudBotDataIntegration()
+        self.integration._get_ohlc_data_mock = _no_bars
+
+    def tearDown(self):
+        cb._breakers.clear()
+        self.tmp.cleanup()
+
+    def test_failed_incremental_fetch_is_a_failure(self):
+        df = asyncio.run(self.integration._get_ohlc_data_incremental(_no_bars, "EURUSD", "1H", 20))
+        self.assertIsNone(df)
+
+    def test_chain_falls_back_to_tagged_stale_bars(self):
+        df = asyncio.run(self.integration._get_ohlc_data("EURUSD", "1H", 20, max_staleness=7200))
+        self.assertEqual(len(df), 20)
+        self.assertTrue(df.attrs.get("stale"))
+        self.assertEqual(cb.get_breaker("cloudbot:Mock Data").snapshot()["calls"], 1)
+        self.assertIsNone(asyncio.run(self.integration._get_ohlc_data("EURUSD", "1H", 20, max_staleness=None)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Regression tests for cross_rates.cross_legs and derive_cross.
+
+Run with: python -m unittest discover tests
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from cross_rates import cross_legs, derive_cross, derive_cross_from
+
+INDEX = pd.date_range("2024-01-08", periods=3, freq="h")
+
+
+def _leg(open_, high, low, close, volume, index=INDEX):
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume}, index=index)
+
+
+EURUSD = _leg([1.10, 1.11, 1.12], [1.12, 1.13, 1.13], [1.09, 1.10, 1.11], [1.11, 1.12, 1.115], [10.0, 20.0, 30.0])
+USDJPY = _leg([150.0, 151.0, 150.5], [151.5, 152.0, 151.0], [149.5, 150.0, 149.0], [151.0, 150.5, 149.5], [15.0, 5.0, 40.0])
+GBPUSD = _leg([1.27, 1.28, 1.26], [1.29, 1.29, 1.27], [1.26, 1.27, 1.25], [1.28, 1.26, 1.265], [12.0, 12.0, 12.0])
+
+
+class CrossLegsTest(unittest.TestCase):
+
+    def test_leg_exponents(self):
+        self.assertEqual(cross_legs("EURJPY"), [("EURUSD", 1), ("USDJPY", 1)])
+        self.assertEqual(cross_legs("eurgbp"), [("EURUSD", 1), ("GBPUSD", -1)])
+        self.assertEqual(cross_legs("CADCHF"), [("USDCAD", -1), ("USDCHF", 1)])
+
+    def test_usd_pairs_and_unknown_symbols_are_not_crosses(self):
+        for symbol in ("EURUSD", "USDJPY", "EUREUR", "XAUUSD", "EURJPYX"):
+            self.assertIsNone(cross_legs(symbol), symbol)
+
+
+class DeriveCrossTest(unittest.TestCase):
+
+    def test_open_close_are_leg_products(self):
+        cross = derive_cross([(EURUSD, 1), (USDJPY, 1)])
+        np.testing.assert_allclose(cross["open"], EURUSD["open"] * USDJPY["open"])
+        np.testing.assert_allclose(cross["close"], EURUSD["close"] * USDJPY["close"])
+        np.testing.assert_array_equal(cross["volume"], [10.0, 5.0, 30.0])
+
+    def test_range_weight_moves_high_low_between_body_and_outer_bound(self):
+        legs = [(EURUSD, 1), (GBPUSD, -1)]
+        body = derive_cross(legs, range_weight=0.0)
+        outer = derive_cross(legs, range_weight=1.0)
+        half = derive_cross(legs, range_weight=0.5)
+        np.testing.assert_allclose(body["high"], np.maximum(body["open"], body["close"]))
+        np.testing.assert_allclose(body["low"], np.minimum(body["open"], body["close"]))
+        # The inverted leg's low bounds the cross high and vice versa
+        np.testing.assert_allclose(outer["high"], EURUSD["high"] / GBPUSD["low"])
+        np.testing.assert_allclose(outer["low"], EURUSD["low"] / GBPUSD["high"])
+        np.testing.assert_allclose(half["high"], (body["high"] + outer["high"]) / 2)
+        self.assertTrue((half["low"] <= half[["open", "close"]].min(axis=1)).all())
+
+    def test_bars_missing_in_either_leg_are_missing_in_the_cross(self):
+        shifted = USDJPY.iloc[1:]
+        cross = derive_cross([(EURUSD.iloc[:2], 1), (shifted, 1)])
+        self.assertEqual(list(cross.index), [INDEX[1]])
+        self.assertTrue(derive_cross([(EURUSD.iloc[:1], 1), (shifted, 1)]).empty)
+        self.assertTrue(derive_cross([(EURUSD, 1), (pd.DataFrame(), 1)]).empty)
+
+    def test_derive_cross_from_frames(self):
+        cross = derive_cross_from("EURJPY", {"EURUSD": EURUSD, "USDJPY": USDJPY}, bars=2)
+        self.assertEqual(len(cross), 2)
+        self.assertEqual(cross.attrs["derived_from"], ["EURUSD", "USDJPY"])
+        self.assertTrue(derive_cross_from("EURJPY", {"EURUSD": EURUSD}).empty)
+        with self.assertRaises(ValueError):
+            derive_cross_from("EURUSD", {"EURUSD": EURUSD})
+
+
+if __name__ == "__main__":
+    unittest.main()
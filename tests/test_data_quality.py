@@ -0,0 +1,101 @@
+"""
+Regression tests for data_quality.validate_ohlc repairs.
+
+Run with: python -m unittest discover tests
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_quality import REPAIRS, validate_ohlc
+
+
+def _clean(bars=60):
+    """Consistent H1 bars from Monday 2024-01-08 00:00 UTC (no weekend)."""
+    rng = np.random.default_rng(3)
+    close = 1.10 * np.exp(np.cumsum(rng.normal(0, 2e-4, bars)))
+    open_ = np.r_[close[0], close[:-1]]
+    index = pd.date_range("2024-01-08", periods=bars, freq="h")
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + 1e-4,
+        "low": np.minimum(open_, close) - 1e-4,
+        "close": close,
+        "volume": np.full(bars, 100.0),
+    }, index=index)
+
+
+def _check(df, symbol="EURUSD"):
+    out = validate_ohlc(df, "H1", symbol, record=False)
+    return out, out.attrs["data_quality"]
+
+
+class ValidateOhlcTest(unittest.TestCase):
+
+    def test_clean_frame_needs_no_repair(self):
+        out, report = _check(_clean())
+        self.assertFalse(any(report[issue] for issue in REPAIRS))
+        pd.testing.assert_frame_equal(out, _clean())
+
+    def test_unsorted_index_with_duplicates_keeps_the_newest_copy(self):
+        df = _clean()
+        restated = df.iloc[[10]].assign(close=df["close"].iloc[10] * 1.0001)
+        messy = pd.concat([df.iloc[::-1], restated])
+        out, report = _check(messy)
+        self.assertEqual((report["unsorted"], report["duplicates"]), (1, 1))
+        self.assertTrue(out.index.equals(df.index))
+        self.assertEqual(out["close"].iloc[10], restated["close"].iloc[0])
+
+    def test_bad_closes_and_weekend_bars_are_dropped(self):
+        df = _clean()
+        df.iloc[5, df.columns.get_loc("close")] = np.nan
+        saturday = pd.DataFrame(df.iloc[[-1]].to_numpy(), columns=df.columns,
+                                index=pd.DatetimeIndex(["2024-01-13 12:00"]))
+        out, report = _check(pd.concat([df, saturday]))
+        self.assertEqual((report["bad_close"], report["weekend"]), (1, 1))
+        self.assertEqual(len(out), len(df) - 1)
+        _, crypto = _check(pd.concat([df, saturday]), symbol="BTCUSD")
+        self.assertEqual(crypto["weekend"], 0)
+
+    def test_missing_and_inconsistent_prices_are_filled(self):
+        df = _clean()
+        df.iloc[7, df.columns.get_loc("open")] = np.nan
+        df.iloc[8, df.columns.get_loc("high")] = df["close"].iloc[8] - 1e-3
+        out, report = _check(df)
+        self.assertEqual((report["filled"], report["inconsistent"]), (1, 1))
+        self.assertEqual(out["open"].iloc[7], df["close"].iloc[6])
+        self.assertGreaterEqual(out["high"].iloc[8], max(out["open"].iloc[8], out["close"].iloc[8]))
+
+    def test_flat_fill_is_dropped(self):
+        df = _clean()
+        previous = df["close"].iloc[19]
+        df.iloc[20] = [previous, previous, previous, previous, 0.0]
+        out, report = _check(df)
+        self.assertEqual(report["flat_fills"], 1)
+        self.assertNotIn(df.index[20], out.index)
+
+    def test_spike_is_replaced_by_the_neighbours_geometric_mean(self):
+        df = _clean()
+        k = 30
+        df.iloc[k, df.columns.get_loc("close")] *= 1.05
+        df.iloc[k, df.columns.get_loc("high")] = df["close"].iloc[k]
+        df.iloc[k + 1, df.columns.get_loc("open")] = df["close"].iloc[k]
+        out, report = _check(df)
+        self.assertEqual(report["spikes"], 1)
+        expected = np.sqrt(df["close"].iloc[k - 1] * df["close"].iloc[k + 1])
+        self.assertAlmostEqual(out["close"].iloc[k], expected, places=12)
+        self.assertEqual(out["open"].iloc[k + 1], out["close"].iloc[k])
+        self.assertLess(out["high"].iloc[k], df["close"].iloc[k])
+
+    def test_tz_aware_index_gives_the_same_result(self):
+        df = _clean()
+        df.iloc[5, df.columns.get_loc("close")] = np.nan
+        naive, _ = _check(df)
+        aware, _ = _check(df.tz_localize("UTC"))
+        pd.testing.assert_frame_equal(naive, aware.tz_localize(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Regression tests for request_planner.RequestPlanner.plan_ohlc.
+
+Run with: python -m unittest discover tests
+"""
+
+import unittest
+
+from request_planner import RequestPlanner, parse_quota
+
+
+def _planner(finnhub="2/min", yahoo="2000/hour", priority=()):
+    quotas = {"finnhub": parse_quota(finnhub), "yahoo": parse_quota(yahoo)}
+    return RequestPlanner(quotas=quotas, ledger_path=None, priority_symbols=priority)
+
+
+class PlanOhlcTest(unittest.TestCase):
+
+    def test_budget_is_held_back_for_single_provider_symbols(self):
+        planner = _planner(finnhub="2/min")
+        chains = {
+            "EURUSD": ["finnhub", "yahoo"],
+            "GBPUSD": ["finnhub", "yahoo"],
+            "US30": ["finnhub"],
+            "XAUUSD": ["finnhub"],
+        }
+        plan = planner.plan_ohlc(["EURUSD", "GBPUSD", "US30", "XAUUSD"], chains)
+        self.assertEqual(plan.deferred, [])
+        self.assertEqual(sorted(plan.symbols_for("finnhub")), ["US30", "XAUUSD"])
+        self.assertEqual(sorted(plan.symbols_for("yahoo")), ["EURUSD", "GBPUSD"])
+
+    def test_symbols_nobody_can_afford_are_deferred(self):
+        planner = _planner(finnhub="1/min")
+        chains = {"US30": ["finnhub"], "XAUUSD": ["finnhub"]}
+        plan = planner.plan_ohlc(["US30", "XAUUSD"], chains)
+        self.assertEqual(plan.assignments, {"US30": "finnhub"})
+        self.assertEqual(plan.deferred, ["XAUUSD"])
+        usage = planner.usage()["finnhub"]
+        self.assertEqual((usage["planned_today"], usage["denied_today"]), (1, 1))
+
+    def test_priority_symbols_are_served_first(self):
+        planner = _planner(finnhub="1/min", priority=["XAUUSD"])
+        chains = {"US30": ["finnhub"], "XAUUSD": ["finnhub"]}
+        plan = planner.plan_ohlc(["US30", "XAUUSD"], chains)
+        self.assertEqual(plan.assignments, {"XAUUSD": "finnhub"})
+        self.assertEqual(plan.deferred, ["US30"])
+
+    def test_batch_provider_serves_many_symbols_for_one_token(self):
+        planner = _planner(finnhub="0/min", yahoo="1/hour")
+        chains = {s: ["finnhub", "yahoo"] for s in ("EURUSD", "GBPUSD", "USDJPY")}
+        plan = planner.plan_ohlc(list(chains), chains)
+        self.assertEqual(plan.deferred, [])
+        self.assertEqual(len(plan.symbols_for("yahoo")), 3)
+        self.assertEqual(planner.usage()["yahoo"]["planned_today"], 1)
+
+    def test_planning_does_not_spend_tokens(self):
+        planner = _planner(finnhub="1/min")
+        chains = {"US30": ["finnhub"]}
+        for _ in range(2):
+            plan = planner.plan_ohlc(["US30"], chains)
+            self.assertEqual(plan.assignments, {"US30": "finnhub"})
+        planner.spend("finnhub")
+        self.assertEqual(planner.plan_ohlc(["US30"], chains).deferred, ["US30"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""
+Regression tests for scanner_loop: symbol scans must not repeat the news scan.
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import asyncio
+import unittest
+from unittest import mock
+
+# telegramsender refuses to import without a token; nothing is sent here
+os.environ.setdefault("TELEGRAM_TOKEN", "test-token")
+
+import scanner_loop  # noqa: E402
+
+
+class RunScanTest(unittest.TestCase):
+
+    def test_symbol_scan_does_not_post_news(self):
+        decision = mock.AsyncMock(return_value="No signal")
+        news = mock.AsyncMock(return_value=[("Headline", [])])
+        send = mock.AsyncMock()
+        with mock.patch.object(scanner_loop, "generate_trade_decision", decision), \
+                mock.patch.object(scanner_loop, "fetch_and_analyze_news", news), \
+                mock.patch.object(scanner_loop, "send_telegram_message", send):
+            # One bar close: the on-time batch plus two late symbols
+            for symbols in (["EURUSD", "USDJPY"], ["XAUUSD"], ["US30"]):
+                asyncio.run(scanner_loop.run_scan(symbols))
+            self.assertEqual([c.args[0] for c in decision.call_args_list], ["EURUSD", "USDJPY", "XAUUSD", "US30"])
+            news.assert_not_called()
+            send.assert_not_called()
+
+            asyncio.run(scanner_loop.run_news_scan())
+            news.assert_called_once()
+            send.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+"""
+Synthetic bars must pass data_quality.validate_ohlc untouched.
+
+Run with: python -m unittest discover tests
+"""
+
+import unittest
+
+from data_quality import validate_ohlc
+from synthetic_market import synthetic_market
+
+REPAIRS = ("duplicates", "unsorted", "bad_close", "weekend", "filled", "inconsistent", "flat_fills",
+           "zero_range", "spikes", "wick_spikes", "gaps", "missing_bars", "off_grid")
+
+
+class SyntheticPassesValidationTest(unittest.TestCase):
+
+    def test_zero_repairs_across_dst(self):
+        # Winter (EST) and summer (EDT) weeks, spanning both DST changes of 2024
+        for end in ("2024-01-15", "2024-03-20", "2024-07-01", "2024-11-12"):
+            for timeframe in ("M15", "H1", "H4", "D1"):
+                for symbol in ("EURUSD", "XAUUSD", "BTCUSD"):
+                    with self.subTest(end=end, timeframe=timeframe, symbol=symbol):
+                        df = synthetic_market.bars(symbol, timeframe, 1500, end=end)
+                        out = validate_ohlc(df, timeframe, symbol, "synthetic", record=False)
+                        report = out.attrs["data_quality"]
+                        self.assertEqual(len(out), len(df))
+                        self.assertEqual({k: report[k] for k in REPAIRS if report[k]}, {})
+
+    def test_friday_last_hour_in_summer(self):
+        # 17:00 New York is 21:00 UTC under EDT: the week's last H1 bar opens at 20:00
+        df = synthetic_market.bars("EURUSD", "H1", 3, end="2024-07-05 21:30")
+        self.assertEqual(str(df.index[-1]), "2024-07-05 20:00:00")
+        self.assertEqual(len(validate_ohlc(df, "H1", "EURUSD", "synthetic", record=False)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Regression tests for tick_aggregator.TickAggregator bar rollover and flush.
+
+Run with: python -m unittest discover tests
+"""
+
+import unittest
+
+import pandas as pd
+
+from tick_aggregator import TickAggregator
+
+# Monday 2024-01-08 10:00:00 UTC
+T0 = int(pd.Timestamp("2024-01-08 10:00").timestamp())
+
+
+def _aggregator(**kwargs):
+    return TickAggregator(timeframes=["M1", "M5"], max_bars=100, **kwargs)
+
+
+class RolloverTest(unittest.TestCase):
+
+    def test_next_minute_tick_closes_the_m1_bar(self):
+        agg = _aggregator()
+        for offset, price in ((5, 1.10), (20, 1.12), (40, 1.09), (55, 1.11)):
+            self.assertEqual(agg.add_tick("EURUSD", T0 + offset, price), [])
+        closed = agg.add_tick("EURUSD", T0 + 65, 1.13)
+        self.assertEqual(closed, [("M1", (pd.Timestamp("2024-01-08 10:00"), 1.10, 1.12, 1.09, 1.11, 4.0))])
+        self.assertEqual(agg.snapshot("EURUSD")["open"], 1.13)
+
+    def test_m5_bar_rolls_up_its_m1_bars(self):
+        agg = _aggregator()
+        for minute in range(5):
+            agg.add_tick("EURUSD", T0 + minute * 60 + 1, 1.10 + minute * 0.01)
+            agg.add_tick("EURUSD", T0 + minute * 60 + 30, 1.105 + minute * 0.01)
+        closed = agg.add_tick("EURUSD", T0 + 300 + 1, 1.20)
+        self.assertEqual([tf for tf, _ in closed], ["M1", "M5"])
+        self.assertEqual(dict(closed)["M5"], (pd.Timestamp("2024-01-08 10:00"), 1.10, 1.145, 1.10, 1.145, 10.0))
+        self.assertEqual(len(agg.frame("EURUSD", "M1", include_partial=False)), 5)
+
+    def test_late_tick_is_dropped(self):
+        agg = _aggregator()
+        agg.add_tick("EURUSD", T0 + 65, 1.10)
+        self.assertEqual(agg.add_tick("EURUSD", T0 + 5, 1.50), [])
+        self.assertEqual(agg.stats()["late_ticks"], 1)
+        self.assertEqual(agg.snapshot("EURUSD")["high"], 1.10)
+
+    def test_batch_matches_tick_by_tick(self):
+        times = [T0 + s for s in (1, 14, 59, 61, 119, 200, 301, 302, 420)]
+        prices = [1.10, 1.11, 1.09, 1.12, 1.08, 1.13, 1.07, 1.14, 1.10]
+        one, batch = _aggregator(), _aggregator()
+        for t, p in zip(times, prices):
+            one.add_tick("EURUSD", t, p)
+        batch.add_ticks("EURUSD", times, prices)
+        for tf in ("M1", "M5"):
+            pd.testing.assert_frame_equal(one.frame("EURUSD", tf), batch.frame("EURUSD", tf))
+
+
+class FlushTest(unittest.TestCase):
+
+    def test_flush_closes_quiet_bars_once(self):
+        events = []
+        agg = _aggregator(on_bar_closed=lambda symbol, tf, bar: events.append((symbol, tf, bar[0])))
+        agg.add_tick("EURUSD", T0 + 10, 1.10)
+        self.assertEqual(agg.flush(now=T0 + 30), [])
+        closed = agg.flush(now=T0 + 60)
+        self.assertEqual([(s, tf) for s, tf, _ in closed], [("EURUSD", "M1")])
+        self.assertIsNone(agg.snapshot("EURUSD", "M1"))
+        self.assertEqual(agg.snapshot("EURUSD", "M5")["close"], 1.10)
+
+        closed = agg.flush(now=T0 + 300)
+        self.assertEqual([(s, tf) for s, tf, _ in closed], [("EURUSD", "M5")])
+        self.assertEqual(agg.flush(now=T0 + 600), [])
+        self.assertEqual(events, [
+            ("EURUSD", "M1", pd.Timestamp("2024-01-08 10:00")),
+            ("EURUSD", "M5", pd.Timestamp("2024-01-08 10:00")),
+        ])
+
+    def test_tick_before_the_flushed_minute_is_late(self):
+        agg = _aggregator()
+        agg.add_tick("EURUSD", T0 + 10, 1.10)
+        agg.flush(now=T0 + 120)
+        self.assertEqual(agg.add_tick("EURUSD", T0 + 50, 1.20), [])
+        self.assertEqual(agg.stats()["late_ticks"], 1)
+        self.assertEqual(len(agg.frame("EURUSD", "M1")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,329 @@
+"""
+Real-time tick-to-bar aggregation.
+
+- Ticks (symbol, timestamp, price or bid/ask, volume) from any streaming
+  source build the forming M1 bar in place; each closed M1 bar is rolled up
+  into every configured higher timeframe at once.
+- Bucketing matches resampler.py (higher timeframes anchored to the 17:00
+  New York FX session), so live bars line up with resampled history.
+- Closed bars go into preallocated numpy ring buffers (TICK_MAX_BARS per
+  symbol/timeframe) and are reported to `on_bar_closed(symbol, timeframe, bar)`.
+- `snapshot()` returns the forming bar of any timeframe without building
+  a DataFrame; `frame()` returns closed bars (+ forming) in the bar store schema.
+- Bars only close when a later tick arrives; call `flush()` periodically
+  to close bars of quiet symbols on the clock.
+- Without a traded volume each tick counts as volume 1 (tick volume).
+"""
+
+import os
+import math
+import time
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from resampler import OHLCV, Bar, bucket_end_seconds, bucket_start_seconds
+
+logger = logging.getLogger(__name__)
+
+TICK_TIMEFRAMES = [tf.strip() for tf in os.getenv("TICK_TIMEFRAMES", "M1,M5,M15,M30,H1,H4,D1").split(",") if tf.strip()]
+TICK_MAX_BARS = int(os.getenv("TICK_MAX_BARS", "1000"))
+TICK_PRICE_SIDE = os.getenv("TICK_PRICE_SIDE", "bid").lower()  # bid | ask | mid (XTB charts are bid based)
+
+BarClosedCallback = Callable[[str, str, Bar], None]
+
+# Forming bar layout: [start, open, high, low, close, volume]
+_START, _OPEN, _HIGH, _LOW, _CLOSE, _VOLUME = range(6)
+
+
+class _BarRing:
+    """Fixed-size ring of closed bars: epoch-second open times + OHLCV rows."""
+
+    __slots__ = ("times", "values", "pos", "size")
+
+    def __init__(self, capacity: int):
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, 5), dtype=np.float64)
+        self.pos = 0
+        self.size = 0
+
+    def append(self, bar: List[float]) -> None:
+        self.times[self.pos] = bar[_START]
+        self.values[self.pos] = bar[_OPEN:]
+        self.pos = (self.pos + 1) % len(self.times)
+        self.size = min(self.size + 1, len(self.times))
+
+    def ordered(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self.size < len(self.times):
+            return self.times[:self.size], self.values[:self.size]
+        order = np.r_[self.pos:len(self.times), 0:self.pos]
+        return self.times[order], self.values[order]
+
+
+class _SymbolState:
+    __slots__ = ("m1", "m1_end", "last_ts", "forming", "ends", "rings")
+
+    def __init__(self, timeframes: Sequence[str], capacity: int):
+        self.m1: Optional[List[float]] = None
+        self.m1_end = 0
+        self.last_ts = -math.inf
+        self.forming: Dict[str, Optional[List[float]]] = {tf: None for tf in timeframes if tf != "M1"}
+        self.ends: Dict[str, int] = {}
+        self.rings = {tf: _BarRing(capacity) for tf in timeframes}
+
+
+class TickAggregator:
+    """
+    Builds M1 and higher-timeframe bars from ticks for many symbols.
+    """
+
+    def __init__(
+        self,
+        timeframes: Iterable[str] = TICK_TIMEFRAMES,
+        max_bars: int = TICK_MAX_BARS,
+        on_bar_closed: Optional[BarClosedCallback] = None,
+        price_side: str = TICK_PRICE_SIDE,
+    ):
+        self.timeframes = ["M1"] + [tf for tf in timeframes if tf != "M1"]
+        self.max_bars = max_bars
+        self.on_bar_closed = on_bar_closed
+        self.price_side = price_side
+        self.ticks = 0
+        self.late_ticks = 0
+        self.bars_closed = 0
+        self._symbols: Dict[str, _SymbolState] = {}
+
+    # --- ingestion -------------------------------------------------------
+
+    def add_tick(self, symbol: str, timestamp: float, price: float, volume: float = 1.0) -> List[Tuple[str, Bar]]:
+        """
+        Feed one trade/last-price tick.
+
+        Args:
+            symbol (str): Instrument.
+            timestamp (float): Epoch seconds (UTC).
+            price (float): Tick price.
+            volume (float): Traded volume (default 1 = tick volume).
+
+        Returns:
+            list: (timeframe, bar) for every bar this tick closed.
+        """
+        self.ticks += 1
+        st = self._symbols.get(symbol)
+        if st is None:
+            st = self._symbols[symbol] = _SymbolState(self.timeframes, self.max_bars)
+        m1 = st.m1
+        if m1 is not None and timestamp < st.m1_end:
+            if timestamp < m1[_START]:
+                self.late_ticks += 1
+                return []
+            if price > m1[_HIGH]:
+                m1[_HIGH] = price
+            elif price < m1[_LOW]:
+                m1[_LOW] = price
+            if timestamp >= st.last_ts:
+                m1[_CLOSE] = price
+                st.last_ts = timestamp
+            m1[_VOLUME] += volume
+            return []
+        if timestamp < st.last_ts and m1 is None:
+            self.late_ticks += 1
+            return []
+        start = int(timestamp) - int(timestamp) % 60
+        closed = self._advance(symbol, st, start)
+        st.m1 = [start, price, price, price, price, volume]
+        st.m1_end = start + 60
+        st.last_ts = timestamp
+        self._dispatch(symbol, closed)
+        return closed
+
+    def add_quote(self, symbol: str, timestamp: float, bid: float, ask: float, volume: float = 1.0) -> List[Tuple[str, Bar]]:
+        """Feed one bid/ask quote; the bar price follows `price_side`."""
+        if self.price_side == "bid":
+            price = bid
+        elif self.price_side == "ask":
+            price = ask
+        else:
+            price = (bid + ask) / 2
+        return self.add_tick(symbol, timestamp, price, volume)
+
+    def on_xtb_tick(self, data: Dict[str, Any]) -> None:
+        """`XTBStreamClient(on_tick=...)` adapter for xAPI tickPrices payloads."""
+        timestamp = data.get("timestamp") or data.get("received", time.time()) * 1000
+        self.add_quote(data["symbol"], timestamp / 1000, data["bid"], data["ask"])
+
+    def add_ticks(
+        self,
+        symbol: str,
+        timestamps: Sequence[float],
+        prices: Sequence[float],
+        volumes: Optional[Sequence[float]] = None,
+    ) -> List[Tuple[str, Bar]]:
+        """
+        Feed a batch of ticks for one symbol (vectorized per minute).
+
+        Returns:
+            list: (timeframe, bar) for every bar the batch closed.
+        """
+        ts = np.asarray(timestamps, dtype=np.float64)
+        px = np.asarray(prices, dtype=np.float64)
+        vol = np.ones(len(ts)) if volumes is None else np.asarray(volumes, dtype=np.float64)
+        if len(ts) == 0:
+            return []
+        if np.any(np.diff(ts) < 0):
+            order = np.argsort(ts, kind="stable")
+            ts, px, vol = ts[order], px[order], vol[order]
+        self.ticks += len(ts)
+        st = self._symbols.get(symbol)
+        if st is None:
+            st = self._symbols[symbol] = _SymbolState(self.timeframes, self.max_bars)
+        floor = st.m1[_START] if st.m1 is not None else st.last_ts
+        keep = ts >= floor
+        if not keep.all():
+            self.late_ticks += int((~keep).sum())
+            ts, px, vol = ts[keep], px[keep], vol[keep]
+            if len(ts) == 0:
+                return []
+
+        minutes = (ts // 60).astype(np.int64) * 60
+        first = np.flatnonzero(np.r_[True, minutes[1:] != minutes[:-1]])
+        last = np.r_[first[1:] - 1, len(ts) - 1]
+        bars = zip(
+            minutes[first].tolist(), ts[last].tolist(), px[first].tolist(), np.maximum.reduceat(px, first).tolist(),
+            np.minimum.reduceat(px, first).tolist(), px[last].tolist(), np.add.reduceat(vol, first).tolist(),
+        )
+        closed: List[Tuple[str, Bar]] = []
+        for start, last_ts, o, h, l, c, v in bars:
+            m1 = st.m1
+            if m1 is not None and start == m1[_START]:
+                m1[_HIGH] = max(m1[_HIGH], h)
+                m1[_LOW] = min(m1[_LOW], l)
+                if last_ts >= st.last_ts:
+                    m1[_CLOSE] = c
+                m1[_VOLUME] += v
+            else:
+                closed.extend(self._advance(symbol, st, start))
+                st.m1 = [start, o, h, l, c, v]
+                st.m1_end = start + 60
+            st.last_ts = max(st.last_ts, last_ts)
+        self._dispatch(symbol, closed)
+        return closed
+
+    def flush(self, now: Optional[float] = None) -> List[Tuple[str, str, Bar]]:
+        """
+        Close every bar whose period has ended by `now` (default: wall clock).
+
+        Returns:
+            list: (symbol, timeframe, bar) for every bar closed.
+        """
+        now = time.time() if now is None else now
+        minute = int(now) - int(now) % 60
+        closed = []
+        for symbol, st in self._symbols.items():
+            if st.m1 is not None and now < st.m1_end:
+                continue
+            events = self._advance(symbol, st, minute)
+            st.m1 = None
+            st.last_ts = max(st.last_ts, float(minute))
+            self._dispatch(symbol, events)
+            closed.extend((symbol, tf, bar) for tf, bar in events)
+        return closed
+
+    # --- rolling ---------------------------------------------------------
+
+    def _advance(self, symbol: str, st: _SymbolState, next_start: int) -> List[Tuple[str, Bar]]:
+        """Close the forming M1 bar and every higher bar that `next_start` is past."""
+        closed = []
+        m1 = st.m1
+        if m1 is not None:
+            closed.append(("M1", self._close(st, "M1", m1)))
+            for tf, forming in st.forming.items():
+                if forming is None:
+                    start = bucket_start_seconds(m1[_START], tf)
+                    st.forming[tf] = [start, *m1[_OPEN:]]
+                    st.ends[tf] = bucket_end_seconds(start, tf)
+                else:
+                    forming[_HIGH] = max(forming[_HIGH], m1[_HIGH])
+                    forming[_LOW] = min(forming[_LOW], m1[_LOW])
+                    forming[_CLOSE] = m1[_CLOSE]
+                    forming[_VOLUME] += m1[_VOLUME]
+            st.m1 = None
+        for tf, forming in st.forming.items():
+            if forming is not None and next_start >= st.ends[tf]:
+                closed.append((tf, self._close(st, tf, forming)))
+                st.forming[tf] = None
+        return closed
+
+    def _close(self, st: _SymbolState, timeframe: str, bar: List[float]) -> Bar:
+        st.rings[timeframe].append(bar)
+        self.bars_closed += 1
+        return (pd.Timestamp(int(bar[_START]), unit="s"), *bar[_OPEN:])
+
+    def _dispatch(self, symbol: str, closed: List[Tuple[str, Bar]]) -> None:
+        if not closed or self.on_bar_closed is None:
+            return
+        for tf, bar in closed:
+            try:
+                self.on_bar_closed(symbol, tf, bar)
+            except Exception as e:
+                logger.error(f"[TickAggregator] on_bar_closed failed for {symbol} {tf}: {e}")
+
+    # --- queries ---------------------------------------------------------
+
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    def snapshot(self, symbol: str, timeframe: str = "M1") -> Optional[Dict[str, Any]]:
+        """
+        The forming bar of `timeframe` (closed M1 bars so far + the forming M1).
+
+        Returns:
+            dict: time/open/high/low/close/volume, or None when nothing is forming.
+        """
+        st = self._symbols.get(symbol)
+        if st is None:
+            return None
+        m1 = st.m1
+        forming = None if timeframe == "M1" else st.forming[timeframe]
+        if m1 is None and forming is None:
+            return None
+        if forming is None:
+            start = m1[_START] if timeframe == "M1" else bucket_start_seconds(m1[_START], timeframe)
+            bar = [start, *m1[_OPEN:]]
+        else:
+            bar = list(forming)
+            if m1 is not None:
+                bar[_HIGH] = max(bar[_HIGH], m1[_HIGH])
+                bar[_LOW] = min(bar[_LOW], m1[_LOW])
+                bar[_CLOSE] = m1[_CLOSE]
+                bar[_VOLUME] += m1[_VOLUME]
+        return {"time": pd.Timestamp(int(bar[_START]), unit="s"), **dict(zip(OHLCV, bar[_OPEN:]))}
+
+    def frame(self, symbol: str, timeframe: str = "M1", include_partial: bool = True) -> pd.DataFrame:
+        """
+        Closed bars (+ the forming one) in the bar store schema; `attrs["partial"]` marks the latter.
+        """
+        st = self._symbols.get(symbol)
+        if st is None:
+            times, values = np.zeros(0, dtype=np.int64), np.zeros((0, 5))
+        else:
+            times, values = st.rings[timeframe].ordered()
+        forming = self.snapshot(symbol, timeframe) if include_partial else None
+        if forming is not None:
+            times = np.r_[times, forming["time"].value // 10**9]
+            values = np.vstack([values, [forming[c] for c in OHLCV]])
+        df = pd.DataFrame(values, columns=OHLCV, index=pd.DatetimeIndex(pd.to_datetime(times, unit="s"), name="time"))
+        df.attrs["partial"] = forming is not None
+        return df
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "symbols": len(self._symbols),
+            "ticks": self.ticks,
+            "late_ticks": self.late_ticks,
+            "bars_closed": self.bars_closed,
+        }
+
+
+tick_aggregator = TickAggregator()
@@ -3,13 +3,13 @@ Example: Automated Trading Signal Integration
 
 This file demonstrates how to:
 - Fetch market data (OHLCV) using your async get_ohlc function.
-- Calculate multiple technical indicators.
+- Calculate multiple technical indicators in one planned pass (feature_planner.py).
 - Generate BUY/SELL signals from each indicator.
 - Aggregate signals for a simple, robust trading decision.
 - (Placeholder) Execute trades or alerts based on the aggregated signal.
 
 Dependencies:
-- Your files: marketdata.py, indicators.py
+- Your files: marketdata.py, indicators.py, feature_planner.py
 - pandas, asyncio
 
 How to use:
@@ -21,13 +21,11 @@ import asyncio
 import logging
 import pandas as pd
 from marketdata import get_ohlc  # Async function!
+from feature_planner import compute_features, select
+from signal_logic import SIGNAL_FEATURES
 from indicators import (
-    calculate_rsi, rsi_signal,
-    calculate_macd, macd_signal,
-    calculate_bollinger_bands, bollinger_signal,
-    calculate_stochastic_oscillator, stochastic_signal,
-    calculate_cci, cci_signal,
-    calculate_williams_r, williams_r_signal,
+    rsi_signal, macd_signal, bollinger_signal,
+    stochastic_signal, cci_signal, williams_r_signal,
 )
 
 # Set up logging
@@ -58,39 +56,39 @@ async def main_trading_logic(symbol:str, timeframe:str, bars:int=100, min_confir
         return
 
     close = df['close']
-    high = df['high']
-    low = df['low']
 
-    # Step 2: Calculate indicators and signals
+    # Step 2: Calculate indicators (one planned pass) and signals
     signals = []
     try:
+        features = compute_features(df, SIGNAL_FEATURES)
+
         # RSI
-        rsi = calculate_rsi(close)
+        rsi = select(features, "rsi(14)")
         rsi_sig = rsi_signal(rsi)
         signals.append(rsi_sig.dropna().iloc[-1])
 
         # MACD
-        macd_df = calculate_macd(close)
+        macd_df = select(features, "macd(12,26,9)")
         macd_sig = macd_signal(macd_df)
         signals.append(macd_sig.dropna().iloc[-1])
 
         # Bollinger Bands
-        bb_df = calculate_bollinger_bands(close)
+        bb_df = select(features, "bb(20,2)")
         bb_sig = bollinger_signal(close, bb_df)
         signals.append(bb_sig.dropna().iloc[-1])
 
         # Stochastic Oscillator
-        stoch_df = calculate_stochastic_oscillator(high, low, close)
+        stoch_df = select(features, "stoch(14,3)")
         stoch_sig = stochastic_signal(stoch_df)
         signals.append(stoch_sig.dropna().iloc[-1])
 
         # CCI
-        cci = calculate_cci(high, low, close)
+        cci = select(features, "cci(20)")
         cci_sig = cci_signal(cci)
         signals.append(cci_sig.dropna().iloc[-1])
 
         # Williams %R
-        wr = calculate_williams_r(high, low, close)
+        wr = select(features, "williams_r(14)")
         wr_sig = williams_r_signal(wr)
         signals.append(wr_sig.dropna().iloc[-1])
     except Exception as e:
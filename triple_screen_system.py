@@ -4,10 +4,16 @@ Implements Elder's Triple Screen system.
 Uses three timeframes: Long (trend), Medium (setup), Short (trigger).
 Call: triple_screen_signal(df_long, df_med, df_short)
 Each df = DataFrame for symbol & timeframe.
+Or: await triple_screen_for_symbol(symbol) - all three screens from ONE
+provider fetch (higher timeframes resampled locally, see marketdata.get_ohlc_mtf),
+with indicators read from the per-symbol streaming indicator state instead of
+being recomputed over the whole history.
 """
 
 import pandas as pd
 from indicators import calculate_ema, calculate_rsi
+from marketdata import get_ohlc_mtf
+from streaming_indicators import indicator_streams
 
 def triple_screen_signal(df_long, df_med, df_short):
     """
@@ -15,15 +21,27 @@ def triple_screen_signal(df_long, df_med, df_short):
     signal = 'BUY', 'SELL', or 'HOLD'
     reasons = list of logic points
     """
+    return triple_screen_decision(
+        df_long["close"].iloc[-1],
+        calculate_ema(df_long["close"], 21).iloc[-1],
+        calculate_rsi(df_med["close"], 14).iloc[-1],
+        calculate_ema(df_short["close"], 9).iloc[-1],
+        calculate_ema(df_short["close"], 21).iloc[-1],
+    )
+
+def triple_screen_decision(long_close, long_ema21, rsi_val, short_ema9, short_ema21):
+    """
+    The three screens on the latest indicator values.
+    Returns (signal, reasons) like triple_screen_signal.
+    """
 
     reasons = []
 
     # 1. Long trend: EMA21 uptrend/downtrend filter (Weekly)
-    long_ema21 = calculate_ema(df_long["close"], 21)
-    if df_long["close"].iloc[-1] > long_ema21.iloc[-1]:
+    if long_close > long_ema21:
         major_trend = "UP"
         reasons.append("Major trend UP (long EMA21)")
-    elif df_long["close"].iloc[-1] < long_ema21.iloc[-1]:
+    elif long_close < long_ema21:
         major_trend = "DOWN"
         reasons.append("Major trend DOWN (long EMA21)")
     else:
@@ -31,8 +49,6 @@ def triple_screen_signal(df_long, df_med, df_short):
         reasons.append("Major trend FLAT (long EMA21)")
 
     # 2. Medium setup: RSI(14) (Daily/H4)
-    med_rsi = calculate_rsi(df_med["close"], 14)
-    rsi_val = med_rsi.iloc[-1]
     if rsi_val < 30:
         rsi_signal = "OVERSOLD"
         reasons.append("Medium timeframe OVERSOLD (RSI<30)")
@@ -44,12 +60,10 @@ def triple_screen_signal(df_long, df_med, df_short):
         reasons.append("Medium timeframe RSI neutral (30–70)")
 
     # 3. Short trigger: EMA9/EMA21 crossover or strong candle (H1/M15)
-    short_ema9 = calculate_ema(df_short["close"], 9)
-    short_ema21 = calculate_ema(df_short["close"], 21)
-    if short_ema9.iloc[-1] > short_ema21.iloc[-1]:
+    if short_ema9 > short_ema21:
         trigger = "BUY"
         reasons.append("Short EMA9 > EMA21 (trigger BUY)")
-    elif short_ema9.iloc[-1] < short_ema21.iloc[-1]:
+    elif short_ema9 < short_ema21:
         trigger = "SELL"
         reasons.append("Short EMA9 < EMA21 (trigger SELL)")
     else:
@@ -69,6 +83,21 @@ def triple_screen_signal(df_long, df_med, df_short):
 
     return signal, reasons
 
+async def triple_screen_for_symbol(symbol, long_tf="D1", med_tf="H4", short_tf="H1"):
+    """
+    Fetch the three screens with one base-timeframe request and evaluate them.
+    Returns (signal, reasons) like triple_screen_signal.
+    """
+    frames = await get_ohlc_mtf(symbol, (short_tf, med_tf, long_tf), base_timeframe=short_tf)
+    if any(frames[tf].empty for tf in (long_tf, med_tf, short_tf)):
+        return "HOLD", [f"No data for {symbol}"]
+    long = indicator_streams.sync(symbol, long_tf, frames[long_tf])
+    med = indicator_streams.sync(symbol, med_tf, frames[med_tf])
+    short = indicator_streams.sync(symbol, short_tf, frames[short_tf])
+    return triple_screen_decision(
+        frames[long_tf]["close"].iloc[-1], long["ema21"], med["rsi"], short["ema9"], short["ema21"]
+    )
+
 # USAGE EXAMPLE:
 # signal, reasons = triple_screen_signal(df_week, df_day, df_hour)
 # print(signal, reasons)
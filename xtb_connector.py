@@ -4,6 +4,7 @@ import json
 import pandas as pd
 import websocket
 from dotenv import load_dotenv
+from ohlc_decoder import decode_xtb_rate_infos
 
 load_dotenv()
 
@@ -11,6 +12,25 @@ XTB_USER = os.getenv("XTB_USER")
 XTB_PASS = os.getenv("XTB_PASS")
 XTB_DEMO = os.getenv("XTB_DEMO", "true").lower() == "true"
 
+# Timeframe key -> xAPI chart period (minutes)
+XTB_PERIODS = {
+    "M1": 1,
+    "M5": 5,
+    "M15": 15,
+    "M30": 30,
+    "H1": 60,
+    "H4": 240,
+    "D1": 1440,
+    "W1": 10080,
+    "MN1": 43200,
+}
+
+
+def chart_start_ms(timeframe, limit):
+    """Chart request start (epoch ms) far enough back to cover `limit` bars across weekends."""
+    period = XTB_PERIODS.get(timeframe, 60)
+    return int(time.time() - limit * period * 60 * 1.5 - 3 * 86400) * 1000
+
 
 class XTBConnector:
     def __init__(self):
@@ -60,12 +80,13 @@ class XTBConnector:
             return pd.DataFrame()
 
         try:
+            period = XTB_PERIODS.get(timeframe, 60)
             self.ws.send(json.dumps({
                 "command": "getChartLastRequest",
                 "arguments": {
                     "info": {
-                        "period": 60,  # H1 = 60 min
-                        "start": int(time.time()) - (limit * 3600),
+                        "period": period,
+                        "start": chart_start_ms(timeframe, limit),
                         "symbol": symbol
                     }
                 }
@@ -75,16 +96,7 @@ class XTBConnector:
                 print(f"⚠️ XTB response missing data for {symbol}")
                 return pd.DataFrame()
 
-            candles = response["returnData"]["rateInfos"]
-            df = pd.DataFrame({
-                "time": [pd.to_datetime(c["ctm"], unit="ms") for c in candles],
-                "open": [c["open"] for c in candles],
-                "high": [c["high"] for c in candles],
-                "low": [c["low"] for c in candles],
-                "close": [c["close"] for c in candles],
-                "volume": [c["vol"] for c in candles],
-            }).set_index("time")
-
+            df = decode_xtb_rate_infos(response["returnData"]).tail(limit)
             return df
 
         except Exception as e:
@@ -0,0 +1,224 @@
+"""
+Local fake XTB xAPI websocket server for tests and offline runs.
+
+- Command endpoint "/demo": login, logout, ping, getChartLastRequest (bars
+  from synthetic_market in xAPI shifted notation), getServerTime; replies echo
+  customTag like the real API.
+- Stream endpoint "/demoStream": getTickPrices / getCandles / getKeepAlive
+  subscriptions (and their stop* counterparts) push tickPrices, candle and
+  keepAlive messages at configurable intervals.
+- `drop_connections()` closes every client socket to exercise reconnects.
+
+Usage:
+    python xtb_fake_server.py [port]
+    XTB_WS_URL=ws://127.0.0.1:8765/demo python your_script.py
+"""
+
+import sys
+import json
+import time
+import asyncio
+import logging
+import numpy as np
+import pandas as pd
+import websockets
+from typing import Any, Dict, Set
+
+from synthetic_market import instrument, synthetic_market
+
+logger = logging.getLogger(__name__)
+
+PERIOD_TIMEFRAMES = {1: "M1", 5: "M5", 15: "M15", 30: "M30", 60: "H1", 240: "H4", 1440: "D1", 10080: "W1"}
+
+
+class FakeXTBServer:
+    """
+    In-process fake of the xAPI command and streaming sockets.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tick_interval: float = 0.05,
+        candle_interval: float = 1.0,
+        keepalive_interval: float = 3.0,
+    ):
+        self.host = host
+        self.port = port
+        self.tick_interval = tick_interval
+        self.candle_interval = candle_interval
+        self.keepalive_interval = keepalive_interval
+        self.logins = 0
+        self.commands: Dict[str, int] = {}
+        self._server = None
+        self._connections: Set[Any] = set()
+        self._rng = np.random.default_rng(0)
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/demo"
+
+    @property
+    def stream_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/demoStream"
+
+    async def start(self) -> "FakeXTBServer":
+        self._server = await websockets.serve(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"[FakeXTB] Listening on {self.url}")
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def drop_connections(self) -> None:
+        """Close every open client socket (server keeps listening)."""
+        for ws in list(self._connections):
+            await ws.close(code=1011, reason="fake drop")
+
+    async def _handle(self, ws) -> None:
+        self._connections.add(ws)
+        try:
+            if ws.request.path.endswith("Stream"):
+                await self._handle_stream(ws)
+            else:
+                await self._handle_commands(ws)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._connections.discard(ws)
+
+    # --- command socket ----------------------------------------------------
+
+    async def _handle_commands(self, ws) -> None:
+        logged_in = False
+        async for raw in ws:
+            message = json.loads(raw)
+            name = message.get("command")
+            self.commands[name] = self.commands.get(name, 0) + 1
+            reply: Dict[str, Any] = {"status": True}
+            if name == "login":
+                logged_in = True
+                self.logins += 1
+                reply["streamSessionId"] = f"fake-session-{self.logins}"
+            elif not logged_in:
+                reply = {"status": False, "errorCode": "BE103", "errorDescr": "User is not logged"}
+            elif name == "getChartLastRequest":
+                reply["returnData"] = self._chart(message.get("arguments", {}).get("info", {}))
+            elif name == "getServerTime":
+                reply["returnData"] = {"time": int(time.time() * 1000)}
+            elif name in ("ping", "logout"):
+                pass
+            else:
+                reply = {"status": False, "errorCode": "EX000", "errorDescr": f"Unknown command {name}"}
+            if "customTag" in message:
+                reply["customTag"] = message["customTag"]
+            await ws.send(json.dumps(reply))
+            if name == "logout":
+                await ws.close()
+
+    @staticmethod
+    def _chart(info: Dict[str, Any]) -> Dict[str, Any]:
+        symbol = info.get("symbol", "EURUSD")
+        timeframe = PERIOD_TIMEFRAMES.get(int(info.get("period", 60)), "H1")
+        start = info.get("start")
+        df = synthetic_market.bars(symbol, timeframe, start=None if start is None else pd.Timestamp(int(start), unit="ms"))
+        digits = instrument(symbol).digits
+        scale = 10 ** digits
+        opens = np.round(df["open"].to_numpy() * scale)
+        rate_infos = [
+            {
+                "ctm": int(t.value // 10**6),
+                "ctmString": t.strftime("%b %d, %Y, %I:%M:%S %p"),
+                "open": float(o),
+                "high": float(round(h * scale - o)),
+                "low": float(round(l * scale - o)),
+                "close": float(round(c * scale - o)),
+                "vol": float(v),
+            }
+            for t, o, h, l, c, v in zip(df.index, opens, df["high"], df["low"], df["close"], df["volume"])
+        ]
+        return {"digits": digits, "rateInfos": rate_infos}
+
+    # --- stream socket -----------------------------------------------------
+
+    async def _handle_stream(self, ws) -> None:
+        tasks: Dict[str, asyncio.Task] = {}
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                name, symbol = message.get("command"), message.get("symbol")
+                self.commands[name] = self.commands.get(name, 0) + 1
+                if not str(message.get("streamSessionId", "")).startswith("fake-session-"):
+                    continue
+                if name == "getTickPrices":
+                    tasks.setdefault(f"tick:{symbol}", asyncio.create_task(self._push_ticks(ws, symbol)))
+                elif name == "getCandles":
+                    tasks.setdefault(f"candle:{symbol}", asyncio.create_task(self._push_candles(ws, symbol)))
+                elif name == "getKeepAlive":
+                    tasks.setdefault("keepAlive", asyncio.create_task(self._push_keepalive(ws)))
+                elif name in ("stopTickPrices", "stopCandles"):
+                    key = f"{'tick' if name == 'stopTickPrices' else 'candle'}:{symbol}"
+                    task = tasks.pop(key, None)
+                    if task is not None:
+                        task.cancel()
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    async def _push_ticks(self, ws, symbol: str) -> None:
+        inst = instrument(symbol)
+        price = inst.base_price
+        spread = 10 ** -inst.digits * 10
+        step = inst.annual_vol / np.sqrt(52 * 120 * 3600 / self.tick_interval)
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            price *= float(np.exp(step * self._rng.standard_normal()))
+            bid = round(price, inst.digits)
+            await ws.send(json.dumps({
+                "command": "tickPrices",
+                "data": {
+                    "symbol": symbol,
+                    "bid": bid,
+                    "ask": round(bid + spread, inst.digits),
+                    "high": bid, "low": bid,
+                    "bidVolume": 1000000, "askVolume": 1000000,
+                    "level": 0, "quoteId": 0, "spreadRaw": spread, "spreadTable": spread * 10,
+                    "timestamp": int(time.time() * 1000),
+                },
+            }))
+
+    async def _push_candles(self, ws, symbol: str) -> None:
+        while True:
+            await asyncio.sleep(self.candle_interval)
+            bar = synthetic_market.bars(symbol, "M1", 1)
+            t = bar.index[-1]
+            row = bar.iloc[-1]
+            await ws.send(json.dumps({
+                "command": "candle",
+                "data": {
+                    "symbol": symbol, "ctm": int(t.value // 10**6), "ctmString": str(t),
+                    "open": row["open"], "high": row["high"], "low": row["low"], "close": row["close"],
+                    "vol": row["volume"], "quoteId": 0,
+                },
+            }))
+
+    async def _push_keepalive(self, ws) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            await ws.send(json.dumps({"command": "keepAlive", "data": {"timestamp": int(time.time() * 1000)}}))
+
+
+async def _main(port: int) -> None:
+    server = await FakeXTBServer(port=port).start()
+    print(f"Fake XTB command socket: {server.url}")
+    print(f"Fake XTB stream socket:  {server.stream_url}")
+    await asyncio.Future()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(int(sys.argv[1]) if len(sys.argv) > 1 else 8765))
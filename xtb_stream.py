@@ -0,0 +1,311 @@
+"""
+Asyncio streaming client for the XTB xAPI.
+
+- One persistent, logged-in command socket (requests matched to replies by
+  customTag, paced to the xAPI 200 ms request interval) plus the streaming
+  socket authenticated with the login's streamSessionId.
+- Subscribes tick prices and M1 candles for the configured symbols; updates
+  are pushed to `on_tick` / `on_candle` callbacks (sync or async) and the
+  latest tick per symbol is kept in memory.
+- Keepalive: xAPI `ping` on both sockets every XTB_PING_SECONDS, plus the
+  getKeepAlive stream subscription.
+- Any socket error tears both sockets down and reconnects with exponential
+  backoff, logging in again and re-subscribing every symbol.
+- XTB_WS_URL / XTB_STREAM_URL override the endpoints (e.g. the local fake
+  server in xtb_fake_server.py).
+"""
+
+import os
+import json
+import time
+import asyncio
+import inspect
+import logging
+import itertools
+import pandas as pd
+import websockets
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from ohlc_decoder import decode_xtb_rate_infos
+from provider_health import record_request
+from xtb_connector import XTB_DEMO, XTB_PASS, XTB_PERIODS, XTB_USER, chart_start_ms
+
+logger = logging.getLogger(__name__)
+
+XTB_WS_URL = os.getenv("XTB_WS_URL", "wss://xapi.xtb.com/demo" if XTB_DEMO else "wss://xapi.xtb.com/real")
+XTB_STREAM_URL = os.getenv("XTB_STREAM_URL", f"{XTB_WS_URL}Stream")
+XTB_SYMBOLS = [s.strip() for s in os.getenv("XTB_SYMBOLS", "EURUSD,GBPUSD,USDJPY,XAUUSD").split(",") if s.strip()]
+XTB_PING_SECONDS = float(os.getenv("XTB_PING_SECONDS", "30"))
+XTB_COMMAND_INTERVAL = float(os.getenv("XTB_COMMAND_INTERVAL", "0.2"))
+XTB_COMMAND_TIMEOUT = float(os.getenv("XTB_COMMAND_TIMEOUT", "10"))
+XTB_RECONNECT_MAX_SECONDS = float(os.getenv("XTB_RECONNECT_MAX_SECONDS", "60"))
+
+Callback = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+class XTBCommandError(Exception):
+    """xAPI replied with status false."""
+
+
+class XTBStreamClient:
+    """
+    Persistent command + streaming connection with automatic resubscription.
+    """
+
+    def __init__(
+        self,
+        user: Optional[str] = XTB_USER,
+        password: Optional[str] = XTB_PASS,
+        symbols: Optional[List[str]] = None,
+        url: str = XTB_WS_URL,
+        stream_url: str = XTB_STREAM_URL,
+        ping_interval: float = XTB_PING_SECONDS,
+        on_tick: Optional[Callback] = None,
+        on_candle: Optional[Callback] = None,
+    ):
+        self.user = user
+        self.password = password
+        self.symbols: List[str] = list(XTB_SYMBOLS if symbols is None else symbols)
+        self.url = url
+        self.stream_url = stream_url
+        self.ping_interval = ping_interval
+        self.on_tick = on_tick
+        self.on_candle = on_candle
+        self.ticks: Dict[str, Dict[str, Any]] = {}
+        self.stream_session_id: Optional[str] = None
+        self.connected = asyncio.Event()
+        self.reconnects = 0
+        self.messages = 0
+        self.last_tick_latency_ms: Optional[float] = None
+        self._cmd = None
+        self._stream = None
+        self._tags = itertools.count(1)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._send_lock = asyncio.Lock()
+        self._last_send = 0.0
+        self._cmd_reader: Optional[asyncio.Task] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    # --- lifecycle -------------------------------------------------------
+
+    async def start(self) -> None:
+        """Start the connection supervisor (returns immediately)."""
+        if self._runner is None or self._runner.done():
+            self._stopping = False
+            self._runner = asyncio.create_task(self._supervise(), name="xtb-stream")
+
+    async def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        try:
+            await asyncio.wait_for(self.connected.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def stop(self) -> None:
+        """Log out, close both sockets and stop reconnecting."""
+        self._stopping = True
+        if self.connected.is_set():
+            try:
+                await self.command("logout", timeout=2)
+            except Exception:
+                pass
+        await self._close_sockets()
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+
+    async def _supervise(self) -> None:
+        delay = 1.0
+        while not self._stopping:
+            try:
+                await self._connect()
+                delay = 1.0
+                await self._serve()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[XTB] Connection lost: {type(e).__name__}: {e}")
+            finally:
+                self.connected.clear()
+                await self._close_sockets()
+            if self._stopping:
+                break
+            self.reconnects += 1
+            logger.info(f"[XTB] Reconnecting in {delay:.0f}s (attempt {self.reconnects})")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, XTB_RECONNECT_MAX_SECONDS)
+
+    async def _connect(self) -> None:
+        self._cmd = await websockets.connect(self.url, max_size=None)
+        self._cmd_reader = asyncio.create_task(self._read_commands())
+        try:
+            login = await self.command("login", {"userId": self.user, "password": self.password}, raw=True)
+            self.stream_session_id = login.get("streamSessionId")
+            self._stream = await websockets.connect(self.stream_url, max_size=None)
+            await self._stream_send("getKeepAlive")
+            for symbol in self.symbols:
+                await self._subscribe(symbol)
+        except BaseException:
+            self._cmd_reader.cancel()
+            raise
+        self.connected.set()
+        logger.info(f"[XTB] Connected, streaming {len(self.symbols)} symbols")
+
+    async def _serve(self) -> None:
+        tasks = [
+            self._cmd_reader,
+            asyncio.create_task(self._read_stream()),
+            asyncio.create_task(self._ping_loop()),
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _close_sockets(self) -> None:
+        for sock in (self._cmd, self._stream):
+            if sock is not None:
+                try:
+                    await sock.close()
+                except Exception:
+                    pass
+        self._cmd = self._stream = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("XTB connection closed"))
+        self._pending.clear()
+
+    # --- command socket --------------------------------------------------
+
+    async def command(
+        self,
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        timeout: float = XTB_COMMAND_TIMEOUT,
+        raw: bool = False,
+    ) -> Any:
+        """
+        Send an xAPI command and wait for its reply.
+
+        Returns:
+            The reply's returnData (or the whole reply with raw=True).
+
+        Raises:
+            XTBCommandError: The reply had status false.
+            ConnectionError: Not connected, or the socket dropped mid-request.
+        """
+        if self._cmd is None:
+            raise ConnectionError("XTB command socket not connected")
+        tag = str(next(self._tags))
+        message = {"command": name, "customTag": tag}
+        if arguments:
+            message["arguments"] = arguments
+        future = asyncio.get_running_loop().create_future()
+        self._pending[tag] = future
+        try:
+            async with self._send_lock:
+                wait = self._last_send + XTB_COMMAND_INTERVAL - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                await self._cmd.send(json.dumps(message))
+                self._last_send = sent = time.monotonic()
+            reply = await asyncio.wait_for(future, timeout)
+        except (ConnectionError, asyncio.TimeoutError, websockets.ConnectionClosed) as e:
+            record_request("xtb", name, time.monotonic() - self._last_send, False, type(e).__name__)
+            raise
+        finally:
+            self._pending.pop(tag, None)
+        ok = bool(reply.get("status"))
+        record_request("xtb", name, time.monotonic() - sent, ok, None if ok else reply.get("errorCode"))
+        if not ok:
+            raise XTBCommandError(f"{name}: {reply.get('errorCode')} {reply.get('errorDescr')}")
+        return reply if raw else reply.get("returnData")
+
+    async def _read_commands(self) -> None:
+        async for raw in self._cmd:
+            reply = json.loads(raw)
+            future = self._pending.get(reply.get("customTag"))
+            if future is not None and not future.done():
+                future.set_result(reply)
+
+    async def get_candles(self, symbol: str, timeframe: str = "H1", limit: int = 200) -> pd.DataFrame:
+        """Last `limit` bars via getChartLastRequest on the persistent socket."""
+        period = XTB_PERIODS.get(timeframe, 60)
+        info = {"period": period, "start": chart_start_ms(timeframe, limit), "symbol": symbol}
+        data = await self.command("getChartLastRequest", {"info": info})
+        return decode_xtb_rate_infos(data or {}).tail(limit)
+
+    # --- streaming socket ------------------------------------------------
+
+    async def _stream_send(self, name: str, **fields: Any) -> None:
+        await self._stream.send(json.dumps({"command": name, "streamSessionId": self.stream_session_id, **fields}))
+
+    async def _subscribe(self, symbol: str) -> None:
+        await self._stream_send("getTickPrices", symbol=symbol, minArrivalTime=0, maxLevel=0)
+        await self._stream_send("getCandles", symbol=symbol)
+
+    async def subscribe(self, symbol: str) -> None:
+        """Add a symbol (kept across reconnects)."""
+        if symbol not in self.symbols:
+            self.symbols.append(symbol)
+            if self.connected.is_set():
+                await self._subscribe(symbol)
+
+    async def unsubscribe(self, symbol: str) -> None:
+        if symbol in self.symbols:
+            self.symbols.remove(symbol)
+            if self.connected.is_set():
+                await self._stream_send("stopTickPrices", symbol=symbol)
+                await self._stream_send("stopCandles", symbol=symbol)
+
+    async def _read_stream(self) -> None:
+        async for raw in self._stream:
+            self.messages += 1
+            message = json.loads(raw)
+            kind, data = message.get("command"), message.get("data") or {}
+            if kind == "tickPrices":
+                data["received"] = time.time()
+                if data.get("timestamp"):
+                    self.last_tick_latency_ms = data["received"] * 1000 - data["timestamp"]
+                self.ticks[data.get("symbol")] = data
+                await self._dispatch(self.on_tick, data)
+            elif kind == "candle":
+                await self._dispatch(self.on_candle, data)
+
+    @staticmethod
+    async def _dispatch(callback: Optional[Callback], data: Dict[str, Any]) -> None:
+        if callback is None:
+            return
+        try:
+            result = callback(data)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(f"[XTB] Stream callback failed: {e}")
+
+    async def _ping_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await self.command("ping")
+            await self._stream_send("ping")
+
+    # --- queries ---------------------------------------------------------
+
+    def latest_tick(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Most recent streamed tick for `symbol` (bid/ask/timestamp...), or None."""
+        return self.ticks.get(symbol)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected.is_set(),
+            "symbols": len(self.symbols),
+            "messages": self.messages,
+            "reconnects": self.reconnects,
+            "last_tick_latency_ms": self.last_tick_latency_ms,
+        }